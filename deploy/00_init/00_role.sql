@@ -24,6 +24,9 @@ GRANT CREATE INTEGRATION ON ACCOUNT TO ROLE SNOWGOAL_ROLE;
 -- Grant task execution (needed for scheduled tasks)
 GRANT EXECUTE TASK ON ACCOUNT TO ROLE SNOWGOAL_ROLE;
 
+-- Grant ACCOUNT_USAGE access (needed for GOLD.COST_ATTRIBUTION: query history, warehouse metering)
+GRANT IMPORTED PRIVILEGES ON DATABASE SNOWFLAKE TO ROLE SNOWGOAL_ROLE;
+
 -- ============================================
 -- After running this script:
 -- USE ROLE SNOWGOAL_ROLE;
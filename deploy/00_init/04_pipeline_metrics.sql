@@ -0,0 +1,104 @@
+-- ============================================
+-- SNOWGOAL - Pipeline Metrics (structured, per stage)
+-- ============================================
+-- PIPELINE_LOGS keeps one summary line per procedure run.
+-- PIPELINE_METRICS keeps one row per stage measured inside the run:
+--   HTTP  : one API call (league x endpoint) - latency, bytes, records
+--   LOAD  : write_pandas + INSERT of one RAW table - duration, bytes, records
+--   MERGE : one MERGE of SP_MERGE_TO_SILVER - rows inserted / updated / skipped
+--   TASK  : one task of the graph (written by the finalizer from TASK_HISTORY)
+-- RUN_ID = task graph run group id (NULL-safe: random UUID for manual calls)
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA COMMON;
+
+CREATE TABLE IF NOT EXISTS PIPELINE_METRICS (
+    METRIC_ID NUMBER AUTOINCREMENT,
+    EVENT_TIME TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    RUN_ID VARCHAR(100),
+    COMPONENT_NAME VARCHAR(100),  -- 'FETCH_ALL_LEAGUES', 'FETCH_ODDS', 'MERGE_TO_SILVER', 'TASK_GRAPH'
+    STAGE VARCHAR(20),            -- 'HTTP', 'LOAD', 'MERGE', 'TASK'
+    OBJECT_NAME VARCHAR(200),     -- league code, table or task name
+    ENDPOINT VARCHAR(200),        -- API endpoint (HTTP only)
+    STATUS VARCHAR(20),           -- HTTP status code, 'OK' / 'ERROR', task state
+    STARTED_AT TIMESTAMP_NTZ,
+    DURATION_MS NUMBER(18,0),
+    BYTES NUMBER(18,0),
+    RECORDS NUMBER(18,0),         -- records received / source rows
+    ROWS_INSERTED NUMBER(18,0),
+    ROWS_UPDATED NUMBER(18,0),
+    ROWS_SKIPPED NUMBER(18,0),
+    ATTRIBUTES VARIANT            -- extra context (API quota headers, error message...)
+)
+CLUSTER BY (TO_DATE(EVENT_TIME))
+COMMENT = 'One row per measured pipeline stage (HTTP call, RAW load, MERGE, task run)';
+
+-- ----------------------------------------
+-- Daily trends per stage: p50 / p95 durations and volumes
+-- ----------------------------------------
+CREATE OR REPLACE VIEW V_PIPELINE_STAGE_TRENDS AS
+SELECT
+    TO_DATE(EVENT_TIME) AS RUN_DATE,
+    COMPONENT_NAME,
+    STAGE,
+    OBJECT_NAME,
+    ENDPOINT,
+    COUNT(*) AS MEASURES,
+    COUNT_IF(STATUS IN ('ERROR', 'FAILED') OR TRY_TO_NUMBER(STATUS) >= 400) AS ERRORS,
+    ROUND(MEDIAN(DURATION_MS)) AS P50_DURATION_MS,
+    ROUND(PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY DURATION_MS)) AS P95_DURATION_MS,
+    MAX(DURATION_MS) AS MAX_DURATION_MS,
+    SUM(BYTES) AS TOTAL_BYTES,
+    SUM(RECORDS) AS TOTAL_RECORDS,
+    SUM(ROWS_INSERTED) AS TOTAL_ROWS_INSERTED,
+    SUM(ROWS_UPDATED) AS TOTAL_ROWS_UPDATED,
+    SUM(ROWS_SKIPPED) AS TOTAL_ROWS_SKIPPED
+FROM PIPELINE_METRICS
+GROUP BY ALL;
+
+-- ----------------------------------------
+-- Slowest stages of the latest run of each component, vs their 14-day baseline
+-- (what got slower after the last change)
+-- ----------------------------------------
+CREATE OR REPLACE VIEW V_PIPELINE_SLOWEST_STAGES AS
+WITH latest AS (
+    SELECT *
+    FROM PIPELINE_METRICS
+    QUALIFY RUN_ID = FIRST_VALUE(RUN_ID) OVER (PARTITION BY COMPONENT_NAME ORDER BY EVENT_TIME DESC)
+),
+baseline AS (
+    SELECT
+        COMPONENT_NAME, STAGE, OBJECT_NAME, COALESCE(ENDPOINT, '') AS ENDPOINT,
+        MEDIAN(DURATION_MS) AS BASELINE_P50_MS,
+        COUNT(DISTINCT RUN_ID) AS BASELINE_RUNS
+    FROM PIPELINE_METRICS
+    WHERE EVENT_TIME >= DATEADD('day', -14, CURRENT_TIMESTAMP())
+      AND RUN_ID NOT IN (SELECT DISTINCT RUN_ID FROM latest)
+    GROUP BY ALL
+)
+SELECT
+    l.RUN_ID,
+    l.EVENT_TIME,
+    l.COMPONENT_NAME,
+    l.STAGE,
+    l.OBJECT_NAME,
+    l.ENDPOINT,
+    l.STATUS,
+    l.DURATION_MS,
+    b.BASELINE_P50_MS,
+    b.BASELINE_RUNS,
+    ROUND(l.DURATION_MS / NULLIF(b.BASELINE_P50_MS, 0), 2) AS SLOWDOWN_RATIO,
+    l.BYTES,
+    l.RECORDS,
+    l.ROWS_INSERTED,
+    l.ROWS_UPDATED,
+    l.ROWS_SKIPPED
+FROM latest l
+LEFT JOIN baseline b
+    ON b.COMPONENT_NAME = l.COMPONENT_NAME
+    AND b.STAGE = l.STAGE
+    AND b.OBJECT_NAME = l.OBJECT_NAME
+    AND b.ENDPOINT = COALESCE(l.ENDPOINT, '');
@@ -4,12 +4,13 @@ USE DATABASE SNOWGOAL_DB;
 
 USE SCHEMA COMMON;
 
+-- pipeline_metrics.py: latence / octets par ligue et endpoint, durée de chargement par table RAW (COMMON.PIPELINE_METRICS)
 CREATE OR REPLACE PROCEDURE FETCH_ALL_LEAGUES()
 RETURNS VARCHAR
 LANGUAGE PYTHON
 RUNTIME_VERSION = '3.11'
 PACKAGES = ('snowflake-snowpark-python', 'requests', 'pandas')
-IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/fetch_all_leagues.py')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/fetch_all_leagues.py', '@SNOWGOAL_DB.RAW.PYTHON_CODE/pipeline_metrics.py')
 HANDLER = 'fetch_all_leagues.main'
 EXTERNAL_ACCESS_INTEGRATIONS = (FOOTBALL_API_ACCESS)
 SECRETS = ('api_key' = SNOWGOAL_DB.COMMON.FOOTBALL_API_KEY)
@@ -0,0 +1,19 @@
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+
+USE SCHEMA COMMON;
+
+-- team_mapping.py: résolution nom Odds API -> TEAM_ID (écrit SILVER.TEAM_ALIASES)
+-- pipeline_metrics.py: métriques HTTP / LOAD par ligue (COMMON.PIPELINE_METRICS)
+CREATE OR REPLACE PROCEDURE FETCH_ODDS()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'requests', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/fetch_odds.py', '@SNOWGOAL_DB.RAW.PYTHON_CODE/team_mapping.py',
+           '@SNOWGOAL_DB.RAW.PYTHON_CODE/pipeline_metrics.py')
+HANDLER = 'fetch_odds.main'
+EXTERNAL_ACCESS_INTEGRATIONS = (ODDS_API_ACCESS)
+SECRETS = ('odds_api_key' = SNOWGOAL_DB.COMMON.ODDS_API_KEY)
+COMMENT = 'Fetches h2h odds for 11 competitions and resolves team aliases';
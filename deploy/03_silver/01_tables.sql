@@ -146,6 +146,9 @@ CREATE OR REPLACE TABLE ODDS (
     COMMENCE_TIME TIMESTAMP_NTZ,
     HOME_TEAM VARCHAR(100),
     AWAY_TEAM VARCHAR(100),
+    HOME_TEAM_ID INT,
+    AWAY_TEAM_ID INT,
+    MATCH_ID INT,
     BOOKMAKER_KEY VARCHAR(50),
     BOOKMAKER_TITLE VARCHAR(100),
     HOME_ODDS FLOAT,
@@ -157,5 +160,41 @@ CREATE OR REPLACE TABLE ODDS (
     PRIMARY KEY (GAME_ID, BOOKMAKER_KEY)
 );
 
+-- ----------------------------------------
+-- ODDS_HISTORY - Snapshots des cotes (append-only, une ligne par fetch)
+-- Source du backtesting (cote de clôture = dernier snapshot avant le coup d'envoi)
+-- ----------------------------------------
+CREATE TABLE IF NOT EXISTS ODDS_HISTORY (
+    GAME_ID VARCHAR(100),
+    COMPETITION_CODE VARCHAR(10),
+    COMMENCE_TIME TIMESTAMP_NTZ,
+    HOME_TEAM VARCHAR(100),
+    AWAY_TEAM VARCHAR(100),
+    BOOKMAKER_KEY VARCHAR(50),
+    BOOKMAKER_TITLE VARCHAR(100),
+    HOME_ODDS FLOAT,
+    DRAW_ODDS FLOAT,
+    AWAY_ODDS FLOAT,
+    LAST_UPDATE TIMESTAMP_NTZ,
+    _LOADED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (TO_DATE(COMMENCE_TIME));
+
+-- ----------------------------------------
+-- TEAM_ALIASES - Correspondance noms externes -> TEAM_ID
+-- MATCH_METHOD: FUZZY (auto), MANUAL (correction, jamais écrasée), UNRESOLVED
+-- ----------------------------------------
+CREATE TABLE IF NOT EXISTS TEAM_ALIASES (
+    SOURCE VARCHAR(20),
+    ALIAS_NAME VARCHAR(100),
+    COMPETITION_CODE VARCHAR(10),
+    TEAM_ID INT,
+    MATCH_SCORE FLOAT,
+    MATCH_METHOD VARCHAR(20),
+    _LOADED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (SOURCE, COMPETITION_CODE, ALIAS_NAME)
+);
+
 -- Verify
 SHOW TABLES IN SCHEMA SILVER;
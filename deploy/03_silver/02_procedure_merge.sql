@@ -3,6 +3,10 @@
 -- ============================================
 -- This procedure encapsulates all MERGE statements
 -- Called by: TASK_MERGE_TO_SILVER (after TASK_FETCH_ALL_LEAGUES)
+-- Each MERGE writes one COMMON.PIPELINE_METRICS row: source rows (distinct keys
+-- read from the staging stream, counted before the MERGE consumes it), rows
+-- inserted / updated (RESULT_SCAN of the MERGE) and rows skipped (unchanged).
+-- GOLD.PIPELINE_STATUS (counts, freshness, data version) is refreshed at the end.
 -- ============================================
 USE ROLE SNOWGOAL_ROLE;
 USE DATABASE SNOWGOAL_DB;
@@ -12,10 +16,25 @@ CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_MERGE_TO_SILVER()
 RETURNS VARCHAR
 LANGUAGE SQL
 EXECUTE AS OWNER
-AS 'BEGIN
+AS 'DECLARE
+    run_id VARCHAR;
+    source_rows INTEGER;
+    stage_start TIMESTAMP_LTZ;
+BEGIN
+    -- RUN_ID commun aux métriques du graphe de tâches (UUID pour un CALL manuel)
+    BEGIN
+        SELECT SYSTEM$TASK_RUNTIME_INFO(''CURRENT_TASK_GRAPH_RUN_GROUP_ID'') INTO :run_id;
+    EXCEPTION
+        WHEN OTHER THEN
+            run_id := NULL;
+    END;
+    run_id := COALESCE(run_id, UUID_STRING());
+
     ------------------------------------------------------------------------
     -- MERGE MATCHES
     ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT MATCH_ID FROM STAGING.V_MATCHES);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.MATCHES AS target
     USING (
         SELECT DISTINCT MATCH_ID, COMPETITION_CODE, SEASON_YEAR, MATCH_DATE,
@@ -84,9 +103,17 @@ AS 'BEGIN
             source.AREA_CODE, source.DAY_OF_WEEK, source.MATCH_HOUR,
             source.CURRENT_MATCHDAY, source.LAST_UPDATED
         );
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.MATCHES'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
     ------------------------------------------------------------------------
     -- MERGE STANDINGS
     ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT TEAM_ID, COMPETITION_CODE, SEASON_YEAR FROM STAGING.V_STANDINGS);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.STANDINGS AS target
     USING (
         SELECT DISTINCT TEAM_ID, COMPETITION_CODE, SEASON_YEAR, POSITION,
@@ -121,9 +148,17 @@ AS 'BEGIN
         VALUES (source.TEAM_ID, source.COMPETITION_CODE, source.SEASON_YEAR, source.POSITION, source.TEAM_NAME,
                 source.TEAM_SHORT, source.TEAM_TLA, source.TEAM_CREST, source.PLAYED, source.WON, source.DRAW,
                 source.LOST, source.POINTS, source.GOALS_FOR, source.GOALS_AGAINST, source.GOAL_DIFF, source.FORM);
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.STANDINGS'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
     ------------------------------------------------------------------------
     -- MERGE TEAMS
     ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT TEAM_ID FROM STAGING.V_TEAMS);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.TEAMS AS target
     USING (
         SELECT DISTINCT TEAM_ID, COMPETITION_CODE, TEAM_NAME, TEAM_SHORT, TEAM_TLA,
@@ -155,9 +190,17 @@ AS 'BEGIN
         VALUES (source.TEAM_ID, source.COMPETITION_CODE, source.TEAM_NAME, source.TEAM_SHORT,
                 source.TEAM_TLA, source.TEAM_CREST, source.ADDRESS, source.WEBSITE, source.FOUNDED,
                 source.CLUB_COLORS, source.VENUE, source.COACH_ID, source.COACH_NAME, source.COACH_NATIONALITY);
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.TEAMS'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
     ------------------------------------------------------------------------
     -- MERGE SCORERS
     ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT PLAYER_ID, COMPETITION_CODE, SEASON_YEAR FROM STAGING.V_SCORERS);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.SCORERS AS target
     USING (
         SELECT DISTINCT PLAYER_ID, COMPETITION_CODE, SEASON_YEAR, PLAYER_NAME,
@@ -193,9 +236,17 @@ AS 'BEGIN
                 source.FIRST_NAME, source.LAST_NAME, source.NATIONALITY, source.POSITION,
                 source.DATE_OF_BIRTH, source.TEAM_ID, source.TEAM_NAME, source.TEAM_SHORT,
                 source.GOALS, source.ASSISTS, source.PENALTIES, source.PLAYED_MATCHES);
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.SCORERS'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
     ------------------------------------------------------------------------
     -- MERGE COMPETITIONS
     ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT COMPETITION_CODE FROM STAGING.V_COMPETITIONS);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.COMPETITIONS AS target
     USING (
         SELECT DISTINCT COMPETITION_CODE, COMPETITION_ID, COMPETITION_NAME, TYPE,
@@ -227,9 +278,40 @@ AS 'BEGIN
                 source.TYPE, source.EMBLEM, source.AREA_NAME, source.AREA_CODE,
                 source.AREA_FLAG, source.CURRENT_SEASON_ID, source.SEASON_START,
                 source.SEASON_END, source.CURRENT_MATCHDAY);
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.COMPETITIONS'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
     ------------------------------------------------------------------------
-    -- MERGE ODDS
+    -- ODDS SNAPSHOT + MERGE ODDS
+    -- Same transaction: both statements read the same STREAM_RAW_ODDS rows
     ------------------------------------------------------------------------
+    BEGIN TRANSACTION;
+    SELECT COUNT(*) INTO :source_rows FROM STAGING.V_ODDS;
+    stage_start := CURRENT_TIMESTAMP();
+    INSERT INTO SILVER.ODDS_HISTORY (GAME_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM,
+                                     BOOKMAKER_KEY, BOOKMAKER_TITLE, HOME_ODDS, DRAW_ODDS, AWAY_ODDS, LAST_UPDATE)
+    SELECT DISTINCT v.GAME_ID, v.COMPETITION_CODE, v.COMMENCE_TIME, v.HOME_TEAM, v.AWAY_TEAM,
+           v.BOOKMAKER_KEY, v.BOOKMAKER_TITLE, v.HOME_ODDS, v.DRAW_ODDS, v.AWAY_ODDS, v.LAST_UPDATE
+    FROM STAGING.V_ODDS v
+    -- Cote inchangée depuis le fetch précédent (même LAST_UPDATE): déjà historisée
+    WHERE NOT EXISTS (
+        SELECT 1 FROM SILVER.ODDS_HISTORY h
+        WHERE h.GAME_ID = v.GAME_ID
+          AND h.BOOKMAKER_KEY = v.BOOKMAKER_KEY
+          AND h.LAST_UPDATE = v.LAST_UPDATE
+    );
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.ODDS_HISTORY'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", :source_rows - "number of rows inserted"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+
+    SELECT COUNT(*) INTO :source_rows FROM (SELECT DISTINCT GAME_ID, BOOKMAKER_KEY FROM STAGING.V_ODDS);
+    stage_start := CURRENT_TIMESTAMP();
     MERGE INTO SILVER.ODDS AS target
     USING (
         SELECT DISTINCT GAME_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM,
@@ -256,5 +338,76 @@ AS 'BEGIN
         VALUES (source.GAME_ID, source.COMPETITION_CODE, source.COMMENCE_TIME, source.HOME_TEAM,
                 source.AWAY_TEAM, source.BOOKMAKER_KEY, source.BOOKMAKER_TITLE, source.HOME_ODDS,
                 source.DRAW_ODDS, source.AWAY_ODDS, source.LAST_UPDATE);
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.ODDS'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           "number of rows inserted", "number of rows updated", :source_rows - "number of rows inserted" - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    COMMIT;
+    ------------------------------------------------------------------------
+    -- RESOLVE ODDS IDS (TEAM_ALIASES -> TEAM_ID, puis MATCH_ID par IDs et date +/- 1 jour)
+    -- Rows still unresolved are retried on each run (new aliases, late fixtures);
+    -- rows whose team IDs no longer match TEAM_ALIASES (MANUAL correction of a
+    -- fuzzy match) are re-resolved, or cleared if the alias was unset
+    ------------------------------------------------------------------------
+    SELECT COUNT(*) INTO :source_rows
+    FROM SILVER.ODDS o
+    LEFT JOIN SILVER.TEAM_ALIASES ha
+        ON ha.SOURCE = ''ODDS_API'' AND ha.COMPETITION_CODE = o.COMPETITION_CODE AND ha.ALIAS_NAME = o.HOME_TEAM
+    LEFT JOIN SILVER.TEAM_ALIASES aa
+        ON aa.SOURCE = ''ODDS_API'' AND aa.COMPETITION_CODE = o.COMPETITION_CODE AND aa.ALIAS_NAME = o.AWAY_TEAM
+    WHERE (o.MATCH_ID IS NULL AND ha.TEAM_ID IS NOT NULL AND aa.TEAM_ID IS NOT NULL)
+       OR o.HOME_TEAM_ID IS DISTINCT FROM ha.TEAM_ID
+       OR o.AWAY_TEAM_ID IS DISTINCT FROM aa.TEAM_ID;
+    stage_start := CURRENT_TIMESTAMP();
+    MERGE INTO SILVER.ODDS AS target
+    USING (
+        SELECT g.GAME_ID, g.HOME_TEAM_ID, g.AWAY_TEAM_ID, m.MATCH_ID
+        FROM (
+            SELECT DISTINCT o.GAME_ID, o.COMMENCE_TIME, ha.TEAM_ID AS HOME_TEAM_ID, aa.TEAM_ID AS AWAY_TEAM_ID
+            FROM SILVER.ODDS o
+            LEFT JOIN SILVER.TEAM_ALIASES ha
+                ON ha.SOURCE = ''ODDS_API'' AND ha.COMPETITION_CODE = o.COMPETITION_CODE AND ha.ALIAS_NAME = o.HOME_TEAM
+            LEFT JOIN SILVER.TEAM_ALIASES aa
+                ON aa.SOURCE = ''ODDS_API'' AND aa.COMPETITION_CODE = o.COMPETITION_CODE AND aa.ALIAS_NAME = o.AWAY_TEAM
+            WHERE (o.MATCH_ID IS NULL AND ha.TEAM_ID IS NOT NULL AND aa.TEAM_ID IS NOT NULL)
+               OR o.HOME_TEAM_ID IS DISTINCT FROM ha.TEAM_ID
+               OR o.AWAY_TEAM_ID IS DISTINCT FROM aa.TEAM_ID
+        ) g
+        LEFT JOIN SILVER.MATCHES m
+            ON m.HOME_TEAM_ID = g.HOME_TEAM_ID
+            AND m.AWAY_TEAM_ID = g.AWAY_TEAM_ID
+            AND m.MATCH_DATE BETWEEN DATEADD(''day'', -1, g.COMMENCE_TIME) AND DATEADD(''day'', 1, g.COMMENCE_TIME)
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY g.GAME_ID
+            ORDER BY ABS(DATEDIFF(''minute'', m.MATCH_DATE, g.COMMENCE_TIME))
+        ) = 1
+    ) AS source
+    ON target.GAME_ID = source.GAME_ID
+    WHEN MATCHED THEN
+        UPDATE SET
+            HOME_TEAM_ID = source.HOME_TEAM_ID,
+            AWAY_TEAM_ID = source.AWAY_TEAM_ID,
+            MATCH_ID = source.MATCH_ID,
+            _UPDATED_AT = CURRENT_TIMESTAMP();
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT,
+                                         DURATION_MS, RECORDS, ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED)
+    SELECT :run_id, ''MERGE_TO_SILVER'', ''MERGE'', ''SILVER.ODDS (ID resolution)'', ''OK'', :stage_start,
+           DATEDIFF(''millisecond'', :stage_start, CURRENT_TIMESTAMP()), :source_rows,
+           NULL, "number of rows updated", :source_rows - "number of rows updated"
+    FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+
+    ------------------------------------------------------------------------
+    -- PIPELINE STATUS: counts, freshness, DATA_VERSION read by the dashboard
+    -- (04_gold/13_pipeline_status.sql)
+    ------------------------------------------------------------------------
+    CALL SNOWGOAL_DB.COMMON.SP_REFRESH_PIPELINE_STATUS(:run_id);
+
+    ------------------------------------------------------------------------
+    -- LOG SUCCESS
+    ------------------------------------------------------------------------
+    INSERT INTO COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE)
+    VALUES (''INFO'', ''MERGE_TO_SILVER'', ''MERGE COMPLETED'');
     RETURN ''MERGE COMPLETED'';
 END';
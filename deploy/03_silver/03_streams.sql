@@ -0,0 +1,28 @@
+-- ============================================
+-- SNOWGOAL - Silver Streams (CDC for GOLD incremental tables)
+-- ============================================
+-- One stream per consumer: a stream offset only advances when it is
+-- consumed by a DML statement, so each incremental GOLD table reads
+-- its own stream on the SILVER source.
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA SILVER;
+
+-- Stream sur MATCHES pour maintenir GOLD.TEAM_MATCHES (une ligne par équipe et par match)
+CREATE OR REPLACE STREAM STREAM_SILVER_MATCHES_TEAM_MATCHES
+    ON TABLE MATCHES
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding GOLD.TEAM_MATCHES';
+
+-- Stream sur MATCHES pour le moteur Elo (GOLD.TEAM_RATINGS, TEAM_RATING_HISTORY)
+CREATE OR REPLACE STREAM STREAM_SILVER_MATCHES_ELO
+    ON TABLE MATCHES
+    APPEND_ONLY = FALSE
+    COMMENT = 'CDC stream feeding the Elo rating engine (UPDATE_TEAM_RATINGS)';
+
+-- Verify
+SHOW STREAMS IN SCHEMA SILVER;
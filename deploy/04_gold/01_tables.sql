@@ -53,70 +53,73 @@ SELECT
     RANK() OVER (PARTITION BY COMPETITION_CODE, SEASON_YEAR ORDER BY GOALS + COALESCE(ASSISTS, 0) DESC) AS CONTRIBUTIONS_RANK
 FROM SILVER.SCORERS;
 
--- 3. TEAM_STATS
+-- 3. TEAM_MATCHES - One row per team per finished match (long format)
+-- Base table for form, PPG and head-to-head lookups: a single clustered
+-- scan replaces the home/away double scans + joins on SILVER.MATCHES.
+CREATE OR REPLACE TABLE TEAM_MATCHES
+CLUSTER BY (TEAM_ID, TO_DATE(MATCH_DATE))
+AS
+SELECT
+    m.MATCH_ID,
+    IFF(v.IS_HOME, m.HOME_TEAM_ID, m.AWAY_TEAM_ID) AS TEAM_ID,
+    m.COMPETITION_CODE,
+    m.SEASON_YEAR,
+    m.MATCH_DATE,
+    m.MATCHDAY,
+    v.IS_HOME,
+    IFF(v.IS_HOME, m.HOME_TEAM_NAME, m.AWAY_TEAM_NAME) AS TEAM_NAME,
+    IFF(v.IS_HOME, m.HOME_TEAM_TLA, m.AWAY_TEAM_TLA) AS TEAM_TLA,
+    IFF(v.IS_HOME, m.AWAY_TEAM_ID, m.HOME_TEAM_ID) AS OPPONENT_ID,
+    IFF(v.IS_HOME, m.AWAY_TEAM_NAME, m.HOME_TEAM_NAME) AS OPPONENT_NAME,
+    IFF(v.IS_HOME, m.AWAY_TEAM_TLA, m.HOME_TEAM_TLA) AS OPPONENT_TLA,
+    IFF(v.IS_HOME, m.HOME_SCORE, m.AWAY_SCORE) AS GOALS_FOR,
+    IFF(v.IS_HOME, m.AWAY_SCORE, m.HOME_SCORE) AS GOALS_AGAINST,
+    CASE
+        WHEN m.WINNER IS NULL THEN NULL
+        WHEN m.WINNER = 'DRAW' THEN 'D'
+        WHEN m.WINNER = IFF(v.IS_HOME, 'HOME_TEAM', 'AWAY_TEAM') THEN 'W'
+        ELSE 'L'
+    END AS RESULT,
+    CASE
+        WHEN m.WINNER IS NULL THEN NULL
+        WHEN m.WINNER = 'DRAW' THEN 1
+        WHEN m.WINNER = IFF(v.IS_HOME, 'HOME_TEAM', 'AWAY_TEAM') THEN 3
+        ELSE 0
+    END AS POINTS,
+    CURRENT_TIMESTAMP() AS _UPDATED_AT
+FROM SILVER.MATCHES m
+CROSS JOIN (SELECT TRUE AS IS_HOME UNION ALL SELECT FALSE) v
+WHERE m.STATUS = 'FINISHED';
+
+-- 4. TEAM_STATS (single pass over TEAM_MATCHES)
 CREATE OR REPLACE TABLE TEAM_STATS AS
-WITH home_stats AS (
-    SELECT
-        COMPETITION_CODE,
-        SEASON_YEAR,
-        HOME_TEAM_ID AS TEAM_ID,
-        HOME_TEAM_NAME AS TEAM_NAME,
-        COUNT(*) AS HOME_PLAYED,
-        SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) AS HOME_WINS,
-        SUM(CASE WHEN WINNER = 'DRAW' THEN 1 ELSE 0 END) AS HOME_DRAWS,
-        SUM(CASE WHEN WINNER = 'AWAY_TEAM' THEN 1 ELSE 0 END) AS HOME_LOSSES,
-        SUM(HOME_SCORE) AS HOME_GOALS_FOR,
-        SUM(AWAY_SCORE) AS HOME_GOALS_AGAINST
-    FROM SILVER.MATCHES
-    WHERE STATUS = 'FINISHED'
-    GROUP BY COMPETITION_CODE, SEASON_YEAR, HOME_TEAM_ID, HOME_TEAM_NAME
-),
-away_stats AS (
-    SELECT
-        COMPETITION_CODE,
-        SEASON_YEAR,
-        AWAY_TEAM_ID AS TEAM_ID,
-        AWAY_TEAM_NAME AS TEAM_NAME,
-        COUNT(*) AS AWAY_PLAYED,
-        SUM(CASE WHEN WINNER = 'AWAY_TEAM' THEN 1 ELSE 0 END) AS AWAY_WINS,
-        SUM(CASE WHEN WINNER = 'DRAW' THEN 1 ELSE 0 END) AS AWAY_DRAWS,
-        SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) AS AWAY_LOSSES,
-        SUM(AWAY_SCORE) AS AWAY_GOALS_FOR,
-        SUM(HOME_SCORE) AS AWAY_GOALS_AGAINST
-    FROM SILVER.MATCHES
-    WHERE STATUS = 'FINISHED'
-    GROUP BY COMPETITION_CODE, SEASON_YEAR, AWAY_TEAM_ID, AWAY_TEAM_NAME
-)
 SELECT
-    COALESCE(h.COMPETITION_CODE, a.COMPETITION_CODE) AS COMPETITION_CODE,
-    COALESCE(h.SEASON_YEAR, a.SEASON_YEAR) AS SEASON_YEAR,
-    COALESCE(h.TEAM_ID, a.TEAM_ID) AS TEAM_ID,
-    COALESCE(h.TEAM_NAME, a.TEAM_NAME) AS TEAM_NAME,
-    COALESCE(h.HOME_PLAYED, 0) AS HOME_PLAYED,
-    COALESCE(h.HOME_WINS, 0) AS HOME_WINS,
-    COALESCE(h.HOME_DRAWS, 0) AS HOME_DRAWS,
-    COALESCE(h.HOME_LOSSES, 0) AS HOME_LOSSES,
-    COALESCE(h.HOME_GOALS_FOR, 0) AS HOME_GOALS_FOR,
-    COALESCE(h.HOME_GOALS_AGAINST, 0) AS HOME_GOALS_AGAINST,
-    COALESCE(a.AWAY_PLAYED, 0) AS AWAY_PLAYED,
-    COALESCE(a.AWAY_WINS, 0) AS AWAY_WINS,
-    COALESCE(a.AWAY_DRAWS, 0) AS AWAY_DRAWS,
-    COALESCE(a.AWAY_LOSSES, 0) AS AWAY_LOSSES,
-    COALESCE(a.AWAY_GOALS_FOR, 0) AS AWAY_GOALS_FOR,
-    COALESCE(a.AWAY_GOALS_AGAINST, 0) AS AWAY_GOALS_AGAINST,
-    COALESCE(h.HOME_PLAYED, 0) + COALESCE(a.AWAY_PLAYED, 0) AS TOTAL_PLAYED,
-    COALESCE(h.HOME_WINS, 0) + COALESCE(a.AWAY_WINS, 0) AS TOTAL_WINS,
-    COALESCE(h.HOME_GOALS_FOR, 0) + COALESCE(a.AWAY_GOALS_FOR, 0) AS TOTAL_GOALS_FOR,
-    COALESCE(h.HOME_GOALS_AGAINST, 0) + COALESCE(a.AWAY_GOALS_AGAINST, 0) AS TOTAL_GOALS_AGAINST,
-    ROUND((COALESCE(h.HOME_WINS, 0) * 3 + COALESCE(h.HOME_DRAWS, 0)) / NULLIF(COALESCE(h.HOME_PLAYED, 0), 0), 2) AS HOME_PPG,
-    ROUND((COALESCE(a.AWAY_WINS, 0) * 3 + COALESCE(a.AWAY_DRAWS, 0)) / NULLIF(COALESCE(a.AWAY_PLAYED, 0), 0), 2) AS AWAY_PPG
-FROM home_stats h
-FULL OUTER JOIN away_stats a
-    ON h.TEAM_ID = a.TEAM_ID
-    AND h.COMPETITION_CODE = a.COMPETITION_CODE
-    AND h.SEASON_YEAR = a.SEASON_YEAR;
+    COMPETITION_CODE,
+    SEASON_YEAR,
+    TEAM_ID,
+    TEAM_NAME,
+    COUNT_IF(IS_HOME) AS HOME_PLAYED,
+    COUNT_IF(IS_HOME AND RESULT = 'W') AS HOME_WINS,
+    COUNT_IF(IS_HOME AND RESULT = 'D') AS HOME_DRAWS,
+    COUNT_IF(IS_HOME AND RESULT = 'L') AS HOME_LOSSES,
+    COALESCE(SUM(IFF(IS_HOME, GOALS_FOR, 0)), 0) AS HOME_GOALS_FOR,
+    COALESCE(SUM(IFF(IS_HOME, GOALS_AGAINST, 0)), 0) AS HOME_GOALS_AGAINST,
+    COUNT_IF(NOT IS_HOME) AS AWAY_PLAYED,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'W') AS AWAY_WINS,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'D') AS AWAY_DRAWS,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'L') AS AWAY_LOSSES,
+    COALESCE(SUM(IFF(IS_HOME, 0, GOALS_FOR)), 0) AS AWAY_GOALS_FOR,
+    COALESCE(SUM(IFF(IS_HOME, 0, GOALS_AGAINST)), 0) AS AWAY_GOALS_AGAINST,
+    COUNT(*) AS TOTAL_PLAYED,
+    COUNT_IF(RESULT = 'W') AS TOTAL_WINS,
+    COALESCE(SUM(GOALS_FOR), 0) AS TOTAL_GOALS_FOR,
+    COALESCE(SUM(GOALS_AGAINST), 0) AS TOTAL_GOALS_AGAINST,
+    ROUND(SUM(IFF(IS_HOME, POINTS, 0)) / NULLIF(COUNT_IF(IS_HOME), 0), 2) AS HOME_PPG,
+    ROUND(SUM(IFF(IS_HOME, 0, POINTS)) / NULLIF(COUNT_IF(NOT IS_HOME), 0), 2) AS AWAY_PPG
+FROM TEAM_MATCHES
+GROUP BY COMPETITION_CODE, SEASON_YEAR, TEAM_ID, TEAM_NAME;
 
--- 4. RECENT_MATCHES
+-- 5. RECENT_MATCHES
 CREATE OR REPLACE TABLE RECENT_MATCHES AS
 SELECT
     MATCH_ID,
@@ -151,7 +154,7 @@ FROM SILVER.MATCHES
 WHERE MATCH_DATE >= DATEADD('day', -30, CURRENT_DATE())
    OR STATUS IN ('SCHEDULED', 'TIMED', 'IN_PLAY', 'PAUSED');
 
--- 5. UPCOMING_FIXTURES
+-- 6. UPCOMING_FIXTURES
 CREATE OR REPLACE TABLE UPCOMING_FIXTURES AS
 SELECT
     MATCH_ID,
@@ -178,7 +181,7 @@ ORDER BY MATCH_DATE;
 -- ANALYTICS TABLES (using 8 new enrichment columns)
 -- ============================================
 
--- 6. MATCH_PATTERNS - Time and day patterns
+-- 7. MATCH_PATTERNS - Time and day patterns
 CREATE OR REPLACE TABLE MATCH_PATTERNS AS
 SELECT
     COMPETITION_CODE,
@@ -198,7 +201,7 @@ WHERE STATUS = 'FINISHED'
   AND MATCH_HOUR IS NOT NULL
 GROUP BY COMPETITION_CODE, DAY_OF_WEEK, MATCH_HOUR;
 
--- 7. REFEREE_STATS - Referee statistics
+-- 8. REFEREE_STATS - Referee statistics
 CREATE OR REPLACE TABLE REFEREE_STATS AS
 SELECT
     REFEREE_NAME,
@@ -216,7 +219,7 @@ WHERE STATUS = 'FINISHED'
 GROUP BY REFEREE_NAME, REFEREE_NATIONALITY, REFEREE_ID
 ORDER BY MATCHES_REFEREED DESC;
 
--- 8. GEOGRAPHIC_STATS - Area/Country statistics
+-- 9. GEOGRAPHIC_STATS - Area/Country statistics
 CREATE OR REPLACE TABLE GEOGRAPHIC_STATS AS
 SELECT
     AREA_NAME,
@@ -234,7 +237,7 @@ WHERE STATUS = 'FINISHED'
 GROUP BY AREA_NAME, AREA_CODE
 ORDER BY TOTAL_MATCHES DESC;
 
--- 9. ODDS_ANALYSIS - Average odds and best value by match
+-- 10. ODDS_ANALYSIS - Average odds and best value by match
 CREATE OR REPLACE TABLE ODDS_ANALYSIS AS
 SELECT
     o.GAME_ID,
@@ -242,6 +245,9 @@ SELECT
     o.COMMENCE_TIME,
     o.HOME_TEAM,
     o.AWAY_TEAM,
+    o.MATCH_ID,
+    o.HOME_TEAM_ID,
+    o.AWAY_TEAM_ID,
     COUNT(DISTINCT o.BOOKMAKER_KEY) AS NB_BOOKMAKERS,
     -- Average odds across all bookmakers
     ROUND(AVG(o.HOME_ODDS), 2) AS AVG_HOME_ODDS,
@@ -259,5 +265,6 @@ SELECT
     ROUND((1/AVG(o.HOME_ODDS) + 1/AVG(o.DRAW_ODDS) + 1/AVG(o.AWAY_ODDS) - 1) * 100, 2) AS BOOKMAKER_MARGIN_PCT,
     MAX(o.LAST_UPDATE) AS LAST_ODDS_UPDATE
 FROM SILVER.ODDS o
-GROUP BY o.GAME_ID, o.COMPETITION_CODE, o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM
+GROUP BY o.GAME_ID, o.COMPETITION_CODE, o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM,
+         o.MATCH_ID, o.HOME_TEAM_ID, o.AWAY_TEAM_ID
 ORDER BY o.COMMENCE_TIME DESC;
\ No newline at end of file
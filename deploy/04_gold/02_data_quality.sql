@@ -1,33 +1,289 @@
+-- ============================================
+-- SNOWGOAL - Data Quality (incremental checks)
+-- ============================================
+-- Checks are evaluated after each merge on the changed rows only: one stream
+-- per checked SILVER table gives the keys touched since the last run, the
+-- checks re-run on those keys (point lookups) and the per-key violations in
+-- COMMON.DATA_QUALITY_VIOLATIONS are replaced. Running counts are adjusted
+-- by the delta in GOLD.DATA_QUALITY_RESULTS (one row per check), and each run
+-- appends its outcome to GOLD.DATA_QUALITY_HISTORY.
+-- Called by: TASK_CHECK_DATA_QUALITY (after TASK_MERGE_TO_SILVER)
+--
+-- Streams, violations and results are (re)created together: SHOW_INITIAL_ROWS
+-- makes the first run evaluate every existing row.
+-- ============================================
+
 USE ROLE SNOWGOAL_ROLE;
 USE WAREHOUSE SNOWGOAL_WH_XS;
 USE DATABASE SNOWGOAL_DB;
 USE SCHEMA GOLD;
 
+-- ----------------------------------------
+-- CDC streams (one per checked table, dedicated to this consumer)
+-- ----------------------------------------
+CREATE OR REPLACE STREAM SILVER.STREAM_SILVER_MATCHES_DQ
+    ON TABLE SILVER.MATCHES
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding the data quality checks';
+
+CREATE OR REPLACE STREAM SILVER.STREAM_SILVER_ODDS_DQ
+    ON TABLE SILVER.ODDS
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding the data quality checks';
+
+CREATE OR REPLACE STREAM SILVER.STREAM_SILVER_STANDINGS_DQ
+    ON TABLE SILVER.STANDINGS
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding the data quality checks';
+
+-- ----------------------------------------
+-- State: one row per (check, key) currently in anomaly
+-- RECORD_KEY: MATCH_ID / GAME_ID|BOOKMAKER_KEY / TEAM_ID|COMPETITION_CODE|SEASON_YEAR
+-- ----------------------------------------
+CREATE OR REPLACE TABLE COMMON.DATA_QUALITY_VIOLATIONS (
+    TABLE_NAME VARCHAR(50),
+    CHECK_NAME VARCHAR(100),
+    RECORD_KEY VARCHAR(200),
+    ANOMALY_ROWS INT,                 -- rows of the key failing the check (1 for duplicates)
+    DETECTED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ----------------------------------------
+-- Results: running anomaly count per check (read by the dashboard)
+-- ----------------------------------------
+CREATE OR REPLACE TABLE GOLD.DATA_QUALITY_RESULTS (
+    TABLE_NAME VARCHAR(50),
+    CHECK_NAME VARCHAR(100) PRIMARY KEY,
+    ANOMALY_COUNT INT DEFAULT 0,
+    LAST_ROWS_CHECKED INT,            -- changed keys evaluated by the last run
+    LAST_NEW_ANOMALIES INT,
+    LAST_RESOLVED_ANOMALIES INT,
+    LAST_RUN_ID VARCHAR(100),
+    LAST_CHECKED_AT TIMESTAMP_NTZ
+);
+
+INSERT INTO GOLD.DATA_QUALITY_RESULTS (TABLE_NAME, CHECK_NAME, ANOMALY_COUNT) VALUES
+    ('SILVER.MATCHES', 'Duplicate Match IDs', 0),
+    ('SILVER.MATCHES', 'Negative Scores (Data Error)', 0),
+    ('SILVER.MATCHES', 'Identical Teams (Home = Away)', 0),
+    ('SILVER.ODDS', 'Invalid Odds (<= 1.0)', 0),
+    ('SILVER.STANDINGS', 'Inconsistent Points Calculation', 0);
+
+CREATE TABLE IF NOT EXISTS GOLD.DATA_QUALITY_HISTORY (
+    RUN_ID VARCHAR(100),
+    CHECKED_AT TIMESTAMP_NTZ,
+    TABLE_NAME VARCHAR(50),
+    CHECK_NAME VARCHAR(100),
+    ROWS_CHECKED INT,
+    NEW_ANOMALIES INT,
+    RESOLVED_ANOMALIES INT,
+    ANOMALY_COUNT INT                 -- running count after the run
+);
+
+-- Ancienne interface (même colonnes), désormais une simple lecture des résultats
 CREATE OR REPLACE VIEW GOLD.DATA_QUALITY_DASHBOARD AS
--- 1. Vérification des doublons
-SELECT 'SILVER.MATCHES' AS TABLE_NAME, 'Duplicate Match IDs' AS CHECK_NAME, COUNT(*) AS ANOMALY_COUNT
-FROM (SELECT MATCH_ID FROM SILVER.MATCHES GROUP BY MATCH_ID HAVING COUNT(*) > 1)
+SELECT TABLE_NAME, CHECK_NAME, ANOMALY_COUNT
+FROM GOLD.DATA_QUALITY_RESULTS;
+
+-- ----------------------------------------
+-- SP_CHECK_DATA_QUALITY - Incremental checks
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_CHECK_DATA_QUALITY()
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS 'DECLARE
+    run_id VARCHAR;
+    rows_checked INTEGER;
+    anomalies INTEGER;
+BEGIN
+    BEGIN
+        SELECT SYSTEM$TASK_RUNTIME_INFO(''CURRENT_TASK_GRAPH_RUN_GROUP_ID'') INTO :run_id;
+    EXCEPTION
+        WHEN OTHER THEN
+            run_id := NULL;
+    END;
+    run_id := COALESCE(run_id, UUID_STRING());
+
+    CREATE OR REPLACE TEMPORARY TABLE DQ_DIRTY_MATCHES (MATCH_ID INT);
+    CREATE OR REPLACE TEMPORARY TABLE DQ_DIRTY_ODDS (GAME_ID VARCHAR(100), BOOKMAKER_KEY VARCHAR(50));
+    CREATE OR REPLACE TEMPORARY TABLE DQ_DIRTY_STANDINGS (TEAM_ID INT, COMPETITION_CODE VARCHAR(10), SEASON_YEAR INT);
+    CREATE OR REPLACE TEMPORARY TABLE DQ_DIRTY_KEYS (TABLE_NAME VARCHAR(50), RECORD_KEY VARCHAR(200));
+    CREATE OR REPLACE TEMPORARY TABLE DQ_NEW LIKE COMMON.DATA_QUALITY_VIOLATIONS;
+    CREATE OR REPLACE TEMPORARY TABLE DQ_RUN (
+        TABLE_NAME VARCHAR(50),
+        CHECK_NAME VARCHAR(100),
+        ROWS_CHECKED INT,
+        NEW_ANOMALIES INT,
+        RESOLVED_ANOMALIES INT,
+        DELTA_ROWS INT
+    );
+
+    -- Une seule transaction: si un check échoue, les streams ne sont pas consommés
+    BEGIN TRANSACTION;
+
+    ------------------------------------------------------------------------
+    -- 1. CHANGED KEYS (consumes the streams; deleted keys included)
+    ------------------------------------------------------------------------
+    INSERT INTO DQ_DIRTY_MATCHES
+    SELECT DISTINCT MATCH_ID FROM SILVER.STREAM_SILVER_MATCHES_DQ WHERE MATCH_ID IS NOT NULL;
+
+    INSERT INTO DQ_DIRTY_ODDS
+    SELECT DISTINCT GAME_ID, BOOKMAKER_KEY FROM SILVER.STREAM_SILVER_ODDS_DQ;
+
+    INSERT INTO DQ_DIRTY_STANDINGS
+    SELECT DISTINCT TEAM_ID, COMPETITION_CODE, SEASON_YEAR FROM SILVER.STREAM_SILVER_STANDINGS_DQ;
+
+    INSERT INTO DQ_DIRTY_KEYS
+    SELECT ''SILVER.MATCHES'', MATCH_ID::VARCHAR FROM DQ_DIRTY_MATCHES
+    UNION ALL
+    SELECT ''SILVER.ODDS'', COALESCE(GAME_ID, '''') || ''|'' || COALESCE(BOOKMAKER_KEY, '''') FROM DQ_DIRTY_ODDS
+    UNION ALL
+    SELECT ''SILVER.STANDINGS'', COALESCE(TEAM_ID::VARCHAR, '''') || ''|'' || COALESCE(COMPETITION_CODE, '''') || ''|'' || COALESCE(SEASON_YEAR::VARCHAR, '''')
+    FROM DQ_DIRTY_STANDINGS;
+
+    SELECT COUNT(*) INTO :rows_checked FROM DQ_DIRTY_KEYS;
+
+    ------------------------------------------------------------------------
+    -- 2. CHECKS ON THE CHANGED KEYS ONLY
+    ------------------------------------------------------------------------
+    INSERT INTO DQ_NEW (TABLE_NAME, CHECK_NAME, RECORD_KEY, ANOMALY_ROWS)
+    -- 1. Vérification des doublons
+    SELECT ''SILVER.MATCHES'', ''Duplicate Match IDs'', m.MATCH_ID::VARCHAR, 1
+    FROM SILVER.MATCHES m
+    JOIN DQ_DIRTY_MATCHES d ON d.MATCH_ID = m.MATCH_ID
+    GROUP BY m.MATCH_ID
+    HAVING COUNT(*) > 1
+
+    UNION ALL
+
+    -- 2. Vérification des scores aberrants
+    SELECT ''SILVER.MATCHES'', ''Negative Scores (Data Error)'', m.MATCH_ID::VARCHAR, COUNT(*)
+    FROM SILVER.MATCHES m
+    JOIN DQ_DIRTY_MATCHES d ON d.MATCH_ID = m.MATCH_ID
+    WHERE m.HOME_SCORE < 0 OR m.AWAY_SCORE < 0
+    GROUP BY m.MATCH_ID
+
+    UNION ALL
+
+    -- 3. Vérification de cohérence
+    SELECT ''SILVER.MATCHES'', ''Identical Teams (Home = Away)'', m.MATCH_ID::VARCHAR, COUNT(*)
+    FROM SILVER.MATCHES m
+    JOIN DQ_DIRTY_MATCHES d ON d.MATCH_ID = m.MATCH_ID
+    WHERE m.HOME_TEAM_ID = m.AWAY_TEAM_ID
+    GROUP BY m.MATCH_ID
+
+    UNION ALL
+
+    -- 4. Vérification des cotes
+    SELECT ''SILVER.ODDS'', ''Invalid Odds (<= 1.0)'',
+           COALESCE(o.GAME_ID, '''') || ''|'' || COALESCE(o.BOOKMAKER_KEY, ''''), COUNT(*)
+    FROM SILVER.ODDS o
+    JOIN DQ_DIRTY_ODDS d ON d.GAME_ID = o.GAME_ID AND d.BOOKMAKER_KEY = o.BOOKMAKER_KEY
+    WHERE o.HOME_ODDS <= 1 OR o.DRAW_ODDS <= 1 OR o.AWAY_ODDS <= 1
+    GROUP BY o.GAME_ID, o.BOOKMAKER_KEY
+
+    UNION ALL
+
+    -- 5. Vérification des points au classement
+    SELECT ''SILVER.STANDINGS'', ''Inconsistent Points Calculation'',
+           COALESCE(s.TEAM_ID::VARCHAR, '''') || ''|'' || COALESCE(s.COMPETITION_CODE, '''') || ''|'' || COALESCE(s.SEASON_YEAR::VARCHAR, ''''),
+           COUNT(*)
+    FROM SILVER.STANDINGS s
+    JOIN DQ_DIRTY_STANDINGS d
+        ON d.TEAM_ID = s.TEAM_ID AND d.COMPETITION_CODE = s.COMPETITION_CODE AND d.SEASON_YEAR = s.SEASON_YEAR
+    WHERE (s.WON * 3 + s.DRAW) != s.POINTS
+    GROUP BY s.TEAM_ID, s.COMPETITION_CODE, s.SEASON_YEAR;
+
+    ------------------------------------------------------------------------
+    -- 3. DELTA PER CHECK (previous vs new violations of the changed keys)
+    ------------------------------------------------------------------------
+    INSERT INTO DQ_RUN
+    WITH previous AS (
+        SELECT v.CHECK_NAME, v.RECORD_KEY, v.ANOMALY_ROWS
+        FROM COMMON.DATA_QUALITY_VIOLATIONS v
+        JOIN DQ_DIRTY_KEYS k ON k.TABLE_NAME = v.TABLE_NAME AND k.RECORD_KEY = v.RECORD_KEY
+    ),
+    diff AS (
+        SELECT
+            COALESCE(n.CHECK_NAME, p.CHECK_NAME) AS CHECK_NAME,
+            p.ANOMALY_ROWS AS OLD_ROWS,
+            n.ANOMALY_ROWS AS NEW_ROWS
+        FROM previous p
+        FULL OUTER JOIN DQ_NEW n ON n.CHECK_NAME = p.CHECK_NAME AND n.RECORD_KEY = p.RECORD_KEY
+    ),
+    checked AS (
+        SELECT TABLE_NAME, COUNT(*) AS ROWS_CHECKED FROM DQ_DIRTY_KEYS GROUP BY TABLE_NAME
+    )
+    SELECT
+        r.TABLE_NAME,
+        r.CHECK_NAME,
+        COALESCE(ANY_VALUE(c.ROWS_CHECKED), 0),
+        COUNT_IF(d.NEW_ROWS IS NOT NULL AND d.OLD_ROWS IS NULL),
+        COUNT_IF(d.OLD_ROWS IS NOT NULL AND d.NEW_ROWS IS NULL),
+        COALESCE(SUM(COALESCE(d.NEW_ROWS, 0) - COALESCE(d.OLD_ROWS, 0)), 0)
+    FROM GOLD.DATA_QUALITY_RESULTS r
+    LEFT JOIN diff d ON d.CHECK_NAME = r.CHECK_NAME
+    LEFT JOIN checked c ON c.TABLE_NAME = r.TABLE_NAME
+    GROUP BY r.TABLE_NAME, r.CHECK_NAME;
+
+    ------------------------------------------------------------------------
+    -- 4. APPLY: violations of the changed keys, running counts, history
+    ------------------------------------------------------------------------
+    DELETE FROM COMMON.DATA_QUALITY_VIOLATIONS v
+    USING DQ_DIRTY_KEYS k
+    WHERE v.TABLE_NAME = k.TABLE_NAME
+      AND v.RECORD_KEY = k.RECORD_KEY;
+
+    INSERT INTO COMMON.DATA_QUALITY_VIOLATIONS (TABLE_NAME, CHECK_NAME, RECORD_KEY, ANOMALY_ROWS)
+    SELECT TABLE_NAME, CHECK_NAME, RECORD_KEY, ANOMALY_ROWS FROM DQ_NEW;
 
-UNION ALL
+    UPDATE GOLD.DATA_QUALITY_RESULTS r
+    SET ANOMALY_COUNT = r.ANOMALY_COUNT + x.DELTA_ROWS,
+        LAST_ROWS_CHECKED = x.ROWS_CHECKED,
+        LAST_NEW_ANOMALIES = x.NEW_ANOMALIES,
+        LAST_RESOLVED_ANOMALIES = x.RESOLVED_ANOMALIES,
+        LAST_RUN_ID = :run_id,
+        LAST_CHECKED_AT = CURRENT_TIMESTAMP()
+    FROM DQ_RUN x
+    WHERE x.CHECK_NAME = r.CHECK_NAME;
 
--- 2. Vérification des scores aberrants
-SELECT 'SILVER.MATCHES', 'Negative Scores (Data Error)', COUNT(*)
-FROM SILVER.MATCHES WHERE HOME_SCORE < 0 OR AWAY_SCORE < 0
+    INSERT INTO GOLD.DATA_QUALITY_HISTORY
+    SELECT :run_id, CURRENT_TIMESTAMP(), r.TABLE_NAME, r.CHECK_NAME,
+           x.ROWS_CHECKED, x.NEW_ANOMALIES, x.RESOLVED_ANOMALIES, r.ANOMALY_COUNT
+    FROM GOLD.DATA_QUALITY_RESULTS r
+    JOIN DQ_RUN x ON x.CHECK_NAME = r.CHECK_NAME;
 
-UNION ALL
+    COMMIT;
 
--- 3. Vérification de cohérence
-SELECT 'SILVER.MATCHES', 'Identical Teams (Home = Away)', COUNT(*)
-FROM SILVER.MATCHES WHERE HOME_TEAM_ID = AWAY_TEAM_ID
+    ------------------------------------------------------------------------
+    -- 5. LOGGING
+    ------------------------------------------------------------------------
+    INSERT INTO COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE)
+    SELECT
+        ''WARNING'',
+        ''DATA_QUALITY'',
+        ''Anomalie détectée : '' || CHECK_NAME || '' ('' || ANOMALY_COUNT || '' lignes)''
+    FROM GOLD.DATA_QUALITY_RESULTS
+    WHERE ANOMALY_COUNT > 0;
 
-UNION ALL
+    SELECT COALESCE(SUM(ANOMALY_COUNT), 0) INTO :anomalies FROM GOLD.DATA_QUALITY_RESULTS;
 
--- 4. Vérification des cotes (Correction ici : HOME_ODDS et AWAY_ODDS)
-SELECT 'SILVER.ODDS', 'Invalid Odds (<= 1.0)', COUNT(*)
-FROM SILVER.ODDS WHERE HOME_ODDS <= 1 OR DRAW_ODDS <= 1 OR AWAY_ODDS <= 1
+    INSERT INTO COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, AFFECTED_ROWS)
+    SELECT ''INFO'', ''DATA_QUALITY'',
+           ''Checks evaluated on '' || :rows_checked || '' changed keys, '' || :anomalies || '' anomalies'',
+           :rows_checked;
 
-UNION ALL
+    RETURN ''DATA QUALITY CHECKED: '' || rows_checked || '' changed keys, '' || anomalies || '' anomalies'';
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        RAISE;
+END';
 
--- 5. Vérification des points au classement
-SELECT 'SILVER.STANDINGS', 'Inconsistent Points Calculation', COUNT(*)
-FROM SILVER.STANDINGS WHERE (WON * 3 + DRAW) != POINTS;
\ No newline at end of file
+-- Manual execution for testing:
+-- CALL COMMON.SP_CHECK_DATA_QUALITY();
+-- SELECT * FROM GOLD.DATA_QUALITY_RESULTS;
@@ -0,0 +1,175 @@
+-- ============================================
+-- SNOWGOAL - Rolling Team Form (GOLD.TEAM_FORM)
+-- ============================================
+-- Precomputed form per team, competition and window (last N matches /
+-- last N days, overall + home/away splits). Windows are configured in
+-- COMMON.FORM_WINDOWS. Only teams touched by newly finished matches (or
+-- with a match that aged out of a day window) are recomputed on each run.
+-- Requires: 04_gold/01_tables.sql (GOLD.TEAM_MATCHES)
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+-- ----------------------------------------
+-- Window configuration
+-- WINDOW_TYPE: 'MATCHES' (last N matches) or 'DAYS' (last N days)
+-- VENUE: 'ALL', 'HOME' or 'AWAY'
+-- ----------------------------------------
+CREATE OR REPLACE TABLE COMMON.FORM_WINDOWS (
+    WINDOW_NAME VARCHAR(30) PRIMARY KEY,
+    WINDOW_TYPE VARCHAR(10),
+    WINDOW_SIZE INT,
+    VENUE VARCHAR(10)
+);
+
+INSERT INTO COMMON.FORM_WINDOWS (WINDOW_NAME, WINDOW_TYPE, WINDOW_SIZE, VENUE) VALUES
+    ('LAST_5', 'MATCHES', 5, 'ALL'),
+    ('LAST_10', 'MATCHES', 10, 'ALL'),
+    ('LAST_30_DAYS', 'DAYS', 30, 'ALL'),
+    ('LAST_90_DAYS', 'DAYS', 90, 'ALL'),
+    ('HOME_LAST_5', 'MATCHES', 5, 'HOME'),
+    ('HOME_LAST_10', 'MATCHES', 10, 'HOME'),
+    ('HOME_LAST_30_DAYS', 'DAYS', 30, 'HOME'),
+    ('HOME_LAST_90_DAYS', 'DAYS', 90, 'HOME'),
+    ('AWAY_LAST_5', 'MATCHES', 5, 'AWAY'),
+    ('AWAY_LAST_10', 'MATCHES', 10, 'AWAY'),
+    ('AWAY_LAST_30_DAYS', 'DAYS', 30, 'AWAY'),
+    ('AWAY_LAST_90_DAYS', 'DAYS', 90, 'AWAY');
+
+-- ----------------------------------------
+-- TEAM_FORM - One row per (team, competition, window)
+-- ----------------------------------------
+CREATE OR REPLACE TABLE TEAM_FORM (
+    TEAM_ID INT,
+    COMPETITION_CODE VARCHAR(10),
+    WINDOW_NAME VARCHAR(30),
+    TEAM_NAME VARCHAR(100),
+    PLAYED INT,
+    WON INT,
+    DRAWN INT,
+    LOST INT,
+    GOALS_FOR INT,
+    GOALS_AGAINST INT,
+    POINTS INT,
+    PPG FLOAT,
+    AVG_GOALS_FOR FLOAT,
+    AVG_GOALS_AGAINST FLOAT,
+    FORM VARCHAR(200),
+    LAST_MATCH_DATE TIMESTAMP_NTZ,
+    AS_OF_DATE DATE,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (TEAM_ID, COMPETITION_CODE, WINDOW_NAME)
+);
+
+-- Stream sur TEAM_MATCHES (SHOW_INITIAL_ROWS = TRUE: le premier run calcule tout l'historique)
+CREATE OR REPLACE STREAM STREAM_TEAM_MATCHES_FORM
+    ON TABLE TEAM_MATCHES
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding GOLD.TEAM_FORM';
+
+-- ----------------------------------------
+-- SP_REFRESH_TEAM_FORM - Incremental refresh
+-- Called by: TASK_REFRESH_TEAM_FORM (after TASK_REFRESH_TEAM_MATCHES)
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_REFRESH_TEAM_FORM()
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS 'BEGIN
+    ------------------------------------------------------------------------
+    -- 1. DIRTY TEAMS: new/changed team matches (consumes the stream)
+    --    + teams with a match that left a day-based window since the last refresh
+    ------------------------------------------------------------------------
+    CREATE OR REPLACE TEMPORARY TABLE TEAM_FORM_DIRTY (
+        TEAM_ID INT,
+        COMPETITION_CODE VARCHAR(10)
+    );
+
+    -- Une seule transaction: si le recalcul échoue, le stream n''est pas consommé
+    BEGIN TRANSACTION;
+
+    INSERT INTO TEAM_FORM_DIRTY
+    SELECT DISTINCT TEAM_ID, COMPETITION_CODE
+    FROM GOLD.STREAM_TEAM_MATCHES_FORM
+    WHERE TEAM_ID IS NOT NULL;
+
+    -- Match dans la fenêtre au dernier calcul (AS_OF_DATE) mais plus aujourd''hui
+    INSERT INTO TEAM_FORM_DIRTY
+    SELECT DISTINCT f.TEAM_ID, f.COMPETITION_CODE
+    FROM GOLD.TEAM_FORM f
+    JOIN COMMON.FORM_WINDOWS w
+        ON w.WINDOW_NAME = f.WINDOW_NAME
+       AND w.WINDOW_TYPE = ''DAYS''
+    JOIN GOLD.TEAM_MATCHES tm
+        ON tm.TEAM_ID = f.TEAM_ID
+       AND tm.COMPETITION_CODE = f.COMPETITION_CODE
+    WHERE f.AS_OF_DATE < CURRENT_DATE()
+      AND tm.MATCH_DATE >= DATEADD(''day'', -w.WINDOW_SIZE, f.AS_OF_DATE)
+      AND tm.MATCH_DATE < DATEADD(''day'', -w.WINDOW_SIZE, CURRENT_DATE());
+
+    ------------------------------------------------------------------------
+    -- 2. RECOMPUTE ALL WINDOWS FOR DIRTY TEAMS ONLY
+    ------------------------------------------------------------------------
+    DELETE FROM GOLD.TEAM_FORM f
+    USING (SELECT DISTINCT TEAM_ID, COMPETITION_CODE FROM TEAM_FORM_DIRTY) d
+    WHERE f.TEAM_ID = d.TEAM_ID
+      AND f.COMPETITION_CODE = d.COMPETITION_CODE;
+
+    INSERT INTO GOLD.TEAM_FORM
+    WITH ranked AS (
+        SELECT
+            tm.TEAM_ID,
+            tm.COMPETITION_CODE,
+            tm.TEAM_NAME,
+            tm.MATCH_DATE,
+            tm.IS_HOME,
+            tm.GOALS_FOR,
+            tm.GOALS_AGAINST,
+            tm.RESULT,
+            tm.POINTS,
+            ROW_NUMBER() OVER (PARTITION BY tm.TEAM_ID, tm.COMPETITION_CODE ORDER BY tm.MATCH_DATE DESC) AS RN_ALL,
+            ROW_NUMBER() OVER (PARTITION BY tm.TEAM_ID, tm.COMPETITION_CODE, tm.IS_HOME ORDER BY tm.MATCH_DATE DESC) AS RN_VENUE
+        FROM GOLD.TEAM_MATCHES tm
+        JOIN (SELECT DISTINCT TEAM_ID, COMPETITION_CODE FROM TEAM_FORM_DIRTY) d
+            ON tm.TEAM_ID = d.TEAM_ID
+           AND tm.COMPETITION_CODE = d.COMPETITION_CODE
+    )
+    SELECT
+        r.TEAM_ID,
+        r.COMPETITION_CODE,
+        w.WINDOW_NAME,
+        ANY_VALUE(r.TEAM_NAME) AS TEAM_NAME,
+        COUNT(*) AS PLAYED,
+        COUNT_IF(r.RESULT = ''W'') AS WON,
+        COUNT_IF(r.RESULT = ''D'') AS DRAWN,
+        COUNT_IF(r.RESULT = ''L'') AS LOST,
+        COALESCE(SUM(r.GOALS_FOR), 0) AS GOALS_FOR,
+        COALESCE(SUM(r.GOALS_AGAINST), 0) AS GOALS_AGAINST,
+        COALESCE(SUM(r.POINTS), 0) AS POINTS,
+        ROUND(COALESCE(SUM(r.POINTS), 0) / COUNT(*), 2) AS PPG,
+        ROUND(AVG(r.GOALS_FOR), 2) AS AVG_GOALS_FOR,
+        ROUND(AVG(r.GOALS_AGAINST), 2) AS AVG_GOALS_AGAINST,
+        LISTAGG(r.RESULT, '''') WITHIN GROUP (ORDER BY r.MATCH_DATE DESC) AS FORM,
+        MAX(r.MATCH_DATE) AS LAST_MATCH_DATE,
+        CURRENT_DATE() AS AS_OF_DATE,
+        CURRENT_TIMESTAMP() AS _UPDATED_AT
+    FROM ranked r
+    JOIN COMMON.FORM_WINDOWS w
+        ON (w.VENUE = ''ALL'' OR (w.VENUE = ''HOME'' AND r.IS_HOME) OR (w.VENUE = ''AWAY'' AND NOT r.IS_HOME))
+       AND (
+            (w.WINDOW_TYPE = ''MATCHES'' AND IFF(w.VENUE = ''ALL'', r.RN_ALL, r.RN_VENUE) <= w.WINDOW_SIZE)
+         OR (w.WINDOW_TYPE = ''DAYS'' AND r.MATCH_DATE >= DATEADD(''day'', -w.WINDOW_SIZE, CURRENT_DATE()))
+       )
+    GROUP BY r.TEAM_ID, r.COMPETITION_CODE, w.WINDOW_NAME;
+
+    COMMIT;
+
+    RETURN ''TEAM FORM REFRESHED'';
+END';
+
+-- Verify
+SELECT * FROM COMMON.FORM_WINDOWS ORDER BY VENUE, WINDOW_TYPE, WINDOW_SIZE;
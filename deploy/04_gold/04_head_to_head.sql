@@ -0,0 +1,168 @@
+-- ============================================
+-- SNOWGOAL - Head-to-Head Index (GOLD.HEAD_TO_HEAD)
+-- ============================================
+-- One row per canonical team pair (TEAM_A_ID < TEAM_B_ID) with counts,
+-- result distribution, goal averages and venue splits, plus the venue splits
+-- per competition and season (HEAD_TO_HEAD_SEASONS) for windowed lookups.
+-- Only pairs touched by new/changed team matches are recomputed on each run.
+-- Requires: 04_gold/01_tables.sql (GOLD.TEAM_MATCHES)
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+-- ----------------------------------------
+-- HEAD_TO_HEAD - Key lookup by (TEAM_A_ID, TEAM_B_ID)
+-- Lookup: TEAM_A_ID = LEAST(id1, id2) AND TEAM_B_ID = GREATEST(id1, id2)
+-- ----------------------------------------
+CREATE OR REPLACE TABLE HEAD_TO_HEAD (
+    TEAM_A_ID INT,
+    TEAM_B_ID INT,
+    TEAM_A_NAME VARCHAR(100),
+    TEAM_B_NAME VARCHAR(100),
+    MATCHES INT,
+    TEAM_A_WINS INT,
+    DRAWS INT,
+    TEAM_B_WINS INT,
+    TEAM_A_GOALS INT,
+    TEAM_B_GOALS INT,
+    TEAM_A_AVG_GOALS FLOAT,
+    TEAM_B_AVG_GOALS FLOAT,
+    AVG_TOTAL_GOALS FLOAT,
+    TEAM_A_HOME_MATCHES INT,
+    TEAM_A_HOME_WINS INT,
+    TEAM_A_HOME_DRAWS INT,
+    TEAM_B_HOME_MATCHES INT,
+    TEAM_B_HOME_WINS INT,
+    TEAM_B_HOME_DRAWS INT,
+    COMPETITIONS INT,
+    FIRST_MATCH_DATE TIMESTAMP_NTZ,
+    LAST_MATCH_DATE TIMESTAMP_NTZ,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (TEAM_A_ID, TEAM_B_ID)
+)
+CLUSTER BY (TEAM_A_ID, TEAM_B_ID);
+
+-- ----------------------------------------
+-- HEAD_TO_HEAD_SEASONS - Venue splits par compétition et saison
+-- Fenêtre glissante appliquée à la lecture (ex: value bets, 3 dernières saisons,
+-- même compétition): SUM(...) WHERE SEASON_YEAR >= YEAR(CURRENT_DATE()) - 2
+-- ----------------------------------------
+CREATE OR REPLACE TABLE HEAD_TO_HEAD_SEASONS (
+    TEAM_A_ID INT,
+    TEAM_B_ID INT,
+    COMPETITION_CODE VARCHAR(10),
+    SEASON_YEAR INT,
+    TEAM_A_HOME_MATCHES INT,
+    TEAM_A_HOME_WINS INT,
+    TEAM_A_HOME_DRAWS INT,
+    TEAM_B_HOME_MATCHES INT,
+    TEAM_B_HOME_WINS INT,
+    TEAM_B_HOME_DRAWS INT,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (TEAM_A_ID, TEAM_B_ID, COMPETITION_CODE, SEASON_YEAR)
+)
+CLUSTER BY (TEAM_A_ID, TEAM_B_ID);
+
+-- Stream sur TEAM_MATCHES (SHOW_INITIAL_ROWS = TRUE: le premier run indexe tout l'historique)
+CREATE OR REPLACE STREAM STREAM_TEAM_MATCHES_H2H
+    ON TABLE TEAM_MATCHES
+    APPEND_ONLY = FALSE
+    SHOW_INITIAL_ROWS = TRUE
+    COMMENT = 'CDC stream feeding GOLD.HEAD_TO_HEAD';
+
+-- ----------------------------------------
+-- SP_REFRESH_HEAD_TO_HEAD - Incremental refresh
+-- Called by: TASK_REFRESH_HEAD_TO_HEAD (after TASK_REFRESH_TEAM_MATCHES)
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_REFRESH_HEAD_TO_HEAD()
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS 'BEGIN
+    ------------------------------------------------------------------------
+    -- 1. DIRTY PAIRS (canonical order: TEAM_A_ID < TEAM_B_ID), consumes the stream
+    ------------------------------------------------------------------------
+    CREATE OR REPLACE TEMPORARY TABLE HEAD_TO_HEAD_DIRTY (
+        TEAM_A_ID INT,
+        TEAM_B_ID INT
+    );
+
+    -- Une seule transaction: si le recalcul échoue, le stream n''est pas consommé
+    BEGIN TRANSACTION;
+
+    INSERT INTO HEAD_TO_HEAD_DIRTY
+    SELECT DISTINCT LEAST(TEAM_ID, OPPONENT_ID), GREATEST(TEAM_ID, OPPONENT_ID)
+    FROM GOLD.STREAM_TEAM_MATCHES_H2H
+    WHERE TEAM_ID IS NOT NULL
+      AND OPPONENT_ID IS NOT NULL;
+
+    ------------------------------------------------------------------------
+    -- 2. RECOMPUTE DIRTY PAIRS FROM TEAM_A PERSPECTIVE (one row per match)
+    ------------------------------------------------------------------------
+    DELETE FROM GOLD.HEAD_TO_HEAD h
+    USING (SELECT DISTINCT TEAM_A_ID, TEAM_B_ID FROM HEAD_TO_HEAD_DIRTY) d
+    WHERE h.TEAM_A_ID = d.TEAM_A_ID
+      AND h.TEAM_B_ID = d.TEAM_B_ID;
+
+    INSERT INTO GOLD.HEAD_TO_HEAD
+    SELECT
+        tm.TEAM_ID AS TEAM_A_ID,
+        tm.OPPONENT_ID AS TEAM_B_ID,
+        MAX_BY(tm.TEAM_NAME, tm.MATCH_DATE) AS TEAM_A_NAME,
+        MAX_BY(tm.OPPONENT_NAME, tm.MATCH_DATE) AS TEAM_B_NAME,
+        COUNT(*) AS MATCHES,
+        COUNT_IF(tm.RESULT = ''W'') AS TEAM_A_WINS,
+        COUNT_IF(tm.RESULT = ''D'') AS DRAWS,
+        COUNT_IF(tm.RESULT = ''L'') AS TEAM_B_WINS,
+        COALESCE(SUM(tm.GOALS_FOR), 0) AS TEAM_A_GOALS,
+        COALESCE(SUM(tm.GOALS_AGAINST), 0) AS TEAM_B_GOALS,
+        ROUND(AVG(tm.GOALS_FOR), 2) AS TEAM_A_AVG_GOALS,
+        ROUND(AVG(tm.GOALS_AGAINST), 2) AS TEAM_B_AVG_GOALS,
+        ROUND(AVG(tm.GOALS_FOR + tm.GOALS_AGAINST), 2) AS AVG_TOTAL_GOALS,
+        COUNT_IF(tm.IS_HOME) AS TEAM_A_HOME_MATCHES,
+        COUNT_IF(tm.IS_HOME AND tm.RESULT = ''W'') AS TEAM_A_HOME_WINS,
+        COUNT_IF(tm.IS_HOME AND tm.RESULT = ''D'') AS TEAM_A_HOME_DRAWS,
+        COUNT_IF(NOT tm.IS_HOME) AS TEAM_B_HOME_MATCHES,
+        COUNT_IF(NOT tm.IS_HOME AND tm.RESULT = ''L'') AS TEAM_B_HOME_WINS,
+        COUNT_IF(NOT tm.IS_HOME AND tm.RESULT = ''D'') AS TEAM_B_HOME_DRAWS,
+        COUNT(DISTINCT tm.COMPETITION_CODE) AS COMPETITIONS,
+        MIN(tm.MATCH_DATE) AS FIRST_MATCH_DATE,
+        MAX(tm.MATCH_DATE) AS LAST_MATCH_DATE,
+        CURRENT_TIMESTAMP() AS _UPDATED_AT
+    FROM GOLD.TEAM_MATCHES tm
+    JOIN (SELECT DISTINCT TEAM_A_ID, TEAM_B_ID FROM HEAD_TO_HEAD_DIRTY) d
+        ON tm.TEAM_ID = d.TEAM_A_ID
+       AND tm.OPPONENT_ID = d.TEAM_B_ID
+    GROUP BY tm.TEAM_ID, tm.OPPONENT_ID;
+
+    DELETE FROM GOLD.HEAD_TO_HEAD_SEASONS h
+    USING (SELECT DISTINCT TEAM_A_ID, TEAM_B_ID FROM HEAD_TO_HEAD_DIRTY) d
+    WHERE h.TEAM_A_ID = d.TEAM_A_ID
+      AND h.TEAM_B_ID = d.TEAM_B_ID;
+
+    INSERT INTO GOLD.HEAD_TO_HEAD_SEASONS
+    SELECT
+        tm.TEAM_ID AS TEAM_A_ID,
+        tm.OPPONENT_ID AS TEAM_B_ID,
+        tm.COMPETITION_CODE,
+        tm.SEASON_YEAR,
+        COUNT_IF(tm.IS_HOME) AS TEAM_A_HOME_MATCHES,
+        COUNT_IF(tm.IS_HOME AND tm.RESULT = ''W'') AS TEAM_A_HOME_WINS,
+        COUNT_IF(tm.IS_HOME AND tm.RESULT = ''D'') AS TEAM_A_HOME_DRAWS,
+        COUNT_IF(NOT tm.IS_HOME) AS TEAM_B_HOME_MATCHES,
+        COUNT_IF(NOT tm.IS_HOME AND tm.RESULT = ''L'') AS TEAM_B_HOME_WINS,
+        COUNT_IF(NOT tm.IS_HOME AND tm.RESULT = ''D'') AS TEAM_B_HOME_DRAWS,
+        CURRENT_TIMESTAMP() AS _UPDATED_AT
+    FROM GOLD.TEAM_MATCHES tm
+    JOIN (SELECT DISTINCT TEAM_A_ID, TEAM_B_ID FROM HEAD_TO_HEAD_DIRTY) d
+        ON tm.TEAM_ID = d.TEAM_A_ID
+       AND tm.OPPONENT_ID = d.TEAM_B_ID
+    GROUP BY tm.TEAM_ID, tm.OPPONENT_ID, tm.COMPETITION_CODE, tm.SEASON_YEAR;
+
+    COMMIT;
+
+    RETURN ''HEAD TO HEAD REFRESHED'';
+END';
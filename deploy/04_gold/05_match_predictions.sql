@@ -0,0 +1,48 @@
+-- ============================================
+-- SNOWGOAL - Match Predictions (GOLD.MATCH_PREDICTIONS)
+-- ============================================
+-- Poisson / Dixon-Coles model fitted per competition on SILVER.MATCHES
+-- (snowpark/procedures/match_predictions.py). Every SCHEDULED/TIMED fixture
+-- is scored in one batched pass; rows of played matches keep their last
+-- pre-kickoff prediction.
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE TABLE IF NOT EXISTS MATCH_PREDICTIONS (
+    MATCH_ID INT PRIMARY KEY,
+    COMPETITION_CODE VARCHAR(10),
+    MATCH_DATE TIMESTAMP_NTZ,
+    HOME_TEAM_ID INT,
+    HOME_TEAM_NAME VARCHAR(100),
+    AWAY_TEAM_ID INT,
+    AWAY_TEAM_NAME VARCHAR(100),
+    EXP_HOME_GOALS FLOAT,
+    EXP_AWAY_GOALS FLOAT,
+    PROB_HOME_WIN FLOAT,
+    PROB_DRAW FLOAT,
+    PROB_AWAY_WIN FLOAT,
+    PROB_OVER_2_5 FLOAT,
+    PROB_BTTS FLOAT,
+    MOST_LIKELY_SCORE VARCHAR(10),
+    MODEL_RHO FLOAT,
+    HOME_ADVANTAGE FLOAT,
+    TRAINING_MATCHES INT,
+    MODEL_VERSION VARCHAR(20),
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (TO_DATE(MATCH_DATE));
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE PREDICT_MATCHES()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/match_predictions.py')
+HANDLER = 'match_predictions.main'
+COMMENT = 'Fits Dixon-Coles strengths per competition and scores all upcoming fixtures';
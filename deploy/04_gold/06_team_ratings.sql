@@ -0,0 +1,55 @@
+-- ============================================
+-- SNOWGOAL - Elo Team Ratings (GOLD.TEAM_RATINGS, GOLD.TEAM_RATING_HISTORY)
+-- ============================================
+-- snowpark/procedures/team_ratings.py
+-- Incremental mode: only matches newly FINISHED in SILVER.STREAM_SILVER_MATCHES_ELO.
+-- Full mode (CALL UPDATE_TEAM_RATINGS(TRUE)): replays all of SILVER.MATCHES,
+-- required after changing K_FACTOR / HOME_ADVANTAGE. Late or corrected
+-- results automatically fall back to a full replay.
+-- Requires: 03_silver/03_streams.sql
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+-- Rating courant, une ligne par équipe (toutes compétitions confondues)
+CREATE TABLE IF NOT EXISTS TEAM_RATINGS (
+    TEAM_ID INT PRIMARY KEY,
+    TEAM_NAME VARCHAR(100),
+    COMPETITION_CODE VARCHAR(10),
+    RATING FLOAT,
+    PEAK_RATING FLOAT,
+    MATCHES_RATED INT,
+    LAST_MATCH_DATE TIMESTAMP_NTZ,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- Historique: une ligne par équipe et par match noté
+CREATE TABLE IF NOT EXISTS TEAM_RATING_HISTORY (
+    MATCH_ID INT,
+    TEAM_ID INT,
+    COMPETITION_CODE VARCHAR(10),
+    MATCH_DATE TIMESTAMP_NTZ,
+    OPPONENT_ID INT,
+    IS_HOME BOOLEAN,
+    RATING_BEFORE FLOAT,
+    RATING_AFTER FLOAT,
+    EXPECTED_SCORE FLOAT,
+    ACTUAL_SCORE FLOAT,
+    _LOADED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (MATCH_ID, TEAM_ID)
+)
+CLUSTER BY (TEAM_ID, TO_DATE(MATCH_DATE));
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE UPDATE_TEAM_RATINGS(FULL_REFRESH BOOLEAN DEFAULT FALSE)
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/team_ratings.py')
+HANDLER = 'team_ratings.main'
+COMMENT = 'Elo ratings: incremental from SILVER stream, or full vectorised replay';
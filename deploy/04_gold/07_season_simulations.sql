@@ -0,0 +1,45 @@
+-- ============================================
+-- SNOWGOAL - Season Simulations (GOLD.SEASON_SIMULATIONS)
+-- ============================================
+-- Monte Carlo (100k seasons per league) over remaining fixtures of
+-- SILVER.MATCHES using GOLD.MATCH_PREDICTIONS probabilities
+-- (snowpark/procedures/season_simulator.py). LEAGUE competitions only.
+-- Runs once per night (00h DAG run); CALL SIMULATE_SEASONS(TRUE) forces a run.
+-- Requires: 04_gold/05_match_predictions.sql
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE TABLE IF NOT EXISTS SEASON_SIMULATIONS (
+    COMPETITION_CODE VARCHAR(10),
+    SEASON_YEAR INT,
+    TEAM_ID INT,
+    TEAM_NAME VARCHAR(100),
+    CURRENT_POSITION INT,
+    CURRENT_POINTS INT,
+    EXPECTED_POINTS FLOAT,
+    EXPECTED_POSITION FLOAT,
+    PROB_TITLE FLOAT,
+    PROB_TOP_4 FLOAT,
+    PROB_RELEGATION FLOAT,
+    POSITION_PROBS VARIANT,         -- [P(1er), P(2e), ...]
+    N_SIMULATIONS INT,
+    REMAINING_FIXTURES INT,
+    PREDICTED_FIXTURES INT,         -- fixtures with a MATCH_PREDICTIONS row (others: default probabilities)
+    SIMULATED_AT TIMESTAMP_NTZ,     -- Europe/Paris
+    PRIMARY KEY (COMPETITION_CODE, TEAM_ID)
+);
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE SIMULATE_SEASONS(FORCE BOOLEAN DEFAULT FALSE)
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/season_simulator.py')
+HANDLER = 'season_simulator.main'
+COMMENT = 'Monte Carlo title/top-4/relegation probabilities (process pool across leagues)';
@@ -0,0 +1,58 @@
+-- ============================================
+-- SNOWGOAL - Odds Backtesting (GOLD.BACKTEST_RESULTS)
+-- ============================================
+-- Replays closing odds (last SILVER.ODDS_HISTORY snapshot before kickoff)
+-- against SILVER.MATCHES results (snowpark/procedures/odds_backtest.py).
+-- Strategy grid: PROB_SOURCE (CONSENSUS / MODEL) x PRICE_MODE (BOOKMAKER /
+-- BEST / AVERAGE) x STAKING (FLAT / KELLY) x THRESHOLD (edge 0% -> 20%).
+-- CONSENSUS = margin-weighted Shin de-vig (snowpark/procedures/odds_consensus.py).
+-- Requires: 03_silver/01_tables.sql (ODDS_HISTORY), 04_gold/05_match_predictions.sql
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE TABLE IF NOT EXISTS BACKTEST_RESULTS (
+    PROB_SOURCE VARCHAR(20),
+    PRICE_MODE VARCHAR(20),
+    STAKING VARCHAR(20),
+    COMPETITION_CODE VARCHAR(10),   -- 'ALL' = toutes compétitions
+    BOOKMAKER VARCHAR(50),          -- 'ALL' = tous bookmakers, 'BEST' / 'AVERAGE' selon PRICE_MODE
+    THRESHOLD FLOAT,
+    N_BETS INT,
+    N_WON INT,
+    HIT_RATE FLOAT,
+    TOTAL_STAKED FLOAT,
+    PROFIT FLOAT,
+    ROI FLOAT,
+    MAX_DRAWDOWN FLOAT,
+    AVG_ODDS FLOAT,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- Backfill: dernières cotes connues des matchs déjà présents dans SILVER.ODDS (idempotent)
+INSERT INTO SILVER.ODDS_HISTORY (GAME_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM,
+                                 BOOKMAKER_KEY, BOOKMAKER_TITLE, HOME_ODDS, DRAW_ODDS, AWAY_ODDS, LAST_UPDATE)
+SELECT o.GAME_ID, o.COMPETITION_CODE, o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM,
+       o.BOOKMAKER_KEY, o.BOOKMAKER_TITLE, o.HOME_ODDS, o.DRAW_ODDS, o.AWAY_ODDS, o.LAST_UPDATE
+FROM SILVER.ODDS o
+WHERE NOT EXISTS (
+    SELECT 1 FROM SILVER.ODDS_HISTORY h
+    WHERE h.GAME_ID = o.GAME_ID
+      AND h.BOOKMAKER_KEY = o.BOOKMAKER_KEY
+      AND h.LAST_UPDATE = o.LAST_UPDATE
+);
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE BACKTEST_ODDS()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/odds_backtest.py',
+           '@SNOWGOAL_DB.RAW.PYTHON_CODE/odds_consensus.py')
+HANDLER = 'odds_backtest.main'
+COMMENT = 'Vectorised odds backtest: ROI, hit rate and drawdown per strategy, competition and bookmaker';
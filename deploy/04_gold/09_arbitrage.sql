@@ -0,0 +1,37 @@
+-- ============================================
+-- SNOWGOAL - Arbitrage Scanner (GOLD.ARBITRAGE_OPPORTUNITIES)
+-- ============================================
+-- One row per upcoming game: best price per outcome across bookmakers
+-- (MAX_BY picks the bookmaker), implied sum of best prices and stake split.
+-- IS_SUREBET = 1/best_home + 1/best_draw + 1/best_away < 1.
+-- Refreshed by TASK_SCAN_ARBITRAGE right after each odds merge.
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE OR REPLACE TABLE ARBITRAGE_OPPORTUNITIES (
+    GAME_ID VARCHAR(100) PRIMARY KEY,
+    MATCH_ID INT,
+    COMPETITION_CODE VARCHAR(10),
+    COMMENCE_TIME TIMESTAMP_NTZ,
+    HOME_TEAM VARCHAR(100),
+    AWAY_TEAM VARCHAR(100),
+    NB_BOOKMAKERS INT,
+    BEST_HOME_ODDS FLOAT,
+    BEST_HOME_BOOKMAKER VARCHAR(100),
+    BEST_DRAW_ODDS FLOAT,
+    BEST_DRAW_BOOKMAKER VARCHAR(100),
+    BEST_AWAY_ODDS FLOAT,
+    BEST_AWAY_BOOKMAKER VARCHAR(100),
+    IMPLIED_SUM FLOAT,              -- 1/best_home + 1/best_draw + 1/best_away
+    IS_SUREBET BOOLEAN,
+    GUARANTEED_RETURN_PCT FLOAT,    -- (1 / IMPLIED_SUM - 1) * 100, négatif si pas d'arbitrage
+    STAKE_HOME_PCT FLOAT,           -- répartition de la mise pour un gain identique quel que soit le résultat
+    STAKE_DRAW_PCT FLOAT,
+    STAKE_AWAY_PCT FLOAT,
+    LAST_ODDS_UPDATE TIMESTAMP_NTZ,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
@@ -0,0 +1,57 @@
+-- ============================================
+-- SNOWGOAL - De-vigged Consensus (GOLD.ODDS_CONSENSUS)
+-- ============================================
+-- One row per upcoming game: each bookmaker's 1X2 prices are de-vigged
+-- (PROPORTIONAL, SHIN, POWER - snowpark/procedures/odds_consensus.py), then
+-- averaged with weight 1 / margin (sharper books count more).
+-- CONSENSUS_* = SHIN consensus, used by the dashboard instead of the
+-- margin-biased IMPLIED_*_PROB of ODDS_ANALYSIS.
+-- Refreshed by TASK_COMPUTE_ODDS_CONSENSUS right after each odds merge;
+-- rows freeze at kickoff (closing consensus).
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE OR REPLACE TABLE ODDS_CONSENSUS (
+    GAME_ID VARCHAR(100) PRIMARY KEY,
+    MATCH_ID INT,
+    COMPETITION_CODE VARCHAR(10),
+    COMMENCE_TIME TIMESTAMP_NTZ,
+    HOME_TEAM VARCHAR(100),
+    AWAY_TEAM VARCHAR(100),
+    NB_BOOKMAKERS INT,
+    LAST_ODDS_UPDATE TIMESTAMP_NTZ,
+    PROP_HOME_PROB FLOAT,
+    PROP_DRAW_PROB FLOAT,
+    PROP_AWAY_PROB FLOAT,
+    SHIN_HOME_PROB FLOAT,
+    SHIN_DRAW_PROB FLOAT,
+    SHIN_AWAY_PROB FLOAT,
+    POWER_HOME_PROB FLOAT,
+    POWER_DRAW_PROB FLOAT,
+    POWER_AWAY_PROB FLOAT,
+    AVG_MARGIN_PCT FLOAT,           -- marge moyenne des bookmakers (somme des 1/cote - 1)
+    SHIN_Z FLOAT,                   -- part estimée de parieurs initiés (moyenne des bookmakers)
+    CONSENSUS_HOME_PROB FLOAT,
+    CONSENSUS_DRAW_PROB FLOAT,
+    CONSENSUS_AWAY_PROB FLOAT,
+    FAIR_HOME_ODDS FLOAT,           -- 1 / CONSENSUS_*_PROB
+    FAIR_DRAW_ODDS FLOAT,
+    FAIR_AWAY_ODDS FLOAT,
+    CONSENSUS_METHOD VARCHAR(20),
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE COMPUTE_ODDS_CONSENSUS()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/odds_consensus.py')
+HANDLER = 'odds_consensus.main'
+COMMENT = 'De-vigs bookmaker prices (proportional / Shin / power) into a margin-weighted consensus per game';
@@ -0,0 +1,49 @@
+-- ============================================
+-- SNOWGOAL - Dashboard Bundle (warehouse-free Streamlit Cloud mode)
+-- ============================================
+-- After each pipeline run, EXPORT_GOLD_BUNDLE() unloads every GOLD table/view,
+-- the SILVER tables read by the pages and the upcoming odds to
+--   <stage>/<version>/<SCHEMA>/<TABLE>.parquet  (Snappy)
+-- then overwrites <stage>/latest.json (manifest, written last).
+-- The public app reads the bundle over HTTPS ([bundle] url in secrets.toml)
+-- and never opens a Snowflake connection (streamlit/connection.py).
+-- Called by the TASK_PUBLISH_DATA_VERSION finalizer (05_tasks/01_tasks.sql).
+--
+-- Replace YOUR_BUCKET / YOUR_AWS_ACCOUNT_ID, then give the prefix public read
+-- access (bucket policy or CDN) for the Streamlit Cloud app.
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE STORAGE INTEGRATION IF NOT EXISTS DASHBOARD_BUNDLE_INTEGRATION
+    TYPE = EXTERNAL_STAGE
+    STORAGE_PROVIDER = 'S3'
+    ENABLED = TRUE
+    STORAGE_AWS_ROLE_ARN = 'arn:aws:iam::YOUR_AWS_ACCOUNT_ID:role/snowgoal-dashboard-bundle'
+    STORAGE_ALLOWED_LOCATIONS = ('s3://YOUR_BUCKET/snowgoal/bundle/')
+    COMMENT = 'Write access to the public dashboard bundle prefix';
+
+-- DESC INTEGRATION DASHBOARD_BUNDLE_INTEGRATION; -> trust policy of the AWS role
+
+CREATE STAGE IF NOT EXISTS DASHBOARD_BUNDLE
+    URL = 's3://YOUR_BUCKET/snowgoal/bundle/'
+    STORAGE_INTEGRATION = DASHBOARD_BUNDLE_INTEGRATION
+    COMMENT = 'Versioned Parquet export of GOLD for the public dashboard';
+
+USE SCHEMA COMMON;
+
+CREATE OR REPLACE PROCEDURE EXPORT_GOLD_BUNDLE()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/export_bundle.py')
+HANDLER = 'export_bundle.main'
+COMMENT = 'Exports GOLD (+ dashboard SILVER tables) to a versioned Parquet bundle with a latest.json manifest';
+
+-- Verify
+-- CALL EXPORT_GOLD_BUNDLE();
+-- LIST @SNOWGOAL_DB.GOLD.DASHBOARD_BUNDLE;
@@ -0,0 +1,199 @@
+-- ============================================
+-- SNOWGOAL - Cost Attribution (GOLD.COST_ATTRIBUTION)
+-- ============================================
+-- Everything runs on SNOWGOAL_WH_XS: credits are split per pipeline stage /
+-- task and per dashboard page using the JSON QUERY_TAG of each statement
+--   pipeline  : {"app":"snowgoal-pipeline","stage":"...","task":"TASK_..."}
+--               (QUERY_TAG set on every task in 05_tasks/01_tasks.sql, inherited
+--               by the statements of the procedures they call)
+--   dashboard : {"app":"snowgoal-dashboard","page":"...","section":"..."}
+--               (streamlit/connection.py, every run_query / execute_query)
+--
+-- Per UTC hour:
+--   CREDITS_COMPUTE : ACCOUNT_USAGE.QUERY_ATTRIBUTION_HISTORY (per query)
+--   CREDITS_IDLE    : metered compute (WAREHOUSE_METERING_HISTORY) not attributed
+--                     to any query (auto-suspend, resume), spread proportionally
+--                     to the compute of the hour; hours without any attributed
+--                     query go to the 'IDLE' row
+-- so that SUM(CREDITS_COMPUTE + CREDITS_IDLE) per day matches the warehouse bill.
+--
+-- ACCOUNT_USAGE latency is up to ~8h: the last LOOKBACK_DAYS full days are
+-- recomputed on each run (TASK_REFRESH_COST_ATTRIBUTION, daily).
+-- Requires: IMPORTED PRIVILEGES on database SNOWFLAKE (00_init/00_role.sql)
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE TABLE IF NOT EXISTS COST_ATTRIBUTION (
+    USAGE_DATE DATE,                     -- UTC
+    WAREHOUSE_NAME VARCHAR(100),
+    SOURCE VARCHAR(20),                  -- 'PIPELINE', 'DASHBOARD', 'UNTAGGED', 'IDLE'
+    STAGE VARCHAR(50),                   -- pipeline stage ('INGESTION', 'MERGE', ...) / 'DASHBOARD'
+    OBJECT_NAME VARCHAR(200),            -- task name / dashboard page
+    QUERY_COUNT NUMBER(12,0),
+    EXECUTION_MS NUMBER(18,0),
+    CREDITS_COMPUTE NUMBER(18,9),
+    CREDITS_IDLE NUMBER(18,9),
+    CREDITS_TOTAL NUMBER(18,9),          -- compute + idle (billed warehouse credits)
+    CREDITS_CLOUD_SERVICES NUMBER(18,9), -- before the daily 10% adjustment
+    PCT_OF_WAREHOUSE NUMBER(6,2),        -- share of the day's warehouse credits
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ----------------------------------------
+-- SP_REFRESH_COST_ATTRIBUTION
+-- Called by: TASK_REFRESH_COST_ATTRIBUTION (daily, outside the DAG)
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_REFRESH_COST_ATTRIBUTION(LOOKBACK_DAYS INTEGER DEFAULT 3)
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS 'DECLARE
+    wh VARCHAR DEFAULT ''SNOWGOAL_WH_XS'';
+    window_end DATE DEFAULT CONVERT_TIMEZONE(''UTC'', CURRENT_TIMESTAMP())::DATE;
+    window_start DATE;
+    rows_written INTEGER DEFAULT 0;
+BEGIN
+    window_start := DATEADD(''day'', -LOOKBACK_DAYS, window_end);
+
+    -- Une seule transaction: si l''INSERT échoue (ACCOUNT_USAGE), la fenêtre n''est pas perdue
+    BEGIN TRANSACTION;
+
+    DELETE FROM GOLD.COST_ATTRIBUTION
+    WHERE USAGE_DATE >= :window_start
+      AND USAGE_DATE < :window_end;
+
+    INSERT INTO GOLD.COST_ATTRIBUTION (
+        USAGE_DATE, WAREHOUSE_NAME, SOURCE, STAGE, OBJECT_NAME, QUERY_COUNT, EXECUTION_MS,
+        CREDITS_COMPUTE, CREDITS_IDLE, CREDITS_TOTAL, CREDITS_CLOUD_SERVICES, PCT_OF_WAREHOUSE
+    )
+    WITH queries AS (
+        SELECT
+            QUERY_ID,
+            DATE_TRUNC(''hour'', CONVERT_TIMEZONE(''UTC'', START_TIME))::TIMESTAMP_NTZ AS USAGE_HOUR,
+            TRY_PARSE_JSON(QUERY_TAG) AS TAG,
+            EXECUTION_TIME,
+            CREDITS_USED_CLOUD_SERVICES
+        FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY
+        WHERE WAREHOUSE_NAME = :wh
+          AND START_TIME >= DATEADD(''day'', -1, :window_start::TIMESTAMP_NTZ)
+          AND CONVERT_TIMEZONE(''UTC'', START_TIME)::DATE >= :window_start
+          AND CONVERT_TIMEZONE(''UTC'', START_TIME)::DATE < :window_end
+    ),
+    attributed AS (
+        SELECT QUERY_ID, SUM(CREDITS_ATTRIBUTED_COMPUTE) AS CREDITS_COMPUTE
+        FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_ATTRIBUTION_HISTORY
+        WHERE WAREHOUSE_NAME = :wh
+          AND START_TIME >= DATEADD(''day'', -1, :window_start::TIMESTAMP_NTZ)
+        GROUP BY QUERY_ID
+    ),
+    buckets AS (
+        SELECT
+            q.USAGE_HOUR,
+            CASE q.TAG:app::STRING
+                WHEN ''snowgoal-pipeline'' THEN ''PIPELINE''
+                WHEN ''snowgoal-dashboard'' THEN ''DASHBOARD''
+                ELSE ''UNTAGGED''
+            END AS SOURCE,
+            CASE
+                WHEN q.TAG:app::STRING = ''snowgoal-dashboard'' THEN ''DASHBOARD''
+                ELSE COALESCE(q.TAG:stage::STRING, ''UNTAGGED'')
+            END AS STAGE,
+            COALESCE(q.TAG:task::STRING, q.TAG:page::STRING, ''UNTAGGED'') AS OBJECT_NAME,
+            COUNT(*) AS QUERY_COUNT,
+            COALESCE(SUM(q.EXECUTION_TIME), 0) AS EXECUTION_MS,
+            COALESCE(SUM(a.CREDITS_COMPUTE), 0) AS CREDITS_COMPUTE,
+            COALESCE(SUM(q.CREDITS_USED_CLOUD_SERVICES), 0) AS CREDITS_CLOUD_SERVICES
+        FROM queries q
+        LEFT JOIN attributed a ON a.QUERY_ID = q.QUERY_ID
+        GROUP BY 1, 2, 3, 4
+    ),
+    metering AS (
+        SELECT
+            DATE_TRUNC(''hour'', CONVERT_TIMEZONE(''UTC'', START_TIME))::TIMESTAMP_NTZ AS USAGE_HOUR,
+            SUM(CREDITS_USED_COMPUTE) AS METERED_COMPUTE
+        FROM SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_METERING_HISTORY
+        WHERE WAREHOUSE_NAME = :wh
+          AND START_TIME >= DATEADD(''day'', -1, :window_start::TIMESTAMP_NTZ)
+          AND CONVERT_TIMEZONE(''UTC'', START_TIME)::DATE >= :window_start
+          AND CONVERT_TIMEZONE(''UTC'', START_TIME)::DATE < :window_end
+        GROUP BY 1
+    ),
+    hourly AS (
+        SELECT m.USAGE_HOUR, m.METERED_COMPUTE, COALESCE(SUM(b.CREDITS_COMPUTE), 0) AS ATTRIBUTED_COMPUTE
+        FROM metering m
+        LEFT JOIN buckets b ON b.USAGE_HOUR = m.USAGE_HOUR
+        GROUP BY 1, 2
+    ),
+    allocated AS (
+        SELECT
+            b.USAGE_HOUR, b.SOURCE, b.STAGE, b.OBJECT_NAME, b.QUERY_COUNT, b.EXECUTION_MS,
+            b.CREDITS_COMPUTE,
+            IFF(h.ATTRIBUTED_COMPUTE > 0,
+                GREATEST(h.METERED_COMPUTE - h.ATTRIBUTED_COMPUTE, 0) * b.CREDITS_COMPUTE / h.ATTRIBUTED_COMPUTE,
+                0) AS CREDITS_IDLE,
+            b.CREDITS_CLOUD_SERVICES
+        FROM buckets b
+        LEFT JOIN hourly h ON h.USAGE_HOUR = b.USAGE_HOUR
+        UNION ALL
+        -- Metered hours where no query got compute attributed (resume / auto-suspend only)
+        SELECT USAGE_HOUR, ''IDLE'', ''IDLE'', ''IDLE'', 0, 0, 0, METERED_COMPUTE, 0
+        FROM hourly
+        WHERE ATTRIBUTED_COMPUTE = 0
+          AND METERED_COMPUTE > 0
+    )
+    SELECT
+        USAGE_HOUR::DATE AS USAGE_DATE,
+        :wh AS WAREHOUSE_NAME,
+        SOURCE,
+        STAGE,
+        OBJECT_NAME,
+        SUM(QUERY_COUNT) AS QUERY_COUNT,
+        SUM(EXECUTION_MS) AS EXECUTION_MS,
+        SUM(CREDITS_COMPUTE) AS CREDITS_COMPUTE,
+        SUM(CREDITS_IDLE) AS CREDITS_IDLE,
+        SUM(CREDITS_COMPUTE + CREDITS_IDLE) AS CREDITS_TOTAL,
+        SUM(CREDITS_CLOUD_SERVICES) AS CREDITS_CLOUD_SERVICES,
+        ROUND(RATIO_TO_REPORT(SUM(CREDITS_COMPUTE + CREDITS_IDLE)) OVER (PARTITION BY USAGE_HOUR::DATE) * 100, 2) AS PCT_OF_WAREHOUSE
+    FROM allocated
+    GROUP BY 1, 2, 3, 4, 5;
+
+    rows_written := SQLROWCOUNT;
+
+    COMMIT;
+
+    INSERT INTO COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, AFFECTED_ROWS)
+    SELECT ''INFO'', ''COST_ATTRIBUTION'',
+           ''Cost attribution refreshed from '' || :window_start || '' to '' || DATEADD(''day'', -1, :window_end),
+           :rows_written;
+
+    RETURN ''COST ATTRIBUTION REFRESHED: '' || rows_written || '' rows'';
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        RAISE;
+END';
+
+-- ----------------------------------------
+-- Totals per stage / page over the last 30 days (dashboard & ad-hoc analysis)
+-- ----------------------------------------
+CREATE OR REPLACE VIEW GOLD.V_COST_BY_STAGE AS
+SELECT
+    SOURCE,
+    STAGE,
+    OBJECT_NAME,
+    SUM(QUERY_COUNT) AS QUERY_COUNT,
+    ROUND(SUM(CREDITS_TOTAL), 4) AS CREDITS_TOTAL,
+    ROUND(SUM(CREDITS_IDLE), 4) AS CREDITS_IDLE,
+    ROUND(SUM(CREDITS_TOTAL) / NULLIF(SUM(QUERY_COUNT), 0) * 1000, 4) AS CREDITS_PER_1K_QUERIES,
+    ROUND(RATIO_TO_REPORT(SUM(CREDITS_TOTAL)) OVER () * 100, 2) AS PCT_OF_WAREHOUSE
+FROM GOLD.COST_ATTRIBUTION
+WHERE USAGE_DATE >= DATEADD('day', -30, CURRENT_DATE())
+GROUP BY SOURCE, STAGE, OBJECT_NAME;
+
+-- Manual execution for testing:
+-- CALL COMMON.SP_REFRESH_COST_ATTRIBUTION(7);
+-- SELECT * FROM GOLD.V_COST_BY_STAGE ORDER BY CREDITS_TOTAL DESC;
@@ -0,0 +1,121 @@
+-- ============================================
+-- SNOWGOAL - Pipeline Status (GOLD.PIPELINE_STATUS)
+-- ============================================
+-- Single-row summary read by the dashboard instead of COUNT(*) / MAX(_UPDATED_AT)
+-- scans of SILVER on every cold load:
+--   - entity counts and per-entity last update (SILVER)
+--   - last merge, last graph run, last successful graph run
+--   - DATA_VERSION: bumped by each merge and by the finalizer, read by the
+--     Streamlit query cache (streamlit/connection.py) to invalidate results
+-- Refreshed by SP_MERGE_TO_SILVER (counts, freshness) and by the
+-- TASK_PUBLISH_DATA_VERSION finalizer (run ids, version).
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA GOLD;
+
+CREATE TABLE IF NOT EXISTS PIPELINE_STATUS (
+    STATUS_ID INT PRIMARY KEY,           -- always 1
+    MATCHES INT,
+    FINISHED_MATCHES INT,
+    TOTAL_GOALS INT,                     -- finished matches
+    TEAMS INT,
+    SCORERS INT,                         -- scorer rows (player x competition x season)
+    PLAYERS INT,                         -- distinct players
+    COMPETITIONS INT,
+    ODDS INT,
+    MATCHES_UPDATED_AT TIMESTAMP_NTZ,
+    STANDINGS_UPDATED_AT TIMESTAMP_NTZ,
+    TEAMS_UPDATED_AT TIMESTAMP_NTZ,
+    SCORERS_UPDATED_AT TIMESTAMP_NTZ,
+    COMPETITIONS_UPDATED_AT TIMESTAMP_NTZ,
+    ODDS_UPDATED_AT TIMESTAMP_NTZ,
+    LAST_MERGE_RUN_ID VARCHAR(100),
+    LAST_MERGE_AT TIMESTAMP_NTZ,
+    LAST_RUN_ID VARCHAR(100),            -- last graph run (finalizer)
+    LAST_RUN_FAILED_TASKS INT,
+    LAST_SUCCESSFUL_RUN_ID VARCHAR(100), -- last graph run without failed task
+    LAST_SUCCESSFUL_RUN_AT TIMESTAMP_NTZ,
+    DATA_VERSION INT DEFAULT 0,
+    _UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ----------------------------------------
+-- SP_REFRESH_PIPELINE_STATUS - counts & freshness after a merge
+-- Called by: SP_MERGE_TO_SILVER (03_silver/02_procedure_merge.sql)
+-- COUNT(*) / MAX() without filter are answered from table metadata; the
+-- FINISHED aggregates scan SILVER.MATCHES once per merge instead of per page load.
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE SNOWGOAL_DB.COMMON.SP_REFRESH_PIPELINE_STATUS(RUN_ID VARCHAR)
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS 'BEGIN
+    MERGE INTO GOLD.PIPELINE_STATUS AS target
+    USING (
+        SELECT
+            1 AS STATUS_ID,
+            m.MATCHES, m.FINISHED_MATCHES, m.TOTAL_GOALS, m.MATCHES_UPDATED_AT,
+            t.TEAMS, t.TEAMS_UPDATED_AT,
+            s.SCORERS, s.PLAYERS, s.SCORERS_UPDATED_AT,
+            c.COMPETITIONS, c.COMPETITIONS_UPDATED_AT,
+            st.STANDINGS_UPDATED_AT,
+            o.ODDS, o.ODDS_UPDATED_AT
+        FROM (
+            SELECT
+                COUNT(*) AS MATCHES,
+                COUNT_IF(STATUS = ''FINISHED'') AS FINISHED_MATCHES,
+                SUM(IFF(STATUS = ''FINISHED'', HOME_SCORE + AWAY_SCORE, 0)) AS TOTAL_GOALS,
+                MAX(_UPDATED_AT) AS MATCHES_UPDATED_AT
+            FROM SILVER.MATCHES
+        ) m
+        CROSS JOIN (SELECT COUNT(*) AS TEAMS, MAX(_UPDATED_AT) AS TEAMS_UPDATED_AT FROM SILVER.TEAMS) t
+        CROSS JOIN (
+            SELECT COUNT(*) AS SCORERS, COUNT(DISTINCT PLAYER_ID) AS PLAYERS, MAX(_UPDATED_AT) AS SCORERS_UPDATED_AT
+            FROM SILVER.SCORERS
+        ) s
+        CROSS JOIN (SELECT COUNT(*) AS COMPETITIONS, MAX(_UPDATED_AT) AS COMPETITIONS_UPDATED_AT FROM SILVER.COMPETITIONS) c
+        CROSS JOIN (SELECT MAX(_UPDATED_AT) AS STANDINGS_UPDATED_AT FROM SILVER.STANDINGS) st
+        CROSS JOIN (SELECT COUNT(*) AS ODDS, MAX(_UPDATED_AT) AS ODDS_UPDATED_AT FROM SILVER.ODDS) o
+    ) AS source
+    ON target.STATUS_ID = source.STATUS_ID
+    WHEN MATCHED THEN
+        UPDATE SET
+            MATCHES = source.MATCHES,
+            FINISHED_MATCHES = source.FINISHED_MATCHES,
+            TOTAL_GOALS = source.TOTAL_GOALS,
+            TEAMS = source.TEAMS,
+            SCORERS = source.SCORERS,
+            PLAYERS = source.PLAYERS,
+            COMPETITIONS = source.COMPETITIONS,
+            ODDS = source.ODDS,
+            MATCHES_UPDATED_AT = source.MATCHES_UPDATED_AT,
+            STANDINGS_UPDATED_AT = source.STANDINGS_UPDATED_AT,
+            TEAMS_UPDATED_AT = source.TEAMS_UPDATED_AT,
+            SCORERS_UPDATED_AT = source.SCORERS_UPDATED_AT,
+            COMPETITIONS_UPDATED_AT = source.COMPETITIONS_UPDATED_AT,
+            ODDS_UPDATED_AT = source.ODDS_UPDATED_AT,
+            LAST_MERGE_RUN_ID = :RUN_ID,
+            LAST_MERGE_AT = CURRENT_TIMESTAMP(),
+            DATA_VERSION = target.DATA_VERSION + 1,
+            _UPDATED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN
+        INSERT (STATUS_ID, MATCHES, FINISHED_MATCHES, TOTAL_GOALS, TEAMS, SCORERS, PLAYERS, COMPETITIONS, ODDS,
+                MATCHES_UPDATED_AT, STANDINGS_UPDATED_AT, TEAMS_UPDATED_AT, SCORERS_UPDATED_AT,
+                COMPETITIONS_UPDATED_AT, ODDS_UPDATED_AT, LAST_MERGE_RUN_ID, LAST_MERGE_AT, DATA_VERSION)
+        VALUES (source.STATUS_ID, source.MATCHES, source.FINISHED_MATCHES, source.TOTAL_GOALS, source.TEAMS,
+                source.SCORERS, source.PLAYERS, source.COMPETITIONS, source.ODDS,
+                source.MATCHES_UPDATED_AT, source.STANDINGS_UPDATED_AT, source.TEAMS_UPDATED_AT,
+                source.SCORERS_UPDATED_AT, source.COMPETITIONS_UPDATED_AT, source.ODDS_UPDATED_AT,
+                :RUN_ID, CURRENT_TIMESTAMP(), 1);
+
+    RETURN ''PIPELINE STATUS REFRESHED'';
+END';
+
+-- Initial population (then maintained by every merge)
+CALL SNOWGOAL_DB.COMMON.SP_REFRESH_PIPELINE_STATUS('deploy');
+
+-- Verify
+SELECT * FROM GOLD.PIPELINE_STATUS;
@@ -1,6 +1,10 @@
 -- ============================================
 -- SNOWGOAL - Tasks (Orchestration DAG)
 -- ============================================
+-- Every task sets a JSON QUERY_TAG (app / stage / task) inherited by all the
+-- statements it runs: credits per stage in GOLD.COST_ATTRIBUTION
+-- (04_gold/12_cost_attribution.sql).
+-- ============================================
 
 USE ROLE SNOWGOAL_ROLE;
 USE WAREHOUSE SNOWGOAL_WH_XS;
@@ -13,6 +17,7 @@ USE SCHEMA COMMON;
 -- ----------------------------------------
 CREATE OR REPLACE TASK TASK_FETCH_ALL_LEAGUES
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"INGESTION","task":"TASK_FETCH_ALL_LEAGUES"}'
     SCHEDULE = 'USING CRON 0 7,17,0 * * * Europe/Paris'
     USER_TASK_TIMEOUT_MS = 7200000
     COMMENT = 'Fetch data for 11 competitions from football-data.org (7h, 17h, 00h)'
@@ -25,6 +30,7 @@ CALL FETCH_ALL_LEAGUES();
 -- ----------------------------------------
 CREATE OR REPLACE TASK TASK_FETCH_ODDS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"INGESTION","task":"TASK_FETCH_ODDS"}'
     AFTER TASK_FETCH_ALL_LEAGUES
 AS
 CALL FETCH_ODDS();
@@ -36,6 +42,7 @@ CALL FETCH_ODDS();
 -- ----------------------------------------
 CREATE OR REPLACE TASK TASK_MERGE_TO_SILVER
   WAREHOUSE = SNOWGOAL_WH_XS
+  QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MERGE","task":"TASK_MERGE_TO_SILVER"}'
   AFTER TASK_FETCH_ODDS
   WHEN SYSTEM$STREAM_HAS_DATA('RAW.STREAM_RAW_MATCHES')
     OR SYSTEM$STREAM_HAS_DATA('RAW.STREAM_RAW_STANDINGS')
@@ -48,6 +55,7 @@ CALL SP_MERGE_TO_SILVER();
 -- Task 4a: Refresh LEAGUE_STANDINGS
 CREATE OR REPLACE TASK TASK_REFRESH_LEAGUE_STANDINGS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_LEAGUE_STANDINGS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.LEAGUE_STANDINGS
@@ -77,6 +85,7 @@ FROM SILVER.STANDINGS;
 -- Task 4b: Refresh TOP_SCORERS
 CREATE OR REPLACE TASK TASK_REFRESH_TOP_SCORERS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_TOP_SCORERS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.TOP_SCORERS
@@ -103,76 +112,160 @@ SELECT
     RANK() OVER (PARTITION BY COMPETITION_CODE, SEASON_YEAR ORDER BY GOALS + COALESCE(ASSISTS, 0) DESC) AS CONTRIBUTIONS_RANK
 FROM SILVER.SCORERS;
 
--- Task 5: Refresh TEAM_STATS
-CREATE OR REPLACE TASK TASK_REFRESH_TEAM_STATS
+-- Task 5a: Refresh TEAM_MATCHES (incremental MERGE from SILVER CDC stream)
+-- Matches that are no longer FINISHED (e.g. annulled) are removed.
+CREATE OR REPLACE TASK TASK_REFRESH_TEAM_MATCHES
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_TEAM_MATCHES"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
-INSERT OVERWRITE INTO GOLD.TEAM_STATS
-WITH home_stats AS (
-    SELECT
-        COMPETITION_CODE,
-        SEASON_YEAR,
-        HOME_TEAM_ID AS TEAM_ID,
-        HOME_TEAM_NAME AS TEAM_NAME,
-        COUNT(*) AS HOME_PLAYED,
-        SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) AS HOME_WINS,
-        SUM(CASE WHEN WINNER = 'DRAW' THEN 1 ELSE 0 END) AS HOME_DRAWS,
-        SUM(CASE WHEN WINNER = 'AWAY_TEAM' THEN 1 ELSE 0 END) AS HOME_LOSSES,
-        SUM(HOME_SCORE) AS HOME_GOALS_FOR,
-        SUM(AWAY_SCORE) AS HOME_GOALS_AGAINST
-    FROM SILVER.MATCHES
-    WHERE STATUS = 'FINISHED'
-    GROUP BY COMPETITION_CODE, SEASON_YEAR, HOME_TEAM_ID, HOME_TEAM_NAME
-),
-away_stats AS (
+MERGE INTO GOLD.TEAM_MATCHES AS target
+USING (
     SELECT
-        COMPETITION_CODE,
-        SEASON_YEAR,
-        AWAY_TEAM_ID AS TEAM_ID,
-        AWAY_TEAM_NAME AS TEAM_NAME,
-        COUNT(*) AS AWAY_PLAYED,
-        SUM(CASE WHEN WINNER = 'AWAY_TEAM' THEN 1 ELSE 0 END) AS AWAY_WINS,
-        SUM(CASE WHEN WINNER = 'DRAW' THEN 1 ELSE 0 END) AS AWAY_DRAWS,
-        SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) AS AWAY_LOSSES,
-        SUM(AWAY_SCORE) AS AWAY_GOALS_FOR,
-        SUM(HOME_SCORE) AS AWAY_GOALS_AGAINST
-    FROM SILVER.MATCHES
-    WHERE STATUS = 'FINISHED'
-    GROUP BY COMPETITION_CODE, SEASON_YEAR, AWAY_TEAM_ID, AWAY_TEAM_NAME
-)
+        m.MATCH_ID,
+        IFF(v.IS_HOME, m.HOME_TEAM_ID, m.AWAY_TEAM_ID) AS TEAM_ID,
+        m.COMPETITION_CODE,
+        m.SEASON_YEAR,
+        m.MATCH_DATE,
+        m.MATCHDAY,
+        m.STATUS,
+        v.IS_HOME,
+        IFF(v.IS_HOME, m.HOME_TEAM_NAME, m.AWAY_TEAM_NAME) AS TEAM_NAME,
+        IFF(v.IS_HOME, m.HOME_TEAM_TLA, m.AWAY_TEAM_TLA) AS TEAM_TLA,
+        IFF(v.IS_HOME, m.AWAY_TEAM_ID, m.HOME_TEAM_ID) AS OPPONENT_ID,
+        IFF(v.IS_HOME, m.AWAY_TEAM_NAME, m.HOME_TEAM_NAME) AS OPPONENT_NAME,
+        IFF(v.IS_HOME, m.AWAY_TEAM_TLA, m.HOME_TEAM_TLA) AS OPPONENT_TLA,
+        IFF(v.IS_HOME, m.HOME_SCORE, m.AWAY_SCORE) AS GOALS_FOR,
+        IFF(v.IS_HOME, m.AWAY_SCORE, m.HOME_SCORE) AS GOALS_AGAINST,
+        CASE
+            WHEN m.WINNER IS NULL THEN NULL
+            WHEN m.WINNER = 'DRAW' THEN 'D'
+            WHEN m.WINNER = IFF(v.IS_HOME, 'HOME_TEAM', 'AWAY_TEAM') THEN 'W'
+            ELSE 'L'
+        END AS RESULT,
+        CASE
+            WHEN m.WINNER IS NULL THEN NULL
+            WHEN m.WINNER = 'DRAW' THEN 1
+            WHEN m.WINNER = IFF(v.IS_HOME, 'HOME_TEAM', 'AWAY_TEAM') THEN 3
+            ELSE 0
+        END AS POINTS
+    FROM SILVER.STREAM_SILVER_MATCHES_TEAM_MATCHES m
+    CROSS JOIN (SELECT TRUE AS IS_HOME UNION ALL SELECT FALSE) v
+    WHERE m.METADATA$ACTION = 'INSERT'
+) AS source
+ON target.MATCH_ID = source.MATCH_ID AND target.TEAM_ID = source.TEAM_ID
+WHEN MATCHED AND source.STATUS != 'FINISHED' THEN DELETE
+WHEN MATCHED THEN
+    UPDATE SET
+        COMPETITION_CODE = source.COMPETITION_CODE,
+        SEASON_YEAR = source.SEASON_YEAR,
+        MATCH_DATE = source.MATCH_DATE,
+        MATCHDAY = source.MATCHDAY,
+        IS_HOME = source.IS_HOME,
+        TEAM_NAME = source.TEAM_NAME,
+        TEAM_TLA = source.TEAM_TLA,
+        OPPONENT_ID = source.OPPONENT_ID,
+        OPPONENT_NAME = source.OPPONENT_NAME,
+        OPPONENT_TLA = source.OPPONENT_TLA,
+        GOALS_FOR = source.GOALS_FOR,
+        GOALS_AGAINST = source.GOALS_AGAINST,
+        RESULT = source.RESULT,
+        POINTS = source.POINTS,
+        _UPDATED_AT = CURRENT_TIMESTAMP()
+WHEN NOT MATCHED AND source.STATUS = 'FINISHED' THEN
+    INSERT (MATCH_ID, TEAM_ID, COMPETITION_CODE, SEASON_YEAR, MATCH_DATE, MATCHDAY, IS_HOME,
+            TEAM_NAME, TEAM_TLA, OPPONENT_ID, OPPONENT_NAME, OPPONENT_TLA,
+            GOALS_FOR, GOALS_AGAINST, RESULT, POINTS, _UPDATED_AT)
+    VALUES (source.MATCH_ID, source.TEAM_ID, source.COMPETITION_CODE, source.SEASON_YEAR,
+            source.MATCH_DATE, source.MATCHDAY, source.IS_HOME, source.TEAM_NAME, source.TEAM_TLA,
+            source.OPPONENT_ID, source.OPPONENT_NAME, source.OPPONENT_TLA, source.GOALS_FOR,
+            source.GOALS_AGAINST, source.RESULT, source.POINTS, CURRENT_TIMESTAMP());
+
+-- Task 5b: Refresh TEAM_STATS (single pass over TEAM_MATCHES)
+CREATE OR REPLACE TASK TASK_REFRESH_TEAM_STATS
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_TEAM_STATS"}'
+    AFTER TASK_REFRESH_TEAM_MATCHES
+AS
+INSERT OVERWRITE INTO GOLD.TEAM_STATS
 SELECT
-    COALESCE(h.COMPETITION_CODE, a.COMPETITION_CODE) AS COMPETITION_CODE,
-    COALESCE(h.SEASON_YEAR, a.SEASON_YEAR) AS SEASON_YEAR,
-    COALESCE(h.TEAM_ID, a.TEAM_ID) AS TEAM_ID,
-    COALESCE(h.TEAM_NAME, a.TEAM_NAME) AS TEAM_NAME,
-    COALESCE(h.HOME_PLAYED, 0) AS HOME_PLAYED,
-    COALESCE(h.HOME_WINS, 0) AS HOME_WINS,
-    COALESCE(h.HOME_DRAWS, 0) AS HOME_DRAWS,
-    COALESCE(h.HOME_LOSSES, 0) AS HOME_LOSSES,
-    COALESCE(h.HOME_GOALS_FOR, 0) AS HOME_GOALS_FOR,
-    COALESCE(h.HOME_GOALS_AGAINST, 0) AS HOME_GOALS_AGAINST,
-    COALESCE(a.AWAY_PLAYED, 0) AS AWAY_PLAYED,
-    COALESCE(a.AWAY_WINS, 0) AS AWAY_WINS,
-    COALESCE(a.AWAY_DRAWS, 0) AS AWAY_DRAWS,
-    COALESCE(a.AWAY_LOSSES, 0) AS AWAY_LOSSES,
-    COALESCE(a.AWAY_GOALS_FOR, 0) AS AWAY_GOALS_FOR,
-    COALESCE(a.AWAY_GOALS_AGAINST, 0) AS AWAY_GOALS_AGAINST,
-    COALESCE(h.HOME_PLAYED, 0) + COALESCE(a.AWAY_PLAYED, 0) AS TOTAL_PLAYED,
-    COALESCE(h.HOME_WINS, 0) + COALESCE(a.AWAY_WINS, 0) AS TOTAL_WINS,
-    COALESCE(h.HOME_GOALS_FOR, 0) + COALESCE(a.AWAY_GOALS_FOR, 0) AS TOTAL_GOALS_FOR,
-    COALESCE(h.HOME_GOALS_AGAINST, 0) + COALESCE(a.AWAY_GOALS_AGAINST, 0) AS TOTAL_GOALS_AGAINST,
-    ROUND((COALESCE(h.HOME_WINS, 0) * 3 + COALESCE(h.HOME_DRAWS, 0)) / NULLIF(COALESCE(h.HOME_PLAYED, 0), 0), 2) AS HOME_PPG,
-    ROUND((COALESCE(a.AWAY_WINS, 0) * 3 + COALESCE(a.AWAY_DRAWS, 0)) / NULLIF(COALESCE(a.AWAY_PLAYED, 0), 0), 2) AS AWAY_PPG
-FROM home_stats h
-FULL OUTER JOIN away_stats a
-    ON h.TEAM_ID = a.TEAM_ID
-    AND h.COMPETITION_CODE = a.COMPETITION_CODE
-    AND h.SEASON_YEAR = a.SEASON_YEAR;
+    COMPETITION_CODE,
+    SEASON_YEAR,
+    TEAM_ID,
+    TEAM_NAME,
+    COUNT_IF(IS_HOME) AS HOME_PLAYED,
+    COUNT_IF(IS_HOME AND RESULT = 'W') AS HOME_WINS,
+    COUNT_IF(IS_HOME AND RESULT = 'D') AS HOME_DRAWS,
+    COUNT_IF(IS_HOME AND RESULT = 'L') AS HOME_LOSSES,
+    COALESCE(SUM(IFF(IS_HOME, GOALS_FOR, 0)), 0) AS HOME_GOALS_FOR,
+    COALESCE(SUM(IFF(IS_HOME, GOALS_AGAINST, 0)), 0) AS HOME_GOALS_AGAINST,
+    COUNT_IF(NOT IS_HOME) AS AWAY_PLAYED,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'W') AS AWAY_WINS,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'D') AS AWAY_DRAWS,
+    COUNT_IF(NOT IS_HOME AND RESULT = 'L') AS AWAY_LOSSES,
+    COALESCE(SUM(IFF(IS_HOME, 0, GOALS_FOR)), 0) AS AWAY_GOALS_FOR,
+    COALESCE(SUM(IFF(IS_HOME, 0, GOALS_AGAINST)), 0) AS AWAY_GOALS_AGAINST,
+    COUNT(*) AS TOTAL_PLAYED,
+    COUNT_IF(RESULT = 'W') AS TOTAL_WINS,
+    COALESCE(SUM(GOALS_FOR), 0) AS TOTAL_GOALS_FOR,
+    COALESCE(SUM(GOALS_AGAINST), 0) AS TOTAL_GOALS_AGAINST,
+    ROUND(SUM(IFF(IS_HOME, POINTS, 0)) / NULLIF(COUNT_IF(IS_HOME), 0), 2) AS HOME_PPG,
+    ROUND(SUM(IFF(IS_HOME, 0, POINTS)) / NULLIF(COUNT_IF(NOT IS_HOME), 0), 2) AS AWAY_PPG
+FROM GOLD.TEAM_MATCHES
+GROUP BY COMPETITION_CODE, SEASON_YEAR, TEAM_ID, TEAM_NAME;
+
+-- Task 5c: Refresh TEAM_FORM (rolling windows, dirty teams only)
+CREATE OR REPLACE TASK TASK_REFRESH_TEAM_FORM
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_TEAM_FORM"}'
+    AFTER TASK_REFRESH_TEAM_MATCHES
+AS
+CALL SP_REFRESH_TEAM_FORM();
+
+-- Task 5d: Refresh HEAD_TO_HEAD (dirty team pairs only)
+CREATE OR REPLACE TASK TASK_REFRESH_HEAD_TO_HEAD
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_HEAD_TO_HEAD"}'
+    AFTER TASK_REFRESH_TEAM_MATCHES
+AS
+CALL SP_REFRESH_HEAD_TO_HEAD();
+
+-- Task 5e: Refresh MATCH_PREDICTIONS (Dixon-Coles, upcoming fixtures)
+CREATE OR REPLACE TASK TASK_PREDICT_MATCHES
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_PREDICT_MATCHES"}'
+    AFTER TASK_MERGE_TO_SILVER
+AS
+CALL PREDICT_MATCHES();
+
+-- Task 5f: Update Elo TEAM_RATINGS (newly finished matches only)
+CREATE OR REPLACE TASK TASK_UPDATE_TEAM_RATINGS
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_UPDATE_TEAM_RATINGS"}'
+    AFTER TASK_MERGE_TO_SILVER
+AS
+CALL UPDATE_TEAM_RATINGS();
+
+-- Task 5g: Monte Carlo SEASON_SIMULATIONS (gated to once per night inside the procedure)
+CREATE OR REPLACE TASK TASK_SIMULATE_SEASONS
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_SIMULATE_SEASONS"}'
+    AFTER TASK_PREDICT_MATCHES
+AS
+CALL SIMULATE_SEASONS();
+
+-- Task 5h: BACKTEST_RESULTS (closing odds vs results, uses MATCH_PREDICTIONS)
+CREATE OR REPLACE TASK TASK_BACKTEST_ODDS
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_BACKTEST_ODDS"}'
+    AFTER TASK_PREDICT_MATCHES
+AS
+CALL BACKTEST_ODDS();
 
 -- Task 6: Refresh RECENT_MATCHES
 CREATE OR REPLACE TASK TASK_REFRESH_RECENT_MATCHES
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_RECENT_MATCHES"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.RECENT_MATCHES
@@ -212,6 +305,7 @@ WHERE MATCH_DATE >= DATEADD('day', -30, CURRENT_DATE())
 -- Task 7: Refresh UPCOMING_FIXTURES
 CREATE OR REPLACE TASK TASK_REFRESH_UPCOMING_FIXTURES
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_UPCOMING_FIXTURES"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.UPCOMING_FIXTURES
@@ -239,6 +333,7 @@ ORDER BY MATCH_DATE;
 -- Task 8: Refresh MATCH_PATTERNS
 CREATE OR REPLACE TASK TASK_REFRESH_MATCH_PATTERNS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_MATCH_PATTERNS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.MATCH_PATTERNS
@@ -263,6 +358,7 @@ GROUP BY COMPETITION_CODE, DAY_OF_WEEK, MATCH_HOUR;
 -- Task 9: Refresh REFEREE_STATS
 CREATE OR REPLACE TASK TASK_REFRESH_REFEREE_STATS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_REFEREE_STATS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.REFEREE_STATS
@@ -285,6 +381,7 @@ ORDER BY MATCHES_REFEREED DESC;
 -- Task 10: Refresh GEOGRAPHIC_STATS
 CREATE OR REPLACE TASK TASK_REFRESH_GEOGRAPHIC_STATS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_GEOGRAPHIC_STATS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.GEOGRAPHIC_STATS
@@ -309,6 +406,7 @@ ORDER BY TOTAL_MATCHES DESC;
 -- ----------------------------------------
 CREATE OR REPLACE TASK TASK_REFRESH_ODDS_ANALYSIS
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"GOLD_REFRESH","task":"TASK_REFRESH_ODDS_ANALYSIS"}'
     AFTER TASK_MERGE_TO_SILVER
 AS
 INSERT OVERWRITE INTO GOLD.ODDS_ANALYSIS
@@ -318,6 +416,9 @@ SELECT
     o.COMMENCE_TIME,
     o.HOME_TEAM,
     o.AWAY_TEAM,
+    o.MATCH_ID,
+    o.HOME_TEAM_ID,
+    o.AWAY_TEAM_ID,
     COUNT(DISTINCT o.BOOKMAKER_KEY) AS NB_BOOKMAKERS,
     ROUND(AVG(o.HOME_ODDS), 2) AS AVG_HOME_ODDS,
     ROUND(AVG(o.DRAW_ODDS), 2) AS AVG_DRAW_ODDS,
@@ -331,23 +432,153 @@ SELECT
     ROUND((1/AVG(o.HOME_ODDS) + 1/AVG(o.DRAW_ODDS) + 1/AVG(o.AWAY_ODDS) - 1) * 100, 2) AS BOOKMAKER_MARGIN_PCT,
     MAX(o.LAST_UPDATE) AS LAST_ODDS_UPDATE
 FROM SILVER.ODDS o
-GROUP BY o.GAME_ID, o.COMPETITION_CODE, o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM
+GROUP BY o.GAME_ID, o.COMPETITION_CODE, o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM,
+         o.MATCH_ID, o.HOME_TEAM_ID, o.AWAY_TEAM_ID
 ORDER BY o.COMMENCE_TIME DESC;
 
+-- ----------------------------------------
+-- TASK 11a: De-vigged consensus probabilities (GOLD.ODDS_CONSENSUS)
+-- ----------------------------------------
+CREATE OR REPLACE TASK TASK_COMPUTE_ODDS_CONSENSUS
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_COMPUTE_ODDS_CONSENSUS"}'
+    AFTER TASK_MERGE_TO_SILVER
+AS
+CALL COMPUTE_ODDS_CONSENSUS();
+
+-- ----------------------------------------
+-- TASK 11b: Scan arbitrage opportunities (best price per outcome across bookmakers)
+-- ----------------------------------------
+CREATE OR REPLACE TASK TASK_SCAN_ARBITRAGE
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MODELS","task":"TASK_SCAN_ARBITRAGE"}'
+    AFTER TASK_MERGE_TO_SILVER
+AS
+INSERT OVERWRITE INTO GOLD.ARBITRAGE_OPPORTUNITIES
+    (GAME_ID, MATCH_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM, NB_BOOKMAKERS,
+     BEST_HOME_ODDS, BEST_HOME_BOOKMAKER, BEST_DRAW_ODDS, BEST_DRAW_BOOKMAKER,
+     BEST_AWAY_ODDS, BEST_AWAY_BOOKMAKER, IMPLIED_SUM, IS_SUREBET, GUARANTEED_RETURN_PCT,
+     STAKE_HOME_PCT, STAKE_DRAW_PCT, STAKE_AWAY_PCT, LAST_ODDS_UPDATE)
+WITH best AS (
+    SELECT
+        GAME_ID,
+        MAX(MATCH_ID) AS MATCH_ID,
+        MAX(COMPETITION_CODE) AS COMPETITION_CODE,
+        MAX(COMMENCE_TIME) AS COMMENCE_TIME,
+        MAX(HOME_TEAM) AS HOME_TEAM,
+        MAX(AWAY_TEAM) AS AWAY_TEAM,
+        COUNT(DISTINCT BOOKMAKER_KEY) AS NB_BOOKMAKERS,
+        MAX(HOME_ODDS) AS BEST_HOME_ODDS,
+        MAX_BY(BOOKMAKER_TITLE, HOME_ODDS) AS BEST_HOME_BOOKMAKER,
+        MAX(DRAW_ODDS) AS BEST_DRAW_ODDS,
+        MAX_BY(BOOKMAKER_TITLE, DRAW_ODDS) AS BEST_DRAW_BOOKMAKER,
+        MAX(AWAY_ODDS) AS BEST_AWAY_ODDS,
+        MAX_BY(BOOKMAKER_TITLE, AWAY_ODDS) AS BEST_AWAY_BOOKMAKER,
+        MAX(LAST_UPDATE) AS LAST_ODDS_UPDATE
+    FROM SILVER.ODDS
+    WHERE COMMENCE_TIME > CURRENT_TIMESTAMP()
+      AND HOME_ODDS > 1 AND DRAW_ODDS > 1 AND AWAY_ODDS > 1
+    GROUP BY GAME_ID
+),
+implied AS (
+    SELECT *, 1 / BEST_HOME_ODDS + 1 / BEST_DRAW_ODDS + 1 / BEST_AWAY_ODDS AS IMPLIED_SUM
+    FROM best
+)
+SELECT
+    GAME_ID, MATCH_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM, NB_BOOKMAKERS,
+    BEST_HOME_ODDS, BEST_HOME_BOOKMAKER, BEST_DRAW_ODDS, BEST_DRAW_BOOKMAKER,
+    BEST_AWAY_ODDS, BEST_AWAY_BOOKMAKER,
+    ROUND(IMPLIED_SUM, 4),
+    IMPLIED_SUM < 1,
+    ROUND((1 / IMPLIED_SUM - 1) * 100, 2),
+    ROUND(100 / BEST_HOME_ODDS / IMPLIED_SUM, 2),
+    ROUND(100 / BEST_DRAW_ODDS / IMPLIED_SUM, 2),
+    ROUND(100 / BEST_AWAY_ODDS / IMPLIED_SUM, 2),
+    LAST_ODDS_UPDATE
+FROM implied;
+
 -- ----------------------------------------
 -- TASK 12: Check Data Quality
+-- Incremental checks on the SILVER rows changed by the merge
+-- (04_gold/02_data_quality.sql)
 -- ----------------------------------------
 CREATE OR REPLACE TASK TASK_CHECK_DATA_QUALITY
     WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"DATA_QUALITY","task":"TASK_CHECK_DATA_QUALITY"}'
     AFTER COMMON.TASK_MERGE_TO_SILVER
 AS
+CALL SP_CHECK_DATA_QUALITY();
+
+-- ----------------------------------------
+-- TASK 13: Publish data version (finalizer, runs once the whole graph is done)
+-- Bumps GOLD.PIPELINE_STATUS.DATA_VERSION (read by streamlit/connection.py so
+-- cached results of GOLD tables refreshed in this run are invalidated) with the
+-- last / last successful run id, then exports the dashboard bundle
+-- (Streamlit Cloud read mode).
+-- Also records the duration of every task of the run (ingestion, merge,
+-- GOLD refreshes) in COMMON.PIPELINE_METRICS (STAGE = 'TASK').
+-- ----------------------------------------
+CREATE OR REPLACE TASK TASK_PUBLISH_DATA_VERSION
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"PUBLISH","task":"TASK_PUBLISH_DATA_VERSION"}'
+    FINALIZE = TASK_FETCH_ALL_LEAGUES
+AS
+BEGIN
+    INSERT INTO COMMON.PIPELINE_METRICS (RUN_ID, COMPONENT_NAME, STAGE, OBJECT_NAME, STATUS, STARTED_AT, DURATION_MS, ATTRIBUTES)
+    SELECT
+        GRAPH_RUN_GROUP_ID,
+        'TASK_GRAPH',
+        'TASK',
+        NAME,
+        STATE,
+        QUERY_START_TIME,
+        DATEDIFF('millisecond', QUERY_START_TIME, COMPLETED_TIME),
+        OBJECT_CONSTRUCT('scheduled_time', SCHEDULED_TIME, 'query_id', QUERY_ID, 'error', ERROR_MESSAGE)
+    FROM TABLE(INFORMATION_SCHEMA.TASK_HISTORY(
+        SCHEDULED_TIME_RANGE_START => DATEADD('hour', -12, CURRENT_TIMESTAMP()),
+        RESULT_LIMIT => 1000
+    ))
+    WHERE GRAPH_RUN_GROUP_ID = SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID')
+      AND COMPLETED_TIME IS NOT NULL;
+    -- Run ids + DATA_VERSION in GOLD.PIPELINE_STATUS (before the export: the bundle carries it)
+    UPDATE GOLD.PIPELINE_STATUS
+    SET LAST_RUN_ID = r.RUN_ID,
+        LAST_RUN_FAILED_TASKS = r.FAILED_TASKS,
+        LAST_SUCCESSFUL_RUN_ID = IFF(r.FAILED_TASKS = 0, r.RUN_ID, LAST_SUCCESSFUL_RUN_ID),
+        LAST_SUCCESSFUL_RUN_AT = IFF(r.FAILED_TASKS = 0, CURRENT_TIMESTAMP(), LAST_SUCCESSFUL_RUN_AT),
+        DATA_VERSION = DATA_VERSION + 1,
+        _UPDATED_AT = CURRENT_TIMESTAMP()
+    FROM (
+        SELECT
+            SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID') AS RUN_ID,
+            COUNT_IF(STATUS IN ('FAILED', 'FAILED_AND_AUTO_SUSPENDED', 'CANCELLED')) AS FAILED_TASKS
+        FROM COMMON.PIPELINE_METRICS
+        WHERE STAGE = 'TASK'
+          AND RUN_ID = SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID')
+    ) r
+    WHERE STATUS_ID = 1;
+    CALL EXPORT_GOLD_BUNDLE();
+    -- Critical path / queue vs execution of the graph runs (see 02_task_graph_analysis.sql)
+    CALL ANALYZE_TASK_GRAPH();
     INSERT INTO COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE)
-    SELECT 
-        'WARNING', 
-        'DATA_QUALITY', 
-        'Anomalie détectée : ' || CHECK_NAME || ' (' || ANOMALY_COUNT || ' lignes)'
-    FROM SNOWGOAL_DB.GOLD.DATA_QUALITY_DASHBOARD
-    WHERE ANOMALY_COUNT > 0;
+    SELECT
+        'INFO',
+        'DATA_VERSION',
+        'Task graph completed: ' || SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID');
+END;
+
+-- ----------------------------------------
+-- Daily cost attribution (standalone, outside the DAG)
+-- 10h UTC: ACCOUNT_USAGE (query attribution / metering) has caught up with
+-- the previous day; the last 3 days are recomputed
+-- ----------------------------------------
+CREATE OR REPLACE TASK TASK_REFRESH_COST_ATTRIBUTION
+    WAREHOUSE = SNOWGOAL_WH_XS
+    QUERY_TAG = '{"app":"snowgoal-pipeline","stage":"MONITORING","task":"TASK_REFRESH_COST_ATTRIBUTION"}'
+    SCHEDULE = 'USING CRON 0 10 * * * UTC'
+    COMMENT = 'Daily credits per pipeline stage and dashboard page (GOLD.COST_ATTRIBUTION)'
+AS
+CALL SP_REFRESH_COST_ATTRIBUTION(3);
 
 -- ----------------------------------------
 -- Resume tasks (enable DAG)
@@ -358,13 +589,24 @@ ALTER TASK TASK_MERGE_TO_SILVER RESUME;
 ALTER TASK TASK_REFRESH_LEAGUE_STANDINGS RESUME;
 ALTER TASK TASK_REFRESH_TOP_SCORERS RESUME;
 ALTER TASK TASK_REFRESH_TEAM_STATS RESUME;
+ALTER TASK TASK_REFRESH_TEAM_MATCHES RESUME;
+ALTER TASK TASK_REFRESH_TEAM_FORM RESUME;
+ALTER TASK TASK_REFRESH_HEAD_TO_HEAD RESUME;
+ALTER TASK TASK_PREDICT_MATCHES RESUME;
+ALTER TASK TASK_UPDATE_TEAM_RATINGS RESUME;
+ALTER TASK TASK_SIMULATE_SEASONS RESUME;
+ALTER TASK TASK_BACKTEST_ODDS RESUME;
 ALTER TASK TASK_REFRESH_RECENT_MATCHES RESUME;
 ALTER TASK TASK_REFRESH_UPCOMING_FIXTURES RESUME;
 ALTER TASK TASK_REFRESH_MATCH_PATTERNS RESUME;
 ALTER TASK TASK_REFRESH_REFEREE_STATS RESUME;
 ALTER TASK TASK_REFRESH_GEOGRAPHIC_STATS RESUME;
 ALTER TASK TASK_REFRESH_ODDS_ANALYSIS RESUME;
+ALTER TASK TASK_COMPUTE_ODDS_CONSENSUS RESUME;
+ALTER TASK TASK_SCAN_ARBITRAGE RESUME;
+ALTER TASK TASK_PUBLISH_DATA_VERSION RESUME;
 ALTER TASK TASK_FETCH_ALL_LEAGUES RESUME;
+ALTER TASK TASK_REFRESH_COST_ATTRIBUTION RESUME;
 
 -- ----------------------------------------
 -- Verify DAG
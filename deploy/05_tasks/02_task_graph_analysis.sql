@@ -0,0 +1,105 @@
+-- ============================================
+-- SNOWGOAL - Task Graph Analysis (critical path)
+-- ============================================
+-- ANALYZE_TASK_GRAPH() rebuilds each run of the DAG from TASK_HISTORY
+-- (grouped by GRAPH_RUN_GROUP_ID) and stores:
+--   TASK_GRAPH_RUNS : one row per graph run - duration, critical path,
+--                     bottleneck, warehouse busy / idle time
+--   TASK_RUN_STATS  : one row per task per run - queue vs execution time,
+--                     gating predecessor, slack, critical path flag
+-- Called by the finalizer TASK_PUBLISH_DATA_VERSION (runs of the last 48h are
+-- re-analysed on each call, so the finalizer of the previous run is included).
+-- ============================================
+
+USE ROLE SNOWGOAL_ROLE;
+USE WAREHOUSE SNOWGOAL_WH_XS;
+USE DATABASE SNOWGOAL_DB;
+USE SCHEMA COMMON;
+
+CREATE TABLE IF NOT EXISTS TASK_GRAPH_RUNS (
+    GRAPH_RUN_GROUP_ID VARCHAR(100) PRIMARY KEY,
+    ROOT_TASK VARCHAR(200),
+    STATE VARCHAR(20),                -- 'SUCCEEDED', 'FAILED', 'SKIPPED' (WHEN gate of TASK_MERGE_TO_SILVER)
+    SCHEDULED_TIME TIMESTAMP_NTZ,     -- UTC
+    STARTED_AT TIMESTAMP_NTZ,
+    COMPLETED_AT TIMESTAMP_NTZ,
+    TOTAL_DURATION_MS NUMBER(18,0),   -- root scheduled -> last task completed
+    CRITICAL_PATH ARRAY,              -- root -> ... -> last task, via gating predecessors
+    CRITICAL_PATH_LENGTH NUMBER(5,0),
+    CRITICAL_QUEUE_MS NUMBER(18,0),
+    CRITICAL_EXECUTION_MS NUMBER(18,0),
+    BOTTLENECK_TASK VARCHAR(200),     -- longest execution on the critical path
+    LAST_LEAF_TASK VARCHAR(200),      -- task holding up completion (before the finalizer)
+    TASKS_TOTAL NUMBER(5,0),
+    TASKS_SUCCEEDED NUMBER(5,0),
+    TASKS_FAILED NUMBER(5,0),
+    TASKS_SKIPPED NUMBER(5,0),
+    TOTAL_QUEUE_MS NUMBER(18,0),
+    TOTAL_EXECUTION_MS NUMBER(18,0),
+    WAREHOUSE_BUSY_MS NUMBER(18,0),   -- union of task executions (single warehouse SNOWGOAL_WH_XS)
+    WAREHOUSE_IDLE_MS NUMBER(18,0),   -- gaps between executions inside the run
+    IDLE_GAPS NUMBER(5,0),
+    MAX_IDLE_GAP_MS NUMBER(18,0),
+    AVG_PARALLELISM NUMBER(6,2),      -- total execution / busy time
+    _ANALYZED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+CREATE TABLE IF NOT EXISTS TASK_RUN_STATS (
+    GRAPH_RUN_GROUP_ID VARCHAR(100),
+    TASK_NAME VARCHAR(200),
+    STATE VARCHAR(30),
+    ATTEMPT_NUMBER NUMBER(5,0),
+    PREDECESSORS ARRAY,
+    GATING_TASK VARCHAR(200),         -- predecessor that completed last
+    SCHEDULED_TIME TIMESTAMP_NTZ,
+    READY_TIME TIMESTAMP_NTZ,         -- gating predecessor completed (root: scheduled time)
+    QUERY_START_TIME TIMESTAMP_NTZ,
+    COMPLETED_TIME TIMESTAMP_NTZ,
+    QUEUE_MS NUMBER(18,0),            -- ready -> start (scheduling + warehouse resume / queue)
+    EXECUTION_MS NUMBER(18,0),        -- start -> completed
+    SLACK_MS NUMBER(18,0),            -- delay possible without delaying the run
+    ON_CRITICAL_PATH BOOLEAN,
+    IS_FINALIZER BOOLEAN,
+    QUERY_ID VARCHAR(100),
+    ERROR_MESSAGE STRING,
+    _ANALYZED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (GRAPH_RUN_GROUP_ID, TASK_NAME)
+);
+
+-- ----------------------------------------
+-- Per-task trends over 14 days: what to parallelise (often critical, low slack)
+-- or resize (execution-bound vs queue-bound)
+-- ----------------------------------------
+CREATE OR REPLACE VIEW V_TASK_CRITICAL_PATH_TRENDS AS
+SELECT
+    s.TASK_NAME,
+    COUNT(*) AS RUNS,
+    COUNT_IF(s.STATE = 'SKIPPED') AS SKIPPED_RUNS,
+    COUNT_IF(s.STATE IN ('FAILED', 'FAILED_AND_AUTO_SUSPENDED', 'CANCELLED')) AS FAILED_RUNS,
+    ROUND(AVG(IFF(s.ON_CRITICAL_PATH, 1, 0)) * 100, 1) AS PCT_ON_CRITICAL_PATH,
+    ROUND(MEDIAN(s.QUEUE_MS)) AS P50_QUEUE_MS,
+    ROUND(MEDIAN(s.EXECUTION_MS)) AS P50_EXECUTION_MS,
+    ROUND(PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY s.EXECUTION_MS)) AS P95_EXECUTION_MS,
+    ROUND(MEDIAN(s.SLACK_MS)) AS P50_SLACK_MS,
+    ROUND(AVG(s.QUEUE_MS) / NULLIF(AVG(s.QUEUE_MS) + AVG(s.EXECUTION_MS), 0) * 100, 1) AS PCT_TIME_QUEUED
+FROM TASK_RUN_STATS s
+JOIN TASK_GRAPH_RUNS r ON r.GRAPH_RUN_GROUP_ID = s.GRAPH_RUN_GROUP_ID
+WHERE r.SCHEDULED_TIME >= DATEADD('day', -14, CURRENT_TIMESTAMP())
+GROUP BY s.TASK_NAME;
+
+-- ----------------------------------------
+-- Procedure
+-- ----------------------------------------
+CREATE OR REPLACE PROCEDURE ANALYZE_TASK_GRAPH()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+PACKAGES = ('snowflake-snowpark-python', 'pandas')
+IMPORTS = ('@SNOWGOAL_DB.RAW.PYTHON_CODE/task_graph_analyzer.py')
+HANDLER = 'task_graph_analyzer.main'
+EXECUTE AS OWNER
+COMMENT = 'Critical path, queue vs execution time and warehouse idle gaps of each task graph run';
+
+-- Manual execution for testing:
+-- CALL ANALYZE_TASK_GRAPH();
+-- SELECT * FROM TASK_GRAPH_RUNS ORDER BY SCHEDULED_TIME DESC LIMIT 10;
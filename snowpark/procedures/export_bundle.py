@@ -0,0 +1,133 @@
+"""
+SnowGoal - Dashboard Bundle Export
+Version: 1.0
+Features: Versioned Parquet export of GOLD (+ tables read by the dashboard) to the
+DASHBOARD_BUNDLE stage, latest.json manifest, retention of old versions, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+from datetime import datetime
+import traceback
+
+STAGE = "@SNOWGOAL_DB.GOLD.DASHBOARD_BUNDLE"
+# Nombre de versions conservées sur le stage (les lecteurs en cours gardent leur version)
+BUNDLE_RETENTION = 3
+
+# SILVER tables read directly by dashboard pages
+SILVER_TABLES = ["MATCHES", "TEAMS", "SCORERS", "COMPETITIONS"]
+
+# Precomputed betting views (only what the pages need)
+EXPORT_QUERIES = {
+    "SILVER.ODDS": """
+        SELECT *
+        FROM SNOWGOAL_DB.SILVER.ODDS
+        WHERE COMMENCE_TIME > DATEADD('day', -1, CURRENT_TIMESTAMP())
+    """,
+}
+
+
+def list_exports(session):
+    """{'SCHEMA.TABLE': query} for every GOLD table/view + SILVER dashboard tables"""
+    rows = session.sql("""
+        SELECT TABLE_NAME
+        FROM SNOWGOAL_DB.INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = 'GOLD'
+        ORDER BY TABLE_NAME
+    """).collect()
+    exports = {f"GOLD.{r['TABLE_NAME']}": f"SELECT * FROM SNOWGOAL_DB.GOLD.{r['TABLE_NAME']}" for r in rows}
+    exports.update({f"SILVER.{t}": f"SELECT * FROM SNOWGOAL_DB.SILVER.{t}" for t in SILVER_TABLES})
+    exports.update(EXPORT_QUERIES)
+    return exports
+
+
+def export_table(session, version, name, query):
+    """COPY one table into a single compressed Parquet file, returns (path, rows)"""
+    path = f"{version}/{name.replace('.', '/')}.parquet"
+    result = session.sql(f"""
+        COPY INTO {STAGE}/{path}
+        FROM ({query})
+        FILE_FORMAT = (TYPE = PARQUET COMPRESSION = SNAPPY)
+        HEADER = TRUE
+        SINGLE = TRUE
+        OVERWRITE = TRUE
+        MAX_FILE_SIZE = 1073741824
+    """).collect()
+    rows = int(result[0]['rows_unloaded']) if result else 0
+    return path, rows
+
+
+def publish_manifest(session, version, files):
+    """latest.json: written last, so readers never see a partial bundle"""
+    pairs = ", ".join(f"'{name}', OBJECT_CONSTRUCT('file', '{path}', 'rows', {rows})" for name, (path, rows) in files.items())
+    session.sql(f"""
+        COPY INTO {STAGE}/latest.json
+        FROM (
+            SELECT OBJECT_CONSTRUCT(
+                'version', '{version}',
+                'exported_at', TO_VARCHAR(CURRENT_TIMESTAMP(), 'YYYY-MM-DD HH24:MI:SS'),
+                'tables', OBJECT_CONSTRUCT({pairs})
+            )
+        )
+        FILE_FORMAT = (TYPE = JSON COMPRESSION = NONE)
+        SINGLE = TRUE
+        OVERWRITE = TRUE
+    """).collect()
+
+
+def prune_versions(session, version):
+    """Keep the last BUNDLE_RETENTION versions on the stage"""
+    names = [r['name'] for r in session.sql(f"LIST {STAGE}").collect()]
+    # name = <url>/<version>/<SCHEMA>/<TABLE>.parquet
+    versions = sorted({n.split('/')[-3] for n in names if n.endswith('.parquet') and len(n.split('/')) >= 3})
+    removed = [v for v in versions[:-BUNDLE_RETENTION] if v != version]
+    for old in removed:
+        session.sql(f"REMOVE {STAGE}/{old}/").collect()
+    return removed
+
+
+def main(session: snowpark.Session) -> str:
+    COMPONENT_NAME = 'EXPORT_GOLD_BUNDLE'
+
+    try:
+        version = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        files = {}
+        errors = []
+
+        for name, query in list_exports(session).items():
+            try:
+                files[name] = export_table(session, version, name, query)
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
+
+        if files:
+            publish_manifest(session, version, files)
+        removed = prune_versions(session, version)
+
+        total_rows = sum(rows for _, rows in files.values())
+        summary = f"Bundle {version}: {len(files)} tables | {total_rows} rows | {len(removed)} old versions removed"
+
+        if not errors:
+            status, level = 'SUCCESS', 'INFO'
+        elif files:
+            status, level = 'PARTIAL SUCCESS', 'WARNING'
+        else:
+            status, level = 'FAILED', 'ERROR'
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=[level, COMPONENT_NAME, f"{status}: {summary}", "\n".join(errors) if errors else None]
+        ).collect()
+
+        return f"{status}: {summary}"
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
@@ -1,6 +1,6 @@
 """
 SnowGoal - Fetch All Leagues
-Version: 2.0 - With Partial Success Logic & Intelligent Status
+Version: 2.1 - With Partial Success Logic, Intelligent Status & Per-Stage Metrics
 """
 
 import snowflake.snowpark as snowpark
@@ -10,6 +10,7 @@ import json
 import time
 import _snowflake
 import traceback
+from pipeline_metrics import MetricsRecorder
 
 BASE_URL = "https://api.football-data.org/v4"
 
@@ -20,42 +21,51 @@ COMPETITIONS = [
 # 10 calls/minute = 30s delay between leagues for 5 endpoints per league
 RATE_LIMIT_DELAY = 30 
 
-def fetch_api(endpoint, api_key):
+def fetch_api(endpoint, api_key, metrics, competition_code, name):
+    """GET one endpoint, measured as an HTTP stage (latency, status, bytes, records)"""
     headers = {"X-Auth-Token": api_key}
     url = BASE_URL + endpoint
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
-
-def fetch_competition_data(competition_code, api_key):
+    with metrics.stage("HTTP", competition_code, ENDPOINT=name) as m:
+        response = requests.get(url, headers=headers)
+        m["STATUS"] = str(response.status_code)
+        m["BYTES"] = len(response.content)
+        # Quota restant (10 appels/minute sur le free tier)
+        if "X-Requests-Available-Minute" in response.headers:
+            m["ATTRIBUTES"] = {"requests_available_minute": response.headers["X-Requests-Available-Minute"]}
+        response.raise_for_status()
+        payload = response.json()
+        m["RECORDS"] = len(payload[name]) if isinstance(payload.get(name), list) else 1
+        return payload
+
+def fetch_competition_data(competition_code, api_key, metrics):
     """Fetch all data for a competition and return as dicts"""
     results = {"competition": competition_code, "teams": 0, "matches": 0, "standings": 0, "scorers": 0}
     data = {"competitions": [], "teams": [], "matches": [], "standings": [], "scorers": []}
 
     try:
         # 1. Competition info
-        comp_data = fetch_api(f"/competitions/{competition_code}", api_key)
+        comp_data = fetch_api(f"/competitions/{competition_code}", api_key, metrics, competition_code, "competition")
         data["competitions"].append({"COMPETITION_CODE": competition_code, "RAW_DATA": json.dumps(comp_data)})
 
         # 2. Teams
-        teams_data = fetch_api(f"/competitions/{competition_code}/teams", api_key)
+        teams_data = fetch_api(f"/competitions/{competition_code}/teams", api_key, metrics, competition_code, "teams")
         for team in teams_data.get("teams", []):
             data["teams"].append({"COMPETITION_CODE": competition_code, "RAW_DATA": json.dumps(team)})
             results["teams"] += 1
 
         # 3. Matches
-        matches_data = fetch_api(f"/competitions/{competition_code}/matches", api_key)
+        matches_data = fetch_api(f"/competitions/{competition_code}/matches", api_key, metrics, competition_code, "matches")
         for match in matches_data.get("matches", []):
             data["matches"].append({"COMPETITION_CODE": competition_code, "RAW_DATA": json.dumps(match)})
             results["matches"] += 1
 
         # 4. Standings
-        standings_data = fetch_api(f"/competitions/{competition_code}/standings", api_key)
+        standings_data = fetch_api(f"/competitions/{competition_code}/standings", api_key, metrics, competition_code, "standings")
         data["standings"].append({"COMPETITION_CODE": competition_code, "RAW_DATA": json.dumps(standings_data)})
         results["standings"] = 1
 
         # 5. Scorers
-        scorers_data = fetch_api(f"/competitions/{competition_code}/scorers", api_key)
+        scorers_data = fetch_api(f"/competitions/{competition_code}/scorers", api_key, metrics, competition_code, "scorers")
         for scorer in scorers_data.get("scorers", []):
             data["scorers"].append({"COMPETITION_CODE": competition_code, "RAW_DATA": json.dumps(scorer)})
             results["scorers"] += 1
@@ -66,28 +76,32 @@ def fetch_competition_data(competition_code, api_key):
     return results, data
 
 
-def batch_insert(session, all_data, key, table_name):
-    """Bulk insert using write_pandas + PARSE_JSON"""
+def batch_insert(session, all_data, key, table_name, metrics):
+    """Bulk insert using write_pandas + PARSE_JSON, measured as a LOAD stage"""
     rows = []
     for d in all_data:
         rows.extend(d.get(key, []))
     if not rows:
-        return
+        return 0
 
-    df = pd.DataFrame(rows)
-    temp_table = f"TEMP_{table_name}"
-    session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+    with metrics.stage("LOAD", f"RAW.{table_name}", RECORDS=len(rows), BYTES=sum(len(r["RAW_DATA"]) for r in rows)) as m:
+        df = pd.DataFrame(rows)
+        temp_table = f"TEMP_{table_name}"
+        session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
 
-    session.sql(f"""
-        INSERT INTO RAW.{table_name} (COMPETITION_CODE, RAW_DATA)
-        SELECT COMPETITION_CODE, PARSE_JSON(RAW_DATA)
-        FROM {temp_table}
-    """).collect()
+        session.sql(f"""
+            INSERT INTO RAW.{table_name} (COMPETITION_CODE, RAW_DATA)
+            SELECT COMPETITION_CODE, PARSE_JSON(RAW_DATA)
+            FROM {temp_table}
+        """).collect()
+        m["ROWS_INSERTED"] = len(rows)
+    return len(rows)
 
 
 def main(session: snowpark.Session) -> str:
     COMPONENT_NAME = 'FETCH_ALL_LEAGUES'
-    
+    metrics = MetricsRecorder(session, COMPONENT_NAME)
+
     try:
         api_key = _snowflake.get_generic_secret_string('api_key')
         all_results = []
@@ -98,16 +112,18 @@ def main(session: snowpark.Session) -> str:
             if i > 0:
                 time.sleep(RATE_LIMIT_DELAY)
 
-            result, data = fetch_competition_data(comp_code, api_key)
+            result, data = fetch_competition_data(comp_code, api_key, metrics)
             all_results.append(result)
             all_data.append(data)
 
         # 2. BATCH INSERT DANS SNOWFLAKE
-        batch_insert(session, all_data, "competitions", "RAW_COMPETITIONS")
-        batch_insert(session, all_data, "teams", "RAW_TEAMS")
-        batch_insert(session, all_data, "matches", "RAW_MATCHES")
-        batch_insert(session, all_data, "standings", "RAW_STANDINGS")
-        batch_insert(session, all_data, "scorers", "RAW_SCORERS")
+        inserted = 0
+        inserted += batch_insert(session, all_data, "competitions", "RAW_COMPETITIONS", metrics)
+        inserted += batch_insert(session, all_data, "teams", "RAW_TEAMS", metrics)
+        inserted += batch_insert(session, all_data, "matches", "RAW_MATCHES", metrics)
+        inserted += batch_insert(session, all_data, "standings", "RAW_STANDINGS", metrics)
+        inserted += batch_insert(session, all_data, "scorers", "RAW_SCORERS", metrics)
+        metrics.flush()
 
         # 3. ANALYSE DES RÉSULTATS
         total_teams = sum(r.get("teams", 0) for r in all_results)
@@ -136,10 +152,10 @@ def main(session: snowpark.Session) -> str:
         if league_errors:
             summary += f" | {num_errors} error(s) detected"
 
-        # 4. LOGGING CENTRALISÉ
+        # 4. LOGGING CENTRALISÉ (détail par étape dans COMMON.PIPELINE_METRICS, même RUN_ID)
         session.sql(
-            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
-            params=[log_level, COMPONENT_NAME, summary, "; ".join(league_errors) if league_errors else None]
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE, AFFECTED_ROWS) VALUES (?, ?, ?, ?, ?)",
+            params=[log_level, COMPONENT_NAME, summary, "; ".join(league_errors) if league_errors else None, inserted]
         ).collect()
 
         return summary
@@ -147,6 +163,7 @@ def main(session: snowpark.Session) -> str:
     except Exception as e:
         error_msg = str(e)
         stack_trace = traceback.format_exc()
+        metrics.flush()
         try:
             session.sql(
                 "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
@@ -1,7 +1,8 @@
 """
 SnowGoal - Fetch Betting Odds
-Version: 2.0 - Production Ready
-Features: Rate Limiting, Batch Insert, Centralized Logging & Intelligent Status
+Version: 2.2 - Production Ready
+Features: Rate Limiting, Batch Insert, Team ID Resolution, Centralized Logging & Intelligent Status,
+Per-Stage Metrics (COMMON.PIPELINE_METRICS)
 """
 
 import snowflake.snowpark as snowpark
@@ -11,6 +12,8 @@ import json
 import time
 import _snowflake
 import traceback
+from team_mapping import resolve_aliases
+from pipeline_metrics import MetricsRecorder
 
 BASE_URL = "https://api.the-odds-api.com/v4/sports"
 
@@ -32,8 +35,8 @@ LEAGUES = {
 # Respect des limites de l'API Free Tier (3 secondes entre chaque appel)
 RATE_LIMIT_DELAY = 3 
 
-def fetch_odds_for_league(sport_key, api_key):
-    """Effectue l'appel API pour une ligue spécifique"""
+def fetch_odds_for_league(sport_key, api_key, metrics, competition_code):
+    """Effectue l'appel API pour une ligue spécifique (étape HTTP mesurée)"""
     url = f"{BASE_URL}/{sport_key}/odds"
     params = {
         'apiKey': api_key,
@@ -41,19 +44,31 @@ def fetch_odds_for_league(sport_key, api_key):
         'markets': 'h2h',
         'oddsFormat': 'decimal'
     }
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-    return response.json()
+    with metrics.stage('HTTP', competition_code, ENDPOINT=sport_key) as m:
+        response = requests.get(url, params=params, timeout=30)
+        m['STATUS'] = str(response.status_code)
+        m['BYTES'] = len(response.content)
+        # Crédits restants du plan The Odds API
+        m['ATTRIBUTES'] = {
+            'requests_remaining': response.headers.get('x-requests-remaining'),
+            'requests_used': response.headers.get('x-requests-used'),
+        }
+        response.raise_for_status()
+        games = response.json()
+        m['RECORDS'] = len(games)
+        return games
 
 def main(session: snowpark.Session) -> str:
     COMPONENT_NAME = 'FETCH_ODDS'
-    
+    metrics = MetricsRecorder(session, COMPONENT_NAME)
+
     try:
         # Récupération sécurisée de la clé API depuis Snowflake Secrets
         api_key = _snowflake.get_generic_secret_string('odds_api_key')
         
         all_rows = []
         errors = []
+        team_names = {}
         
         # 1. BOUCLE DE RÉCUPÉRATION (Avec Rate Limiting)
         for i, (sport_key, competition_code) in enumerate(LEAGUES.items()):
@@ -61,13 +76,16 @@ def main(session: snowpark.Session) -> str:
                 if i > 0:
                     time.sleep(RATE_LIMIT_DELAY)
                 
-                games = fetch_odds_for_league(sport_key, api_key)
+                games = fetch_odds_for_league(sport_key, api_key, metrics, competition_code)
                 
                 for game in games:
                     all_rows.append({
                         "COMPETITION_CODE": competition_code,
                         "RAW_DATA": json.dumps(game)
                     })
+                    team_names.setdefault(competition_code, set()).update(
+                        [game.get('home_team'), game.get('away_team')]
+                    )
                     
             except Exception as e:
                 # On log l'erreur spécifique à la ligue mais on continue le traitement
@@ -77,22 +95,34 @@ def main(session: snowpark.Session) -> str:
         inserted_count = 0
         if all_rows:
             inserted_count = len(all_rows)
-            df = pd.DataFrame(all_rows)
-            
-            # Utilisation d'une table temporaire pour un chargement rapide
-            temp_table = "TEMP_RAW_ODDS"
-            session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
-            
-            # Insertion finale avec conversion VARIANT
-            session.sql(f"""
-                INSERT INTO RAW.RAW_ODDS (COMPETITION_CODE, RAW_DATA)
-                SELECT COMPETITION_CODE, PARSE_JSON(RAW_DATA)
-                FROM {temp_table}
-            """).collect()
-
-        # 3. LOGIQUE DE STATUT (Success / Partial Success / Failed)
+            with metrics.stage('LOAD', 'RAW.RAW_ODDS', RECORDS=inserted_count, BYTES=sum(len(r['RAW_DATA']) for r in all_rows)) as m:
+                df = pd.DataFrame(all_rows)
+
+                # Utilisation d'une table temporaire pour un chargement rapide
+                temp_table = "TEMP_RAW_ODDS"
+                session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+
+                # Insertion finale avec conversion VARIANT
+                session.sql(f"""
+                    INSERT INTO RAW.RAW_ODDS (COMPETITION_CODE, RAW_DATA)
+                    SELECT COMPETITION_CODE, PARSE_JSON(RAW_DATA)
+                    FROM {temp_table}
+                """).collect()
+                m['ROWS_INSERTED'] = inserted_count
+
+        # 3. RÉSOLUTION DES ÉQUIPES (nom Odds API -> TEAM_ID dans SILVER.TEAM_ALIASES)
+        resolved, unresolved = 0, 0
+        if team_names:
+            try:
+                with metrics.stage('LOAD', 'SILVER.TEAM_ALIASES', RECORDS=sum(len(n) for n in team_names.values())) as m:
+                    resolved, unresolved = resolve_aliases(session, team_names)
+                    m['ROWS_INSERTED'] = resolved + unresolved
+            except Exception as e:
+                errors.append(f"TEAM_MAPPING: {str(e)}")
+
+        # 4. LOGIQUE DE STATUT (Success / Partial Success / Failed)
         num_leagues = len(LEAGUES)
-        num_errors = len(errors)
+        num_errors = len([e for e in errors if not e.startswith("TEAM_MAPPING")])
         
         if num_errors == 0:
             status = "SUCCESS"
@@ -106,13 +136,18 @@ def main(session: snowpark.Session) -> str:
 
         summary = f"{status}: {num_leagues - num_errors}/{num_leagues} leagues loaded | Odds: {inserted_count}"
         
+        if resolved or unresolved:
+            summary += f" | New aliases: {resolved} resolved, {unresolved} unresolved"
         if errors:
-            summary += f" | {num_errors} error(s) detected"
+            summary += f" | {len(errors)} error(s) detected"
+        if status == "SUCCESS" and (unresolved or len(errors) > num_errors):
+            log_level = 'WARNING'
 
-        # 4. LOGGING CENTRALISÉ (Utilisation de Parameter Binding pour la sécurité)
+        # 5. LOGGING CENTRALISÉ (Utilisation de Parameter Binding pour la sécurité)
+        metrics.flush()
         session.sql(
-            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
-            params=[log_level, COMPONENT_NAME, summary, "; ".join(errors) if errors else None]
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE, AFFECTED_ROWS) VALUES (?, ?, ?, ?, ?)",
+            params=[log_level, COMPONENT_NAME, summary, "; ".join(errors) if errors else None, inserted_count]
         ).collect()
 
         return summary
@@ -121,6 +156,7 @@ def main(session: snowpark.Session) -> str:
         # Erreur critique (ex: échec de connexion, droits insuffisants)
         error_msg = str(e)
         stack_trace = traceback.format_exc()
+        metrics.flush()
         try:
             session.sql(
                 "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
@@ -0,0 +1,278 @@
+"""
+SnowGoal - Match Predictions (Poisson / Dixon-Coles)
+Version: 1.0
+Features: Time-decayed attack/defence fit per competition, Dixon-Coles low-score
+correction, batched scoring of all upcoming fixtures, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+import numpy as np
+import pandas as pd
+import traceback
+
+MODEL_VERSION = 'DC-1.0'
+
+# Historique utilisé pour le fit et demi-vie de la pondération temporelle
+TRAINING_DAYS = 730
+HALF_LIFE_DAYS = 180
+# Shrinkage vers la moyenne (en "matchs fictifs") pour les équipes peu jouées
+PRIOR_WEIGHT = 2.0
+MIN_TRAINING_MATCHES = 30
+MAX_GOALS = 10
+FIT_ITERATIONS = 100
+RHO_GRID = np.linspace(-0.20, 0.20, 81)
+
+
+def time_weights(days_ago, half_life=HALF_LIFE_DAYS):
+    """Pondération exponentielle: un match vieux d'une demi-vie compte pour 0.5"""
+    return np.exp(-np.log(2) * np.asarray(days_ago, dtype=float) / half_life)
+
+
+def fit_strengths(home_idx, away_idx, home_goals, away_goals, weights, n_teams,
+                  iterations=FIT_ITERATIONS, prior=PRIOR_WEIGHT):
+    """
+    MLE pondéré du modèle multiplicatif de Maher:
+        home goals ~ Poisson(gamma * attack[h] * defence[a])
+        away goals ~ Poisson(attack[a] * defence[h])
+    Itérations de point fixe vectorisées (np.bincount), sans boucle sur les matchs.
+    Retourne (attack, defence, home_advantage).
+    """
+    w = weights
+    scored = np.bincount(home_idx, w * home_goals, n_teams) + np.bincount(away_idx, w * away_goals, n_teams)
+    conceded = np.bincount(home_idx, w * away_goals, n_teams) + np.bincount(away_idx, w * home_goals, n_teams)
+    games = np.bincount(home_idx, w, n_teams) + np.bincount(away_idx, w, n_teams)
+
+    # Prior: chaque équipe "joue" PRIOR_WEIGHT matchs contre un adversaire moyen
+    # (attack -> 1, defence -> taux de buts encaissés de la ligue)
+    pseudo_goals = prior * (np.sum(w * home_goals) + np.sum(w * away_goals)) / max(2 * np.sum(w), 1e-9)
+
+    attack = np.ones(n_teams)
+    defence = np.ones(n_teams)
+    gamma = 1.0
+    for _ in range(iterations):
+        exp_scored = (np.bincount(home_idx, w * gamma * defence[away_idx], n_teams)
+                      + np.bincount(away_idx, w * defence[home_idx], n_teams))
+        attack = (scored + pseudo_goals) / (exp_scored + pseudo_goals)
+        attack /= np.mean(attack)
+
+        exp_conceded = (np.bincount(away_idx, w * gamma * attack[home_idx], n_teams)
+                        + np.bincount(home_idx, w * attack[away_idx], n_teams))
+        # exp_conceded compte des matchs (pondérés par gamma et l'attaque adverse): le prior ajoute
+        # PRIOR_WEIGHT de ces matchs, encaissés au taux moyen de la ligue
+        league_conceded = np.sum(conceded) / max(np.sum(exp_conceded), 1e-9)
+        defence = (conceded + prior * league_conceded) / (exp_conceded + prior)
+
+        gamma = np.sum(w * home_goals) / max(np.sum(w * attack[home_idx] * defence[away_idx]), 1e-9)
+
+    attack[games == 0] = 1.0
+    defence[games == 0] = np.average(defence[games > 0]) if np.any(games > 0) else 1.0
+    return attack, defence, gamma
+
+
+def dixon_coles_tau(home_goals, away_goals, lam, mu, rho):
+    """
+    Facteur de correction Dixon-Coles, vectorisé sur (matchs) x (valeurs de rho).
+    rho: scalaire ou array (R,) ; retourne shape broadcast (N, R) ou (N,).
+    """
+    rho = np.asarray(rho, dtype=float)
+    hg = np.asarray(home_goals)[..., None] if rho.ndim else np.asarray(home_goals)
+    ag = np.asarray(away_goals)[..., None] if rho.ndim else np.asarray(away_goals)
+    lam = np.asarray(lam)[..., None] if rho.ndim else np.asarray(lam)
+    mu = np.asarray(mu)[..., None] if rho.ndim else np.asarray(mu)
+
+    tau = np.ones(np.broadcast(hg, rho).shape)
+    tau = np.where((hg == 0) & (ag == 0), 1 - lam * mu * rho, tau)
+    tau = np.where((hg == 0) & (ag == 1), 1 + lam * rho, tau)
+    tau = np.where((hg == 1) & (ag == 0), 1 + mu * rho, tau)
+    tau = np.where((hg == 1) & (ag == 1), 1 - rho, tau)
+    return tau
+
+
+def fit_rho(home_goals, away_goals, lam, mu, weights, grid=RHO_GRID):
+    """
+    Rho maximisant la log-vraisemblance pondérée des scores faibles, à lambda/mu fixés.
+    Grid search vectorisé: une seule évaluation (N, R).
+    """
+    low = (home_goals <= 1) & (away_goals <= 1)
+    if not np.any(low):
+        return 0.0
+    tau = dixon_coles_tau(home_goals[low], away_goals[low], lam[low], mu[low], grid)
+    valid = np.all(tau > 0, axis=0)
+    loglik = np.where(valid, (weights[low][:, None] * np.log(np.clip(tau, 1e-12, None))).sum(axis=0), -np.inf)
+    return float(grid[np.argmax(loglik)])
+
+
+def score_matrix(lam, mu, rho, max_goals=MAX_GOALS):
+    """
+    Matrices de probabilité des scores pour n matchs en une passe: shape (n, G, G),
+    [i, h, a] = P(home = h, away = a). Correction Dixon-Coles sur 0-0, 0-1, 1-0, 1-1.
+    """
+    goals = np.arange(max_goals + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(goals[1:]))])
+    lam = np.asarray(lam, dtype=float)[:, None]
+    mu = np.asarray(mu, dtype=float)[:, None]
+    p_home = np.exp(goals * np.log(lam) - lam - log_fact)
+    p_away = np.exp(goals * np.log(mu) - mu - log_fact)
+
+    m = p_home[:, :, None] * p_away[:, None, :]
+    lam, mu = lam[:, 0], mu[:, 0]
+    m[:, 0, 0] *= 1 - lam * mu * rho
+    m[:, 0, 1] *= 1 + lam * rho
+    m[:, 1, 0] *= 1 + mu * rho
+    m[:, 1, 1] *= 1 - rho
+    return m / m.sum(axis=(1, 2), keepdims=True)
+
+
+def outcome_probabilities(m):
+    """Probabilités 1X2, over 2.5, BTTS et score le plus probable à partir de (n, G, G)"""
+    g = m.shape[1]
+    h, a = np.indices((g, g))
+    flat = m.reshape(m.shape[0], -1)
+    best = np.argmax(flat, axis=1)
+    return {
+        "PROB_HOME_WIN": m[:, h > a].sum(axis=1),
+        "PROB_DRAW": m[:, h == a].sum(axis=1),
+        "PROB_AWAY_WIN": m[:, h < a].sum(axis=1),
+        "PROB_OVER_2_5": m[:, (h + a) > 2].sum(axis=1),
+        "PROB_BTTS": m[:, (h > 0) & (a > 0)].sum(axis=1),
+        "MOST_LIKELY_SCORE": [f"{s // g}-{s % g}" for s in best],
+    }
+
+
+def predict_competition(history, fixtures):
+    """
+    Fit sur l'historique d'une compétition et score de toutes ses rencontres à venir.
+    history: DataFrame (HOME_TEAM_ID, AWAY_TEAM_ID, HOME_SCORE, AWAY_SCORE, DAYS_AGO)
+    fixtures: DataFrame (MATCH_ID, HOME_TEAM_ID, AWAY_TEAM_ID, ...)
+    """
+    teams = pd.Index(pd.unique(np.concatenate([history['HOME_TEAM_ID'].values, history['AWAY_TEAM_ID'].values])))
+    home_idx = teams.get_indexer(history['HOME_TEAM_ID'])
+    away_idx = teams.get_indexer(history['AWAY_TEAM_ID'])
+    home_goals = history['HOME_SCORE'].to_numpy(dtype=float)
+    away_goals = history['AWAY_SCORE'].to_numpy(dtype=float)
+    weights = time_weights(history['DAYS_AGO'].to_numpy())
+
+    attack, defence, gamma = fit_strengths(home_idx, away_idx, home_goals, away_goals, weights, len(teams))
+    rho = fit_rho(home_goals, away_goals,
+                  gamma * attack[home_idx] * defence[away_idx],
+                  attack[away_idx] * defence[home_idx], weights)
+
+    fh = teams.get_indexer(fixtures['HOME_TEAM_ID'])
+    fa = teams.get_indexer(fixtures['AWAY_TEAM_ID'])
+    known = (fh >= 0) & (fa >= 0)
+    scored = fixtures.loc[known].copy()
+    if scored.empty:
+        return scored
+
+    fh, fa = fh[known], fa[known]
+    lam = gamma * attack[fh] * defence[fa]
+    mu = attack[fa] * defence[fh]
+    probs = outcome_probabilities(score_matrix(lam, mu, rho))
+
+    scored["EXP_HOME_GOALS"] = np.round(lam, 3)
+    scored["EXP_AWAY_GOALS"] = np.round(mu, 3)
+    for col, values in probs.items():
+        scored[col] = np.round(values, 4) if col != "MOST_LIKELY_SCORE" else values
+    scored["MODEL_RHO"] = round(rho, 4)
+    scored["HOME_ADVANTAGE"] = round(float(gamma), 4)
+    scored["TRAINING_MATCHES"] = len(history)
+    scored["MODEL_VERSION"] = MODEL_VERSION
+    return scored
+
+
+def main(session: snowpark.Session) -> str:
+    COMPONENT_NAME = 'PREDICT_MATCHES'
+
+    try:
+        history = session.sql(f"""
+            SELECT COMPETITION_CODE, HOME_TEAM_ID, AWAY_TEAM_ID, HOME_SCORE, AWAY_SCORE,
+                   DATEDIFF('day', MATCH_DATE, CURRENT_TIMESTAMP()) AS DAYS_AGO
+            FROM SNOWGOAL_DB.SILVER.MATCHES
+            WHERE STATUS = 'FINISHED'
+              AND HOME_SCORE IS NOT NULL AND AWAY_SCORE IS NOT NULL
+              AND HOME_TEAM_ID IS NOT NULL AND AWAY_TEAM_ID IS NOT NULL
+              AND MATCH_DATE >= DATEADD('day', -{TRAINING_DAYS}, CURRENT_TIMESTAMP())
+        """).to_pandas()
+
+        fixtures = session.sql("""
+            SELECT MATCH_ID, COMPETITION_CODE, MATCH_DATE,
+                   HOME_TEAM_ID, HOME_TEAM_NAME, AWAY_TEAM_ID, AWAY_TEAM_NAME
+            FROM SNOWGOAL_DB.SILVER.MATCHES
+            WHERE STATUS IN ('SCHEDULED', 'TIMED')
+              AND HOME_TEAM_ID IS NOT NULL AND AWAY_TEAM_ID IS NOT NULL
+        """).to_pandas()
+
+        results = []
+        skipped = []
+        for comp, comp_fixtures in fixtures.groupby('COMPETITION_CODE'):
+            comp_history = history[history['COMPETITION_CODE'] == comp]
+            if len(comp_history) < MIN_TRAINING_MATCHES:
+                skipped.append(f"{comp}: {len(comp_history)} matches")
+                continue
+            results.append(predict_competition(comp_history, comp_fixtures))
+
+        predicted = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        written = 0
+        if not predicted.empty:
+            written = len(predicted)
+            temp_table = "TEMP_MATCH_PREDICTIONS"
+            session.write_pandas(predicted, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+
+            # MERGE: les prédictions des matchs joués restent figées (dernière valeur avant coup d'envoi)
+            session.sql(f"""
+                MERGE INTO SNOWGOAL_DB.GOLD.MATCH_PREDICTIONS AS target
+                USING {temp_table} AS source
+                ON target.MATCH_ID = source.MATCH_ID
+                WHEN MATCHED THEN
+                    UPDATE SET
+                        MATCH_DATE = source.MATCH_DATE,
+                        EXP_HOME_GOALS = source.EXP_HOME_GOALS,
+                        EXP_AWAY_GOALS = source.EXP_AWAY_GOALS,
+                        PROB_HOME_WIN = source.PROB_HOME_WIN,
+                        PROB_DRAW = source.PROB_DRAW,
+                        PROB_AWAY_WIN = source.PROB_AWAY_WIN,
+                        PROB_OVER_2_5 = source.PROB_OVER_2_5,
+                        PROB_BTTS = source.PROB_BTTS,
+                        MOST_LIKELY_SCORE = source.MOST_LIKELY_SCORE,
+                        MODEL_RHO = source.MODEL_RHO,
+                        HOME_ADVANTAGE = source.HOME_ADVANTAGE,
+                        TRAINING_MATCHES = source.TRAINING_MATCHES,
+                        MODEL_VERSION = source.MODEL_VERSION,
+                        _UPDATED_AT = CURRENT_TIMESTAMP()
+                WHEN NOT MATCHED THEN
+                    INSERT (MATCH_ID, COMPETITION_CODE, MATCH_DATE, HOME_TEAM_ID, HOME_TEAM_NAME,
+                            AWAY_TEAM_ID, AWAY_TEAM_NAME, EXP_HOME_GOALS, EXP_AWAY_GOALS,
+                            PROB_HOME_WIN, PROB_DRAW, PROB_AWAY_WIN, PROB_OVER_2_5, PROB_BTTS,
+                            MOST_LIKELY_SCORE, MODEL_RHO, HOME_ADVANTAGE, TRAINING_MATCHES, MODEL_VERSION)
+                    VALUES (source.MATCH_ID, source.COMPETITION_CODE, source.MATCH_DATE, source.HOME_TEAM_ID,
+                            source.HOME_TEAM_NAME, source.AWAY_TEAM_ID, source.AWAY_TEAM_NAME,
+                            source.EXP_HOME_GOALS, source.EXP_AWAY_GOALS, source.PROB_HOME_WIN,
+                            source.PROB_DRAW, source.PROB_AWAY_WIN, source.PROB_OVER_2_5, source.PROB_BTTS,
+                            source.MOST_LIKELY_SCORE, source.MODEL_RHO, source.HOME_ADVANTAGE,
+                            source.TRAINING_MATCHES, source.MODEL_VERSION)
+            """).collect()
+
+        status = "SUCCESS" if not skipped else "PARTIAL SUCCESS"
+        log_level = 'INFO' if not skipped else 'WARNING'
+        summary = f"{status}: {written}/{len(fixtures)} fixtures predicted"
+        if skipped:
+            summary += f" | {len(skipped)} competition(s) skipped (not enough history)"
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=[log_level, COMPONENT_NAME, summary, "; ".join(skipped) if skipped else None]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
@@ -0,0 +1,213 @@
+"""
+SnowGoal - Odds Backtesting
+Version: 1.0
+Features: Closing-odds replay against SILVER.MATCHES results, strategy grid
+(probability source x price x staking x value threshold) vectorised over all bets,
+ROI / hit rate / drawdown per competition and bookmaker, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+import numpy as np
+import pandas as pd
+import traceback
+
+from odds_consensus import consensus_by_row
+
+# Grille de seuils de value (edge = probabilité x cote - 1)
+THRESHOLDS = np.round(np.arange(0.0, 0.205, 0.01), 2)
+
+PROB_SOURCES = ['CONSENSUS', 'MODEL']         # marché sans marge / GOLD.MATCH_PREDICTIONS
+PRICE_MODES = ['BOOKMAKER', 'BEST', 'AVERAGE']  # cote de chaque bookmaker / meilleure / moyenne
+STAKINGS = ['FLAT', 'KELLY']
+
+FLAT_STAKE = 1.0
+# Kelly fractionné, non composé: mise = BANKROLL x KELLY_FRACTION x f*, plafonnée
+BANKROLL = 100.0
+KELLY_FRACTION = 0.25
+MAX_KELLY_STAKE = 0.05 * BANKROLL
+
+OUTCOMES = ['HOME', 'DRAW', 'AWAY']
+WINNER_CODES = {'HOME_TEAM': 0, 'DRAW': 1, 'AWAY_TEAM': 2}
+
+
+def load_closing_odds(session):
+    """Dernier snapshot avant le coup d'envoi par (match, bookmaker), matchs terminés uniquement"""
+    return session.sql("""
+        WITH closing AS (
+            SELECT GAME_ID, BOOKMAKER_KEY, HOME_ODDS, DRAW_ODDS, AWAY_ODDS
+            FROM SNOWGOAL_DB.SILVER.ODDS_HISTORY
+            WHERE LAST_UPDATE <= COMMENCE_TIME
+              AND HOME_ODDS > 1 AND DRAW_ODDS > 1 AND AWAY_ODDS > 1
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY GAME_ID, BOOKMAKER_KEY ORDER BY LAST_UPDATE DESC) = 1
+        ),
+        games AS (
+            SELECT DISTINCT GAME_ID, MATCH_ID
+            FROM SNOWGOAL_DB.SILVER.ODDS
+            WHERE MATCH_ID IS NOT NULL
+        )
+        SELECT c.GAME_ID, c.BOOKMAKER_KEY, c.HOME_ODDS, c.DRAW_ODDS, c.AWAY_ODDS,
+               m.COMPETITION_CODE, m.MATCH_DATE, m.WINNER,
+               p.PROB_HOME_WIN, p.PROB_DRAW, p.PROB_AWAY_WIN
+        FROM closing c
+        JOIN games g ON g.GAME_ID = c.GAME_ID
+        JOIN SNOWGOAL_DB.SILVER.MATCHES m ON m.MATCH_ID = g.MATCH_ID
+        LEFT JOIN SNOWGOAL_DB.GOLD.MATCH_PREDICTIONS p ON p.MATCH_ID = m.MATCH_ID
+        WHERE m.STATUS = 'FINISHED'
+          AND m.WINNER IN ('HOME_TEAM', 'DRAW', 'AWAY_TEAM')
+    """).to_pandas()
+
+
+def build_bets(odds, prob_source, price_mode):
+    """
+    Une ligne candidate par (match, issue[, bookmaker]) : cote, probabilité, résultat.
+    Retourne un DataFrame long trié par date (ordre de la courbe de P&L).
+    """
+    prices = odds[['HOME_ODDS', 'DRAW_ODDS', 'AWAY_ODDS']].to_numpy(dtype=float)
+    if prob_source == 'CONSENSUS':
+        probs = consensus_by_row(odds)
+    else:
+        probs = odds[['PROB_HOME_WIN', 'PROB_DRAW', 'PROB_AWAY_WIN']].to_numpy(dtype=float)
+
+    frame = pd.DataFrame({
+        'GAME_ID': np.repeat(odds['GAME_ID'].to_numpy(), 3),
+        'BOOKMAKER': np.repeat(odds['BOOKMAKER_KEY'].to_numpy(), 3),
+        'COMPETITION_CODE': np.repeat(odds['COMPETITION_CODE'].to_numpy(), 3),
+        'MATCH_DATE': np.repeat(odds['MATCH_DATE'].to_numpy(), 3),
+        'OUTCOME': np.tile(np.arange(3), len(odds)),
+        'WINNER': np.repeat(odds['WINNER'].map(WINNER_CODES).to_numpy(), 3),
+        'ODDS': prices.ravel(),
+        'PROB': probs.ravel(),
+    })
+    frame = frame[frame['PROB'].notna()]
+
+    if price_mode != 'BOOKMAKER':
+        keys = ['GAME_ID', 'COMPETITION_CODE', 'MATCH_DATE', 'OUTCOME', 'WINNER']
+        agg = 'max' if price_mode == 'BEST' else 'mean'
+        frame = frame.groupby(keys, as_index=False).agg(ODDS=('ODDS', agg), PROB=('PROB', 'first'))
+        frame['BOOKMAKER'] = price_mode
+
+    frame['WON'] = (frame['OUTCOME'] == frame['WINNER']).astype(float)
+    frame['EDGE'] = frame['PROB'] * frame['ODDS'] - 1.0
+    return frame.sort_values(['MATCH_DATE', 'GAME_ID', 'OUTCOME']).reset_index(drop=True)
+
+
+def stakes(bets, staking):
+    """Mise par pari (N,), indépendante du seuil"""
+    if staking == 'FLAT':
+        return np.full(len(bets), FLAT_STAKE)
+    kelly = bets['EDGE'].to_numpy() / (bets['ODDS'].to_numpy() - 1.0)
+    return np.clip(BANKROLL * KELLY_FRACTION * kelly, 0.0, MAX_KELLY_STAKE)
+
+
+def evaluate(bets, staking, thresholds=THRESHOLDS):
+    """
+    Évalue tous les seuils en une passe: matrices (N paris x T seuils).
+    Agrégats par (compétition, bookmaker) + totaux 'ALL'. Drawdown: cumul chronologique
+    du P&L par groupe (groupby cumsum / cummax pandas sur les T colonnes à la fois).
+    """
+    edge = bets['EDGE'].to_numpy()
+    odds = bets['ODDS'].to_numpy()
+    won = bets['WON'].to_numpy()
+
+    placed = edge[:, None] > thresholds[None, :]                         # (N, T)
+    stake = placed * stakes(bets, staking)[:, None]                      # (N, T)
+    pnl = stake * np.where(won == 1.0, odds - 1.0, -1.0)[:, None]        # (N, T)
+    wins = placed * won[:, None]
+    odds_sum = placed * odds[:, None]
+
+    levels = [
+        (bets['COMPETITION_CODE'], bets['BOOKMAKER']),
+        (bets['COMPETITION_CODE'], pd.Series('ALL', index=bets.index)),
+        (pd.Series('ALL', index=bets.index), bets['BOOKMAKER']),
+        (pd.Series('ALL', index=bets.index), pd.Series('ALL', index=bets.index)),
+    ]
+    if bets['BOOKMAKER'].nunique() == 1:
+        levels = [levels[0], levels[2]]
+
+    frames = []
+    for comp_key, book_key in levels:
+        keys = [comp_key.rename('COMPETITION_CODE'), book_key.rename('BOOKMAKER')]
+        grouped = {
+            name: pd.DataFrame(values, columns=thresholds).groupby(keys).sum()
+            for name, values in [('N_BETS', placed.astype(float)), ('N_WON', wins), ('TOTAL_STAKED', stake),
+                                 ('PROFIT', pnl), ('ODDS_SUM', odds_sum)]
+        }
+        cumulative = pd.DataFrame(pnl, columns=thresholds).groupby(keys).cumsum()
+        running_max = cumulative.groupby(keys).cummax().clip(lower=0.0)
+        grouped['MAX_DRAWDOWN'] = (running_max - cumulative).groupby(keys).max()
+
+        stacked = pd.concat({name: df.stack() for name, df in grouped.items()}, axis=1)
+        stacked.index = stacked.index.set_names(['COMPETITION_CODE', 'BOOKMAKER', 'THRESHOLD'])
+        frames.append(stacked.reset_index())
+
+    result = pd.concat(frames, ignore_index=True)
+    result = result[result['N_BETS'] > 0].copy()
+    result['HIT_RATE'] = (result['N_WON'] / result['N_BETS']).round(4)
+    result['ROI'] = (result['PROFIT'] / result['TOTAL_STAKED']).round(4)
+    result['AVG_ODDS'] = (result['ODDS_SUM'] / result['N_BETS']).round(3)
+    result[['N_BETS', 'N_WON']] = result[['N_BETS', 'N_WON']].astype(int)
+    result[['TOTAL_STAKED', 'PROFIT', 'MAX_DRAWDOWN']] = result[['TOTAL_STAKED', 'PROFIT', 'MAX_DRAWDOWN']].round(2)
+    return result.drop(columns=['ODDS_SUM'])
+
+
+def run_backtest(odds):
+    """Toutes les stratégies de la grille; chaque combinaison est vectorisée sur paris x seuils"""
+    frames = []
+    for prob_source in PROB_SOURCES:
+        for price_mode in PRICE_MODES:
+            bets = build_bets(odds, prob_source, price_mode)
+            if bets.empty:
+                continue
+            for staking in STAKINGS:
+                result = evaluate(bets, staking)
+                result.insert(0, 'STAKING', staking)
+                result.insert(0, 'PRICE_MODE', price_mode)
+                result.insert(0, 'PROB_SOURCE', prob_source)
+                frames.append(result)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main(session: snowpark.Session) -> str:
+    COMPONENT_NAME = 'BACKTEST_ODDS'
+
+    try:
+        odds = load_closing_odds(session)
+        if odds.empty:
+            summary = "SUCCESS: no finished matches with stored odds yet"
+            results = pd.DataFrame()
+        else:
+            results = run_backtest(odds)
+            summary = (f"SUCCESS: {odds['GAME_ID'].nunique()} matches, {len(odds)} closing quotes | "
+                       f"{len(THRESHOLDS)} thresholds x {len(PROB_SOURCES) * len(PRICE_MODES) * len(STAKINGS)} strategies | "
+                       f"Rows: {len(results)}")
+
+        if not results.empty:
+            temp_table = "TEMP_BACKTEST_RESULTS"
+            session.write_pandas(results, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+            session.sql(f"""
+                INSERT OVERWRITE INTO SNOWGOAL_DB.GOLD.BACKTEST_RESULTS
+                    (PROB_SOURCE, PRICE_MODE, STAKING, COMPETITION_CODE, BOOKMAKER, THRESHOLD,
+                     N_BETS, N_WON, HIT_RATE, TOTAL_STAKED, PROFIT, ROI, MAX_DRAWDOWN, AVG_ODDS)
+                SELECT PROB_SOURCE, PRICE_MODE, STAKING, COMPETITION_CODE, BOOKMAKER, THRESHOLD,
+                       N_BETS, N_WON, HIT_RATE, TOTAL_STAKED, PROFIT, ROI, MAX_DRAWDOWN, AVG_ODDS
+                FROM {temp_table}
+            """).collect()
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=['INFO', COMPONENT_NAME, summary, None]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
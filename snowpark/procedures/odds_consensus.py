@@ -0,0 +1,181 @@
+"""
+SnowGoal - Odds Consensus (De-vigged Probabilities)
+Version: 1.0
+Features: Proportional / Shin / Power margin removal vectorised over all bookmaker
+quotes, margin-weighted consensus per game, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+import numpy as np
+import pandas as pd
+import traceback
+
+METHODS = ['PROPORTIONAL', 'SHIN', 'POWER']
+# Préfixe des colonnes GOLD.ODDS_CONSENSUS par méthode
+COLUMN_PREFIX = {'PROPORTIONAL': 'PROP', 'SHIN': 'SHIN', 'POWER': 'POWER'}
+# Méthode retenue pour les colonnes CONSENSUS_* (Shin corrige le biais favori/outsider)
+CONSENSUS_METHOD = 'SHIN'
+
+BISECTION_STEPS = 60
+# Plancher de marge pour la pondération 1/marge (évite un poids infini)
+MIN_MARGIN = 0.005
+
+ODDS_COLUMNS = ['HOME_ODDS', 'DRAW_ODDS', 'AWAY_ODDS']
+
+
+def devig_proportional(implied):
+    """p_i = q_i / sum(q)"""
+    return implied / implied.sum(axis=1, keepdims=True)
+
+
+def devig_shin(implied, steps=BISECTION_STEPS):
+    """
+    Méthode de Shin: p_i = (sqrt(z^2 + 4(1-z) q_i^2 / S) - z) / (2(1-z)),
+    z (part de parieurs initiés) résolu par bisection vectorisée sur toutes les lignes.
+    Retourne (probabilités (N, 3), z (N,)).
+    """
+    booksum = implied.sum(axis=1, keepdims=True)
+    lo = np.zeros((len(implied), 1))
+    hi = np.full((len(implied), 1), 0.5)
+
+    def probs(z):
+        return (np.sqrt(z ** 2 + 4 * (1 - z) * implied ** 2 / booksum) - z) / (2 * (1 - z))
+
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        too_high = probs(mid).sum(axis=1, keepdims=True) > 1
+        lo = np.where(too_high, mid, lo)
+        hi = np.where(too_high, hi, mid)
+    z = (lo + hi) / 2
+    p = probs(z)
+    return p / p.sum(axis=1, keepdims=True), z[:, 0]
+
+
+def devig_power(implied, steps=BISECTION_STEPS):
+    """p_i = q_i^k avec k >= 1 tel que sum(p) = 1, bisection vectorisée sur k"""
+    lo = np.ones((len(implied), 1))
+    hi = np.full((len(implied), 1), 10.0)
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        too_high = (implied ** mid).sum(axis=1, keepdims=True) > 1
+        lo = np.where(too_high, mid, lo)
+        hi = np.where(too_high, hi, mid)
+    p = implied ** ((lo + hi) / 2)
+    return p / p.sum(axis=1, keepdims=True)
+
+
+def devig(implied, method):
+    if method == 'PROPORTIONAL':
+        return devig_proportional(implied)
+    if method == 'SHIN':
+        return devig_shin(implied)[0]
+    if method == 'POWER':
+        return devig_power(implied)
+    raise ValueError(f"Unknown de-vig method: {method}")
+
+
+def consensus_by_row(odds, method=CONSENSUS_METHOD):
+    """
+    Consensus par match aligné sur chaque ligne de cotes (N, 3): moyenne des
+    probabilités sans marge de chaque bookmaker, pondérée par 1 / marge.
+    odds: DataFrame avec GAME_ID + HOME_ODDS, DRAW_ODDS, AWAY_ODDS (une ligne par bookmaker)
+    """
+    implied = 1.0 / odds[ODDS_COLUMNS].to_numpy(dtype=float)
+    weights = 1.0 / np.maximum(implied.sum(axis=1) - 1.0, MIN_MARGIN)
+    weighted = pd.DataFrame(devig(implied, method) * weights[:, None])
+    weighted['W'] = weights
+    sums = weighted.groupby(odds['GAME_ID'].to_numpy()).transform('sum').to_numpy()
+    probs = sums[:, :3] / sums[:, 3:]
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+def compute_consensus(odds):
+    """Une ligne par match: consensus pour chaque méthode, z de Shin moyen, marge moyenne"""
+    implied = 1.0 / odds[ODDS_COLUMNS].to_numpy(dtype=float)
+    games = odds.groupby('GAME_ID', sort=False).agg(
+        MATCH_ID=('MATCH_ID', 'max'),
+        COMPETITION_CODE=('COMPETITION_CODE', 'first'),
+        COMMENCE_TIME=('COMMENCE_TIME', 'first'),
+        HOME_TEAM=('HOME_TEAM', 'first'),
+        AWAY_TEAM=('AWAY_TEAM', 'first'),
+        NB_BOOKMAKERS=('BOOKMAKER_KEY', 'nunique'),
+        LAST_ODDS_UPDATE=('LAST_UPDATE', 'max'),
+    )
+    first_row = ~odds['GAME_ID'].duplicated().to_numpy()
+
+    for method in METHODS:
+        probs = consensus_by_row(odds, method)[first_row]
+        prefix = COLUMN_PREFIX[method]
+        games[f'{prefix}_HOME_PROB'] = np.round(probs[:, 0], 4)
+        games[f'{prefix}_DRAW_PROB'] = np.round(probs[:, 1], 4)
+        games[f'{prefix}_AWAY_PROB'] = np.round(probs[:, 2], 4)
+
+    rows = pd.DataFrame({
+        'MARGIN': implied.sum(axis=1) - 1.0,
+        'SHIN_Z': devig_shin(implied)[1],
+    }).groupby(odds['GAME_ID'].to_numpy()).mean()
+    games['AVG_MARGIN_PCT'] = np.round(rows['MARGIN'].reindex(games.index).to_numpy() * 100, 2)
+    games['SHIN_Z'] = np.round(rows['SHIN_Z'].reindex(games.index).to_numpy(), 4)
+
+    prefix = COLUMN_PREFIX[CONSENSUS_METHOD]
+    for outcome in ['HOME', 'DRAW', 'AWAY']:
+        games[f'CONSENSUS_{outcome}_PROB'] = games[f'{prefix}_{outcome}_PROB']
+        games[f'FAIR_{outcome}_ODDS'] = np.round(1.0 / games[f'{prefix}_{outcome}_PROB'], 3)
+    games['CONSENSUS_METHOD'] = CONSENSUS_METHOD
+    return games.reset_index()
+
+
+def main(session: snowpark.Session) -> str:
+    COMPONENT_NAME = 'COMPUTE_ODDS_CONSENSUS'
+
+    try:
+        # Matchs à venir uniquement: après le coup d'envoi, le consensus reste figé (clôture)
+        odds = session.sql("""
+            SELECT GAME_ID, MATCH_ID, COMPETITION_CODE, COMMENCE_TIME, HOME_TEAM, AWAY_TEAM,
+                   BOOKMAKER_KEY, HOME_ODDS, DRAW_ODDS, AWAY_ODDS, LAST_UPDATE
+            FROM SNOWGOAL_DB.SILVER.ODDS
+            WHERE COMMENCE_TIME > CURRENT_TIMESTAMP()
+              AND HOME_ODDS > 1 AND DRAW_ODDS > 1 AND AWAY_ODDS > 1
+            ORDER BY GAME_ID
+        """).to_pandas()
+
+        written = 0
+        if not odds.empty:
+            consensus = compute_consensus(odds)
+            consensus['MATCH_ID'] = consensus['MATCH_ID'].astype("Int64")
+            written = len(consensus)
+            temp_table = "TEMP_ODDS_CONSENSUS"
+            session.write_pandas(consensus, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+
+            columns = [c for c in consensus.columns if c != 'GAME_ID']
+            session.sql(f"""
+                MERGE INTO SNOWGOAL_DB.GOLD.ODDS_CONSENSUS AS target
+                USING {temp_table} AS source
+                ON target.GAME_ID = source.GAME_ID
+                WHEN MATCHED THEN
+                    UPDATE SET {', '.join(f'{c} = source.{c}' for c in columns)}, _UPDATED_AT = CURRENT_TIMESTAMP()
+                WHEN NOT MATCHED THEN
+                    INSERT (GAME_ID, {', '.join(columns)})
+                    VALUES (source.GAME_ID, {', '.join(f'source.{c}' for c in columns)})
+            """).collect()
+
+        summary = f"SUCCESS: {written} games | {len(odds)} bookmaker quotes de-vigged ({', '.join(METHODS)})"
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=['INFO', COMPONENT_NAME, summary, None]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
@@ -0,0 +1,101 @@
+"""
+SnowGoal - Pipeline Metrics
+Structured per-stage measurements (HTTP calls, RAW loads) buffered in memory
+during a procedure run and written in one batch to COMMON.PIPELINE_METRICS.
+Imported by fetch_all_leagues.py and fetch_odds.py.
+"""
+
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+METRICS_TABLE = "SNOWGOAL_DB.COMMON.PIPELINE_METRICS"
+
+COLUMNS = [
+    'RUN_ID', 'COMPONENT_NAME', 'STAGE', 'OBJECT_NAME', 'ENDPOINT', 'STATUS', 'STARTED_AT',
+    'DURATION_MS', 'BYTES', 'RECORDS', 'ROWS_INSERTED', 'ROWS_UPDATED', 'ROWS_SKIPPED', 'ATTRIBUTES'
+]
+
+
+def current_run_id(session):
+    """Task graph run group id when called by a task, random UUID for a manual CALL"""
+    try:
+        run_id = session.sql("SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID')").collect()[0][0]
+        if run_id:
+            return str(run_id)
+    except Exception:
+        pass
+    return str(uuid.uuid4())
+
+
+class MetricsRecorder:
+    """
+    recorder = MetricsRecorder(session, 'FETCH_ODDS')
+    with recorder.stage('HTTP', 'PL', endpoint='odds') as m:
+        ...
+        m['BYTES'] = len(response.content)
+    recorder.flush()
+    """
+
+    def __init__(self, session, component_name):
+        self.session = session
+        self.component_name = component_name
+        self.run_id = current_run_id(session)
+        self.rows = []
+
+    def add(self, stage, object_name, **values):
+        """Record one measurement (values: any column of COLUMNS), returns the row for later updates"""
+        row = {'STAGE': stage, 'OBJECT_NAME': object_name, **values}
+        self.rows.append(row)
+        return row
+
+    @contextmanager
+    def stage(self, stage, object_name, **values):
+        """Time the block: DURATION_MS, STARTED_AT and STATUS ('OK' / 'ERROR' unless set inside)"""
+        row = self.add(stage, object_name, STARTED_AT=datetime.utcnow(), **values)
+        started = time.perf_counter()
+        try:
+            yield row
+        except Exception as e:
+            row.setdefault('STATUS', 'ERROR')
+            row.setdefault('ATTRIBUTES', {})['error'] = str(e)[:500]
+            raise
+        finally:
+            row['DURATION_MS'] = int((time.perf_counter() - started) * 1000)
+            row.setdefault('STATUS', 'OK')
+
+    def flush(self):
+        """Write the buffered measurements (one write_pandas + INSERT); never fails the caller"""
+        if not self.rows:
+            return 0
+        try:
+            df = pd.DataFrame(self.rows).reindex(columns=COLUMNS)
+            df['RUN_ID'] = self.run_id
+            df['COMPONENT_NAME'] = self.component_name
+            df['STATUS'] = df['STATUS'].astype("string")
+            df['STARTED_AT'] = pd.to_datetime(df['STARTED_AT']).dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+            df['ATTRIBUTES'] = [json.dumps(a) if isinstance(a, dict) else None for a in df['ATTRIBUTES']]
+            for col in ['DURATION_MS', 'BYTES', 'RECORDS', 'ROWS_INSERTED', 'ROWS_UPDATED', 'ROWS_SKIPPED']:
+                df[col] = df[col].astype("Int64")
+
+            temp_table = "TEMP_PIPELINE_METRICS"
+            self.session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+            select = [
+                'TO_TIMESTAMP_NTZ(STARTED_AT)' if c == 'STARTED_AT' else 'PARSE_JSON(ATTRIBUTES)' if c == 'ATTRIBUTES' else c
+                for c in COLUMNS
+            ]
+            self.session.sql(f"""
+                INSERT INTO {METRICS_TABLE} ({', '.join(COLUMNS)})
+                SELECT {', '.join(select)}
+                FROM {temp_table}
+            """).collect()
+            written = len(df)
+        except Exception:
+            # Les métriques ne doivent jamais faire échouer l'ingestion
+            written = 0
+        self.rows = []
+        return written
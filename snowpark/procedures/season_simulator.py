@@ -0,0 +1,249 @@
+"""
+SnowGoal - Season Simulator (Monte Carlo)
+Version: 1.0
+Features: Batched NumPy sampling of remaining fixtures, title/top-4/relegation
+probabilities, Process pool across competitions, Nightly gating, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+import numpy as np
+import pandas as pd
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+N_SIMULATIONS = 100_000
+CHUNK_SIZE = 10_000
+RANDOM_SEED = 2024
+
+# Probabilités par défaut si le match n'a pas de prédiction (MATCH_PREDICTIONS)
+DEFAULT_PROBS = (0.45, 0.27, 0.28)
+
+TOP_N = 4
+# Nombre de places de relégation (directe + barrage) par championnat
+RELEGATION_SPOTS = {
+    'PL': 3,
+    'PD': 3,
+    'BL1': 3,
+    'SA': 3,
+    'FL1': 3,
+    'PPL': 3,
+    'DED': 3,
+    'ELC': 3,
+    'BSA': 4
+}
+
+# Fenêtre nocturne (Europe/Paris): la simulation ne tourne qu'une fois par nuit
+NIGHTLY_HOURS = range(0, 6)
+MIN_HOURS_BETWEEN_RUNS = 20
+CATCH_UP_HOURS = 30
+
+
+def simulate_competition(payload):
+    """
+    Simule N saisons pour une compétition, entièrement en opérations vectorisées.
+    payload: dict picklable (exécuté dans un process du pool)
+        base_points (T,), goal_diff (T,), home_idx (F,), away_idx (F,), probs (F, 3)
+    Retourne dict: position_counts (T, T), points_sum (T,)
+    """
+    base_points = payload['base_points'].astype(np.float32)
+    goal_diff = payload['goal_diff'].astype(np.float32)
+    home_idx, away_idx, probs = payload['home_idx'], payload['away_idx'], payload['probs']
+    n_sims, chunk = payload['n_sims'], payload['chunk']
+    n_teams, n_fixtures = len(base_points), len(home_idx)
+    rng = np.random.default_rng(payload['seed'])
+
+    # Matrices d'incidence (F, T): points d'un match -> points par équipe via un produit matriciel
+    home_incidence = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_incidence = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_incidence[np.arange(n_fixtures), home_idx] = 1.0
+    away_incidence[np.arange(n_fixtures), away_idx] = 1.0
+    p_home = probs[:, 0].astype(np.float32)
+    p_home_or_draw = (probs[:, 0] + probs[:, 1]).astype(np.float32)
+
+    position_counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+    points_sum = np.zeros(n_teams, dtype=np.float64)
+    team_offsets = np.arange(n_teams) * n_teams
+
+    done = 0
+    while done < n_sims:
+        size = min(chunk, n_sims - done)
+        u = rng.random((size, n_fixtures), dtype=np.float32)
+        home_win = u < p_home
+        draw = (~home_win) & (u < p_home_or_draw)
+        away_win = ~(home_win | draw)
+
+        home_pts = 3.0 * home_win + draw
+        away_pts = 3.0 * away_win + draw
+        points = base_points + home_pts @ home_incidence + away_pts @ away_incidence
+
+        # Départage: différence de buts actuelle puis aléatoire
+        score = points + goal_diff * 1e-3 + rng.random((size, n_teams), dtype=np.float32) * 1e-4
+        order = np.argsort(-score, axis=1)
+        positions = np.empty_like(order)
+        positions[np.arange(size)[:, None], order] = np.arange(n_teams)
+
+        position_counts += np.bincount((team_offsets + positions).ravel(), minlength=n_teams * n_teams)
+        points_sum += points.sum(axis=0)
+        done += size
+
+    return {
+        'competition_code': payload['competition_code'],
+        'position_counts': position_counts.reshape(n_teams, n_teams),
+        'points_sum': points_sum,
+    }
+
+
+def build_payload(comp, standings, fixtures, n_sims=N_SIMULATIONS):
+    """Indices d'équipes et probabilités par match pour une compétition"""
+    team_index = pd.Index(standings['TEAM_ID'])
+    fixtures = fixtures[fixtures['HOME_TEAM_ID'].isin(team_index) & fixtures['AWAY_TEAM_ID'].isin(team_index)]
+    probs = fixtures[['PROB_HOME_WIN', 'PROB_DRAW', 'PROB_AWAY_WIN']].to_numpy(dtype=float)
+    missing = np.isnan(probs).any(axis=1)
+    probs[missing] = DEFAULT_PROBS
+    probs = probs / probs.sum(axis=1, keepdims=True)
+
+    return {
+        'competition_code': comp,
+        'base_points': standings['POINTS'].to_numpy(dtype=float),
+        'goal_diff': standings['GOAL_DIFF'].to_numpy(dtype=float),
+        'home_idx': team_index.get_indexer(fixtures['HOME_TEAM_ID']),
+        'away_idx': team_index.get_indexer(fixtures['AWAY_TEAM_ID']),
+        'probs': probs,
+        'n_sims': n_sims,
+        'chunk': CHUNK_SIZE,
+        'seed': RANDOM_SEED + sum(map(ord, comp)),
+        'n_fixtures': len(fixtures),
+        'n_predicted': int((~missing).sum()),
+    }
+
+
+def run_simulations(payloads):
+    """Une compétition par process; repli séquentiel si le pool n'est pas disponible"""
+    try:
+        workers = max(1, min(len(payloads), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(simulate_competition, payloads))
+    except (OSError, NotImplementedError, RuntimeError):
+        return [simulate_competition(p) for p in payloads]
+
+
+def summarize(result, standings, payload, season_year):
+    """Probabilités par équipe à partir de la distribution des positions"""
+    counts = result['position_counts']
+    n_sims = payload['n_sims']
+    n_teams = len(standings)
+    relegation = RELEGATION_SPOTS.get(payload['competition_code'], 3)
+    probs = counts / n_sims
+
+    df = standings[['TEAM_ID', 'TEAM_NAME', 'POSITION', 'POINTS']].rename(
+        columns={'POSITION': 'CURRENT_POSITION', 'POINTS': 'CURRENT_POINTS'}
+    ).copy()
+    df['COMPETITION_CODE'] = payload['competition_code']
+    df['SEASON_YEAR'] = season_year
+    df['EXPECTED_POINTS'] = np.round(result['points_sum'] / n_sims, 1)
+    df['EXPECTED_POSITION'] = np.round(probs @ np.arange(1, n_teams + 1), 2)
+    df['PROB_TITLE'] = np.round(probs[:, 0], 4)
+    df['PROB_TOP_4'] = np.round(probs[:, :TOP_N].sum(axis=1), 4)
+    df['PROB_RELEGATION'] = np.round(probs[:, n_teams - relegation:].sum(axis=1), 4)
+    df['POSITION_PROBS'] = [json.dumps(np.round(row, 4).tolist()) for row in probs]
+    df['N_SIMULATIONS'] = n_sims
+    df['REMAINING_FIXTURES'] = payload['n_fixtures']
+    df['PREDICTED_FIXTURES'] = payload['n_predicted']
+    return df
+
+
+def should_run(session, force):
+    """Une exécution par nuit; rattrapage si la dernière simulation est trop ancienne"""
+    if force:
+        return True
+    last_run = session.sql("SELECT MAX(SIMULATED_AT) AS LAST_RUN FROM SNOWGOAL_DB.GOLD.SEASON_SIMULATIONS").collect()[0]['LAST_RUN']
+    now = session.sql("SELECT CONVERT_TIMEZONE('Europe/Paris', CURRENT_TIMESTAMP())::TIMESTAMP_NTZ AS NOW").collect()[0]['NOW']
+    if last_run is None:
+        return True
+    elapsed = now - last_run
+    if elapsed >= timedelta(hours=CATCH_UP_HOURS):
+        return True
+    return now.hour in NIGHTLY_HOURS and elapsed >= timedelta(hours=MIN_HOURS_BETWEEN_RUNS)
+
+
+def main(session: snowpark.Session, force: bool = False) -> str:
+    COMPONENT_NAME = 'SIMULATE_SEASONS'
+
+    try:
+        if not should_run(session, force):
+            return "SKIPPED: season simulations already computed for this night"
+
+        # Classement courant des championnats (dernière saison)
+        standings = session.sql("""
+            SELECT s.COMPETITION_CODE, s.SEASON_YEAR, s.TEAM_ID, s.TEAM_NAME, s.POSITION, s.POINTS, s.GOAL_DIFF
+            FROM SNOWGOAL_DB.SILVER.STANDINGS s
+            JOIN SNOWGOAL_DB.SILVER.COMPETITIONS c ON c.COMPETITION_CODE = s.COMPETITION_CODE
+            WHERE c.TYPE = 'LEAGUE'
+            QUALIFY s.SEASON_YEAR = MAX(s.SEASON_YEAR) OVER (PARTITION BY s.COMPETITION_CODE)
+            ORDER BY s.COMPETITION_CODE, s.POSITION
+        """).to_pandas()
+
+        fixtures = session.sql("""
+            SELECT m.COMPETITION_CODE, m.SEASON_YEAR, m.HOME_TEAM_ID, m.AWAY_TEAM_ID,
+                   p.PROB_HOME_WIN, p.PROB_DRAW, p.PROB_AWAY_WIN
+            FROM SNOWGOAL_DB.SILVER.MATCHES m
+            LEFT JOIN SNOWGOAL_DB.GOLD.MATCH_PREDICTIONS p ON p.MATCH_ID = m.MATCH_ID
+            WHERE m.STATUS IN ('SCHEDULED', 'TIMED', 'POSTPONED')
+        """).to_pandas()
+
+        payloads, season_years, comp_standings = [], {}, {}
+        for comp, comp_table in standings.groupby('COMPETITION_CODE'):
+            season_year = int(comp_table['SEASON_YEAR'].iloc[0])
+            comp_fixtures = fixtures[(fixtures['COMPETITION_CODE'] == comp) & (fixtures['SEASON_YEAR'] == season_year)]
+            comp_table = comp_table.reset_index(drop=True)
+            payloads.append(build_payload(comp, comp_table, comp_fixtures))
+            season_years[comp] = season_year
+            comp_standings[comp] = comp_table
+
+        results = run_simulations(payloads)
+        summary_frames = [
+            summarize(result, comp_standings[p['competition_code']], p, season_years[p['competition_code']])
+            for result, p in zip(results, payloads)
+        ]
+
+        written = 0
+        if summary_frames:
+            df = pd.concat(summary_frames, ignore_index=True)
+            written = len(df)
+            temp_table = "TEMP_SEASON_SIMULATIONS"
+            session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+            session.sql(f"""
+                INSERT OVERWRITE INTO SNOWGOAL_DB.GOLD.SEASON_SIMULATIONS
+                    (COMPETITION_CODE, SEASON_YEAR, TEAM_ID, TEAM_NAME, CURRENT_POSITION, CURRENT_POINTS,
+                     EXPECTED_POINTS, EXPECTED_POSITION, PROB_TITLE, PROB_TOP_4, PROB_RELEGATION,
+                     POSITION_PROBS, N_SIMULATIONS, REMAINING_FIXTURES, PREDICTED_FIXTURES, SIMULATED_AT)
+                SELECT COMPETITION_CODE, SEASON_YEAR, TEAM_ID, TEAM_NAME, CURRENT_POSITION, CURRENT_POINTS,
+                       EXPECTED_POINTS, EXPECTED_POSITION, PROB_TITLE, PROB_TOP_4, PROB_RELEGATION,
+                       PARSE_JSON(POSITION_PROBS), N_SIMULATIONS, REMAINING_FIXTURES, PREDICTED_FIXTURES,
+                       CONVERT_TIMEZONE('Europe/Paris', CURRENT_TIMESTAMP())::TIMESTAMP_NTZ
+                FROM {temp_table}
+            """).collect()
+
+        summary = f"SUCCESS: {len(payloads)} competitions x {N_SIMULATIONS} seasons | Teams: {written}"
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=['INFO', COMPONENT_NAME, summary, None]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
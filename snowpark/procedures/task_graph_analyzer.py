@@ -0,0 +1,307 @@
+"""
+SnowGoal - Task Graph Analyzer
+Version: 1.0
+Features: Rebuilds each run of the task graph from TASK_HISTORY (GRAPH_RUN_GROUP_ID),
+critical path, per-task queue vs execution time, slack, warehouse idle gaps,
+results stored in COMMON.TASK_GRAPH_RUNS / COMMON.TASK_RUN_STATS, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+import pandas as pd
+import json
+import traceback
+
+ROOT_TASK = 'TASK_FETCH_ALL_LEAGUES'
+# Runs re-analysed à chaque appel (upsert): couvre le run courant + les précédents
+LOOKBACK_HOURS = 48
+
+PENDING_STATES = ('SCHEDULED', 'EXECUTING')
+FAILED_STATES = ('FAILED', 'FAILED_AND_AUTO_SUSPENDED', 'CANCELLED')
+
+
+def short_name(name):
+    """'"SNOWGOAL_DB"."COMMON"."TASK_X"' / SNOWGOAL_DB.COMMON.TASK_X -> TASK_X"""
+    return str(name).split('.')[-1].strip('"')
+
+
+def load_dag(session):
+    """{task: [predecessors]} for the root (none) and every task below it; the finalizer is not listed"""
+    rows = session.sql(f"""
+        SELECT NAME, PREDECESSORS
+        FROM TABLE(SNOWGOAL_DB.INFORMATION_SCHEMA.TASK_DEPENDENTS(
+            TASK_NAME => 'SNOWGOAL_DB.COMMON.{ROOT_TASK}', RECURSIVE => TRUE
+        ))
+    """).collect()
+    dag = {}
+    for row in rows:
+        preds = row['PREDECESSORS']
+        preds = json.loads(preds) if isinstance(preds, str) else list(preds or [])
+        dag[short_name(row['NAME'])] = [short_name(p) for p in preds]
+    # La racine n'est pas toujours renvoyée par TASK_DEPENDENTS: jamais de prédécesseur
+    dag[ROOT_TASK] = []
+    return dag
+
+
+def load_history(session):
+    """Last attempt of every task of the recent graph runs (UTC, NTZ)"""
+    return session.sql(f"""
+        SELECT
+            GRAPH_RUN_GROUP_ID,
+            NAME,
+            STATE,
+            ATTEMPT_NUMBER,
+            CONVERT_TIMEZONE('UTC', SCHEDULED_TIME)::TIMESTAMP_NTZ AS SCHEDULED_TIME,
+            CONVERT_TIMEZONE('UTC', QUERY_START_TIME)::TIMESTAMP_NTZ AS QUERY_START_TIME,
+            CONVERT_TIMEZONE('UTC', COMPLETED_TIME)::TIMESTAMP_NTZ AS COMPLETED_TIME,
+            QUERY_ID,
+            ERROR_MESSAGE
+        FROM TABLE(SNOWGOAL_DB.INFORMATION_SCHEMA.TASK_HISTORY(
+            SCHEDULED_TIME_RANGE_START => DATEADD('hour', -{LOOKBACK_HOURS}, CURRENT_TIMESTAMP()),
+            RESULT_LIMIT => 10000
+        ))
+        WHERE SCHEMA_NAME = 'COMMON'
+          AND GRAPH_RUN_GROUP_ID IS NOT NULL
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY GRAPH_RUN_GROUP_ID, NAME
+            ORDER BY ATTEMPT_NUMBER DESC, SCHEDULED_TIME DESC
+        ) = 1
+    """).to_pandas()
+
+
+def ms(delta):
+    return None if pd.isna(delta) else max(int(delta.total_seconds() * 1000), 0)
+
+
+def idle_gaps(intervals):
+    """Merge (start, end) execution intervals: busy ms + list of gaps (ms) where no task runs"""
+    busy, gaps = 0, []
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None:
+            current_start, current_end = start, end
+        elif start > current_end:
+            busy += ms(current_end - current_start)
+            gaps.append(ms(start - current_end))
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        busy += ms(current_end - current_start)
+    return busy, gaps
+
+
+def analyze_run(run, dag):
+    """
+    One graph run (one row per task) -> (run summary dict, per-task DataFrame), or None
+    when no task of the run completed (no end task to walk back from).
+
+    READY_TIME = completion of the latest predecessor (the one that gated the task),
+    or SCHEDULED_TIME for the root. QUEUE_MS = start - ready (warehouse resume and
+    scheduling), EXECUTION_MS = completion - start. The critical path walks back from
+    the last task to complete through gating predecessors. SLACK_MS = how much later a
+    task could have completed without delaying the run (backward pass on actual times).
+    Tasks other than the root without predecessor in the DAG (the finalizer) depend on
+    every other task of the run.
+    """
+    if run['COMPLETED_TIME'].isna().all():
+        return None
+    run = run.set_index('NAME')
+    names = list(run.index)
+    finalizers = [n for n in names if n != ROOT_TASK and not dag.get(n)]
+    preds = {n: [p for p in dag.get(n, []) if p in run.index] for n in names}
+    for f in finalizers:
+        preds[f] = [n for n in names if n not in finalizers]
+
+    done = run['COMPLETED_TIME'].notna()
+    started = run['QUERY_START_TIME']
+    completed = run['COMPLETED_TIME']
+
+    gating, ready = {}, {}
+    for n in names:
+        candidates = [p for p in preds[n] if done[p]]
+        if candidates:
+            gating[n] = max(candidates, key=lambda p: completed[p])
+            ready[n] = completed[gating[n]]
+        else:
+            gating[n] = None
+            ready[n] = run.at[n, 'SCHEDULED_TIME']
+
+    queue = {n: ms(started[n] - ready[n]) if pd.notna(started[n]) else None for n in names}
+    execution = {n: ms(completed[n] - started[n]) if pd.notna(started[n]) and done[n] else 0 for n in names}
+
+    # Chemin critique: du dernier task terminé vers la racine via le prédécesseur bloquant
+    end_task = completed[done].idxmax()
+    path, node = [], end_task
+    while node is not None and node not in path:
+        path.append(node)
+        node = gating[node]
+    path.reverse()
+
+    # Slack: latest finish sans retarder la fin du run
+    run_end = completed[end_task]
+    successors = {n: [s for s in names if n in preds[s]] for n in names}
+    latest_finish = {}
+    for n in sorted([n for n in names if done[n]], key=lambda n: completed[n], reverse=True):
+        limits = [
+            latest_finish[s] - pd.Timedelta(milliseconds=(queue[s] or 0) + execution[s])
+            for s in successors[n] if s in latest_finish
+        ]
+        latest_finish[n] = min(limits) if limits else run_end
+    slack = {n: ms(latest_finish[n] - completed[n]) if n in latest_finish else None for n in names}
+
+    intervals = [(started[n], completed[n]) for n in names if pd.notna(started[n]) and done[n]]
+    busy_ms, gaps = idle_gaps(intervals)
+    span_ms = ms(max(e for _, e in intervals) - min(s for s, _ in intervals)) if intervals else 0
+
+    states = run['STATE']
+    if states.isin(FAILED_STATES).any():
+        state = 'FAILED'
+    elif (states == 'SKIPPED').any():
+        state = 'SKIPPED'
+    else:
+        state = 'SUCCEEDED'
+
+    leaves = [n for n in path if n not in finalizers]
+    critical_exec = {n: execution[n] for n in path}
+    root_scheduled = run['SCHEDULED_TIME'].min()
+
+    summary = {
+        'GRAPH_RUN_GROUP_ID': run['GRAPH_RUN_GROUP_ID'].iloc[0],
+        'ROOT_TASK': ROOT_TASK,
+        'STATE': state,
+        'SCHEDULED_TIME': root_scheduled,
+        'STARTED_AT': started.min(),
+        'COMPLETED_AT': run_end,
+        'TOTAL_DURATION_MS': ms(run_end - root_scheduled),
+        'CRITICAL_PATH': json.dumps(path),
+        'CRITICAL_PATH_LENGTH': len(path),
+        'CRITICAL_QUEUE_MS': sum(queue[n] or 0 for n in path),
+        'CRITICAL_EXECUTION_MS': sum(critical_exec.values()),
+        'BOTTLENECK_TASK': max(critical_exec, key=critical_exec.get),
+        'LAST_LEAF_TASK': leaves[-1] if leaves else None,
+        'TASKS_TOTAL': len(names),
+        'TASKS_SUCCEEDED': int((states == 'SUCCEEDED').sum()),
+        'TASKS_FAILED': int(states.isin(FAILED_STATES).sum()),
+        'TASKS_SKIPPED': int((states == 'SKIPPED').sum()),
+        'TOTAL_QUEUE_MS': sum(q or 0 for q in queue.values()),
+        'TOTAL_EXECUTION_MS': sum(execution.values()),
+        'WAREHOUSE_BUSY_MS': busy_ms,
+        'WAREHOUSE_IDLE_MS': max(span_ms - busy_ms, 0),
+        'IDLE_GAPS': len(gaps),
+        'MAX_IDLE_GAP_MS': max(gaps) if gaps else 0,
+        'AVG_PARALLELISM': round(sum(execution.values()) / busy_ms, 2) if busy_ms else None,
+    }
+
+    tasks = pd.DataFrame({
+        'GRAPH_RUN_GROUP_ID': summary['GRAPH_RUN_GROUP_ID'],
+        'TASK_NAME': names,
+        'STATE': states.to_numpy(),
+        'ATTEMPT_NUMBER': run['ATTEMPT_NUMBER'].to_numpy(),
+        'PREDECESSORS': [json.dumps(preds[n]) for n in names],
+        'GATING_TASK': [gating[n] for n in names],
+        'SCHEDULED_TIME': run['SCHEDULED_TIME'].to_numpy(),
+        'READY_TIME': [ready[n] for n in names],
+        'QUERY_START_TIME': started.to_numpy(),
+        'COMPLETED_TIME': completed.to_numpy(),
+        'QUEUE_MS': [queue[n] for n in names],
+        'EXECUTION_MS': [execution[n] for n in names],
+        'SLACK_MS': [slack[n] for n in names],
+        'ON_CRITICAL_PATH': [n in path for n in names],
+        'IS_FINALIZER': [n in finalizers for n in names],
+        'QUERY_ID': run['QUERY_ID'].to_numpy(),
+        'ERROR_MESSAGE': run['ERROR_MESSAGE'].to_numpy(),
+    })
+    for col in ['QUEUE_MS', 'EXECUTION_MS', 'SLACK_MS', 'ATTEMPT_NUMBER']:
+        tasks[col] = tasks[col].astype("Int64")
+    return summary, tasks
+
+
+def analyze_history(history, dag):
+    """Every graph run whose DAG tasks are all done (the finalizer may still be running)"""
+    runs, tasks = [], []
+    for _, run in history.groupby('GRAPH_RUN_GROUP_ID', sort=False):
+        dag_tasks = run[run['NAME'].isin(dag.keys())]
+        if dag_tasks.empty or dag_tasks['STATE'].isin(PENDING_STATES).any():
+            continue
+        # Finalizer en cours (appel depuis la finalisation): ré-analysé au prochain appel
+        run = run[run['COMPLETED_TIME'].notna()]
+        result = analyze_run(run, dag)
+        if result is None:
+            continue
+        summary, task_stats = result
+        runs.append(summary)
+        tasks.append(task_stats)
+    if not runs:
+        return pd.DataFrame(), pd.DataFrame()
+    return pd.DataFrame(runs), pd.concat(tasks, ignore_index=True)
+
+
+def save(session, runs, tasks):
+    """Upsert runs (MERGE) and replace the task rows of the analysed runs"""
+    for col in ['SCHEDULED_TIME', 'STARTED_AT', 'COMPLETED_AT']:
+        runs[col] = pd.to_datetime(runs[col])
+    session.write_pandas(runs, "TEMP_TASK_GRAPH_RUNS", auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+    columns = [c for c in runs.columns if c != 'GRAPH_RUN_GROUP_ID']
+    values = {c: f"source.{c}" for c in columns}
+    values['CRITICAL_PATH'] = "PARSE_JSON(source.CRITICAL_PATH)::ARRAY"
+    session.sql(f"""
+        MERGE INTO SNOWGOAL_DB.COMMON.TASK_GRAPH_RUNS AS target
+        USING TEMP_TASK_GRAPH_RUNS AS source
+        ON target.GRAPH_RUN_GROUP_ID = source.GRAPH_RUN_GROUP_ID
+        WHEN MATCHED THEN
+            UPDATE SET {', '.join(f'{c} = {values[c]}' for c in columns)}, _ANALYZED_AT = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN
+            INSERT (GRAPH_RUN_GROUP_ID, {', '.join(columns)})
+            VALUES (source.GRAPH_RUN_GROUP_ID, {', '.join(values[c] for c in columns)})
+    """).collect()
+
+    session.write_pandas(tasks, "TEMP_TASK_RUN_STATS", auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+    select = ["PARSE_JSON(PREDECESSORS)::ARRAY" if c == 'PREDECESSORS' else c for c in tasks.columns]
+    session.sql("""
+        DELETE FROM SNOWGOAL_DB.COMMON.TASK_RUN_STATS
+        WHERE GRAPH_RUN_GROUP_ID IN (SELECT GRAPH_RUN_GROUP_ID FROM TEMP_TASK_GRAPH_RUNS)
+    """).collect()
+    session.sql(f"""
+        INSERT INTO SNOWGOAL_DB.COMMON.TASK_RUN_STATS ({', '.join(tasks.columns)})
+        SELECT {', '.join(select)}
+        FROM TEMP_TASK_RUN_STATS
+    """).collect()
+
+
+def main(session: snowpark.Session) -> str:
+    COMPONENT_NAME = 'ANALYZE_TASK_GRAPH'
+
+    try:
+        dag = load_dag(session)
+        history = load_history(session)
+        runs, tasks = analyze_history(history, dag)
+
+        if runs.empty:
+            summary = f"SUCCESS: no completed graph run in the last {LOOKBACK_HOURS}h"
+        else:
+            save(session, runs, tasks)
+            latest = runs.sort_values('SCHEDULED_TIME').iloc[-1]
+            summary = (
+                f"SUCCESS: {len(runs)} graph runs analysed | last run {latest['TOTAL_DURATION_MS'] / 1000:.0f}s, "
+                f"critical path {' > '.join(json.loads(latest['CRITICAL_PATH']))} | "
+                f"warehouse idle {latest['WAREHOUSE_IDLE_MS'] / 1000:.0f}s"
+            )
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE, AFFECTED_ROWS) VALUES (?, ?, ?, ?, ?)",
+            params=['INFO', COMPONENT_NAME, summary, None, len(runs)]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
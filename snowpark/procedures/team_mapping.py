@@ -0,0 +1,164 @@
+"""
+SnowGoal - Team Identity Resolution
+Maps free-text team names from external sources (The Odds API) to
+football-data.org TEAM_IDs and persists the result in SILVER.TEAM_ALIASES.
+Imported by fetch_odds.py at ingestion time.
+"""
+
+import difflib
+import re
+import unicodedata
+
+import pandas as pd
+
+SOURCE_ODDS_API = 'ODDS_API'
+
+# Score minimum (0-1) pour accepter un rapprochement automatique
+MATCH_THRESHOLD = 0.80
+
+# Tokens sans valeur discriminante ("FC", "AFC", "Club"...)
+STOP_TOKENS = {
+    'fc', 'afc', 'cf', 'sc', 'ac', 'as', 'ss', 'ssc', 'us', 'sv', 'vfb', 'vfl', 'tsg',
+    'rc', 'rcd', 'cd', 'ud', 'sd', 'club', 'de', 'del', 'la', 'le', 'the', 'calcio',
+    'futbol', 'football', 'and', '1', 'sad'
+}
+
+
+def normalize_name(name):
+    """Minuscules, sans accents ni ponctuation, sans tokens génériques"""
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^a-z0-9 ]', ' ', text.lower().replace('&', ' and '))
+    tokens = [t for t in text.split() if t not in STOP_TOKENS and not re.fullmatch(r'\d{4}', t)]
+    return ' '.join(tokens)
+
+
+def similarity(alias, candidate):
+    """
+    Score 0-1 entre deux noms normalisés (ratio difflib + inclusion de tokens).
+    Un token commun seul ne suffit pas: "Real Oviedo" ne doit pas devenir "Real Madrid".
+    """
+    if not alias or not candidate:
+        return 0.0
+    if alias == candidate:
+        return 1.0
+    ratio = difflib.SequenceMatcher(None, alias, candidate).ratio()
+    alias_tokens, candidate_tokens = set(alias.split()), set(candidate.split())
+    # "Wolves" vs "Wolverhampton Wanderers", "Inter" vs "Inter Milan": inclusion stricte
+    if alias_tokens <= candidate_tokens or candidate_tokens <= alias_tokens:
+        ratio = max(ratio, 0.90)
+    return ratio
+
+
+def load_candidates(session):
+    """Équipes connues par compétition (noms longs, courts et TLA depuis SILVER.MATCHES)"""
+    rows = session.sql("""
+        SELECT DISTINCT COMPETITION_CODE, TEAM_ID, TEAM_NAME, TEAM_SHORT, TEAM_TLA
+        FROM (
+            SELECT COMPETITION_CODE, HOME_TEAM_ID AS TEAM_ID, HOME_TEAM_NAME AS TEAM_NAME,
+                   HOME_TEAM_SHORT AS TEAM_SHORT, HOME_TEAM_TLA AS TEAM_TLA
+            FROM SNOWGOAL_DB.SILVER.MATCHES
+            UNION ALL
+            SELECT COMPETITION_CODE, AWAY_TEAM_ID, AWAY_TEAM_NAME, AWAY_TEAM_SHORT, AWAY_TEAM_TLA
+            FROM SNOWGOAL_DB.SILVER.MATCHES
+        )
+        WHERE TEAM_ID IS NOT NULL
+    """).collect()
+
+    candidates = {}
+    for row in rows:
+        variants = {normalize_name(row['TEAM_NAME']), normalize_name(row['TEAM_SHORT'])}
+        if row['TEAM_TLA']:
+            variants.add(row['TEAM_TLA'].lower())
+        entry = candidates.setdefault(row['COMPETITION_CODE'], {}).setdefault(row['TEAM_ID'], set())
+        entry.update(v for v in variants if v)
+    return candidates
+
+
+def match_aliases(names, teams, taken=()):
+    """
+    Rapproche une liste de noms d'une compétition avec ses équipes.
+    Affectation gloutonne 1-1 par score décroissant : deux alias ne
+    peuvent pas pointer vers la même équipe.
+    Retourne {alias: (team_id, score)} ; team_id = None si non résolu.
+    """
+    scored = []
+    for alias in names:
+        norm = normalize_name(alias)
+        for team_id, variants in teams.items():
+            score = max(similarity(norm, v) for v in variants)
+            if score >= MATCH_THRESHOLD:
+                scored.append((score, alias, team_id))
+
+    result = {alias: (None, 0.0) for alias in names}
+    used = set(taken)
+    for score, alias, team_id in sorted(scored, key=lambda x: -x[0]):
+        if result[alias][0] is None and team_id not in used:
+            result[alias] = (team_id, round(score, 3))
+            used.add(team_id)
+    return result
+
+
+def resolve_aliases(session, names_by_competition, source=SOURCE_ODDS_API):
+    """
+    Résout les noms absents (ou encore UNRESOLVED) de SILVER.TEAM_ALIASES
+    et écrit le résultat. Les alias MANUAL ne sont jamais écrasés.
+    Retourne (résolus, non résolus).
+    """
+    existing = session.sql(
+        "SELECT COMPETITION_CODE, ALIAS_NAME, TEAM_ID, MATCH_METHOD FROM SNOWGOAL_DB.SILVER.TEAM_ALIASES WHERE SOURCE = ?",
+        params=[source]
+    ).collect()
+    known = {(r['COMPETITION_CODE'], r['ALIAS_NAME']) for r in existing if r['MATCH_METHOD'] != 'UNRESOLVED'}
+    taken = {}
+    for r in existing:
+        if r['TEAM_ID'] is not None:
+            taken.setdefault(r['COMPETITION_CODE'], set()).add(r['TEAM_ID'])
+
+    pending = {
+        comp: sorted({n for n in names if n and (comp, n) not in known})
+        for comp, names in names_by_competition.items()
+    }
+    pending = {comp: names for comp, names in pending.items() if names}
+    if not pending:
+        return 0, 0
+
+    candidates = load_candidates(session)
+    rows = []
+    for comp, names in pending.items():
+        matches = match_aliases(names, candidates.get(comp, {}), taken.get(comp, ()))
+        for alias, (team_id, score) in matches.items():
+            rows.append({
+                "SOURCE": source,
+                "ALIAS_NAME": alias,
+                "COMPETITION_CODE": comp,
+                "TEAM_ID": team_id,
+                "MATCH_SCORE": score,
+                "MATCH_METHOD": 'FUZZY' if team_id is not None else 'UNRESOLVED'
+            })
+
+    temp_table = "TEMP_TEAM_ALIASES"
+    df = pd.DataFrame(rows)
+    df["TEAM_ID"] = df["TEAM_ID"].astype("Int64")  # NULL (pas NaN) pour les non résolus
+    session.write_pandas(df, temp_table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+    session.sql(f"""
+        MERGE INTO SNOWGOAL_DB.SILVER.TEAM_ALIASES AS target
+        USING {temp_table} AS source
+        ON target.SOURCE = source.SOURCE
+           AND target.COMPETITION_CODE = source.COMPETITION_CODE
+           AND target.ALIAS_NAME = source.ALIAS_NAME
+        WHEN MATCHED AND target.MATCH_METHOD = 'UNRESOLVED' THEN
+            UPDATE SET
+                TEAM_ID = source.TEAM_ID,
+                MATCH_SCORE = source.MATCH_SCORE,
+                MATCH_METHOD = source.MATCH_METHOD,
+                _UPDATED_AT = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN
+            INSERT (SOURCE, ALIAS_NAME, COMPETITION_CODE, TEAM_ID, MATCH_SCORE, MATCH_METHOD)
+            VALUES (source.SOURCE, source.ALIAS_NAME, source.COMPETITION_CODE, source.TEAM_ID,
+                    source.MATCH_SCORE, source.MATCH_METHOD)
+    """).collect()
+
+    resolved = sum(1 for r in rows if r["TEAM_ID"] is not None)
+    return resolved, len(rows) - resolved
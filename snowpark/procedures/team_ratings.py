@@ -0,0 +1,270 @@
+"""
+SnowGoal - Team Ratings (Elo)
+Version: 1.0
+Features: Incremental update from SILVER stream, vectorised per-date batch replay,
+Full recompute mode, Centralized Logging
+"""
+
+import snowflake.snowpark as snowpark
+from snowflake.snowpark.functions import col
+import numpy as np
+import pandas as pd
+import traceback
+
+# Paramètres Elo (modifier => relancer en mode FULL_REFRESH)
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+
+MATCH_COLUMNS = """
+    MATCH_ID, COMPETITION_CODE, MATCH_DATE,
+    HOME_TEAM_ID, HOME_TEAM_NAME, AWAY_TEAM_ID, AWAY_TEAM_NAME,
+    HOME_SCORE, AWAY_SCORE
+"""
+HISTORY_COLUMNS = "MATCH_ID, TEAM_ID, COMPETITION_CODE, MATCH_DATE, OPPONENT_ID, IS_HOME, RATING_BEFORE, RATING_AFTER, EXPECTED_SCORE, ACTUAL_SCORE"
+RATING_COLUMNS = "TEAM_ID, TEAM_NAME, COMPETITION_CODE, RATING, PEAK_RATING, MATCHES_RATED, LAST_MATCH_DATE"
+RATED_FILTER = """
+    STATUS = 'FINISHED'
+    AND HOME_SCORE IS NOT NULL AND AWAY_SCORE IS NOT NULL
+    AND HOME_TEAM_ID IS NOT NULL AND AWAY_TEAM_ID IS NOT NULL
+"""
+# Lire le stream (SELECT) n'avance pas son offset: seul un DML commité le consomme
+STREAM_NEW_MATCHES = "(SELECT * FROM SNOWGOAL_DB.SILVER.STREAM_SILVER_MATCHES_ELO WHERE METADATA$ACTION = 'INSERT')"
+
+# Écritures appliquées dans la même transaction que la consommation du stream
+FULL_WRITES = [
+    f"INSERT OVERWRITE INTO SNOWGOAL_DB.GOLD.TEAM_RATING_HISTORY ({HISTORY_COLUMNS}) SELECT {HISTORY_COLUMNS} FROM TEMP_RATING_HISTORY",
+    f"INSERT OVERWRITE INTO SNOWGOAL_DB.GOLD.TEAM_RATINGS ({RATING_COLUMNS}) SELECT {RATING_COLUMNS} FROM TEMP_TEAM_RATINGS",
+]
+INCREMENTAL_WRITES = [
+    f"INSERT INTO SNOWGOAL_DB.GOLD.TEAM_RATING_HISTORY ({HISTORY_COLUMNS}) SELECT {HISTORY_COLUMNS} FROM TEMP_RATING_HISTORY",
+    """
+        MERGE INTO SNOWGOAL_DB.GOLD.TEAM_RATINGS AS target
+        USING TEMP_TEAM_RATINGS AS source
+        ON target.TEAM_ID = source.TEAM_ID
+        WHEN MATCHED THEN
+            UPDATE SET
+                TEAM_NAME = source.TEAM_NAME,
+                COMPETITION_CODE = source.COMPETITION_CODE,
+                RATING = source.RATING,
+                PEAK_RATING = source.PEAK_RATING,
+                MATCHES_RATED = source.MATCHES_RATED,
+                LAST_MATCH_DATE = source.LAST_MATCH_DATE,
+                _UPDATED_AT = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN
+            INSERT (TEAM_ID, TEAM_NAME, COMPETITION_CODE, RATING, PEAK_RATING, MATCHES_RATED, LAST_MATCH_DATE)
+            VALUES (source.TEAM_ID, source.TEAM_NAME, source.COMPETITION_CODE, source.RATING,
+                    source.PEAK_RATING, source.MATCHES_RATED, source.LAST_MATCH_DATE)
+    """,
+]
+
+
+def goal_diff_multiplier(goal_diff):
+    """Multiplicateur World Football Elo: 1 (<=1 but), 1.5 (2 buts), (11 + N) / 8 au-delà"""
+    gd = np.abs(np.asarray(goal_diff, dtype=float))
+    return np.where(gd <= 1, 1.0, np.where(gd == 2, 1.5, (11.0 + gd) / 8.0))
+
+
+def replay(matches, ratings, team_index):
+    """
+    Applique les matchs (triés par date) aux ratings, un batch vectorisé par date:
+    les équipes jouent au plus une fois par jour, donc les mises à jour d'une même
+    date sont indépendantes et s'appliquent en une fois avec np.add.at.
+    Retourne (ratings mis à jour, DataFrame d'historique une ligne par équipe et par match).
+    """
+    home_idx = team_index.get_indexer(matches['HOME_TEAM_ID'])
+    away_idx = team_index.get_indexer(matches['AWAY_TEAM_ID'])
+    home_goals = matches['HOME_SCORE'].to_numpy(dtype=float)
+    away_goals = matches['AWAY_SCORE'].to_numpy(dtype=float)
+    actual = np.where(home_goals > away_goals, 1.0, np.where(home_goals == away_goals, 0.5, 0.0))
+    multiplier = goal_diff_multiplier(home_goals - away_goals)
+
+    n = len(matches)
+    home_before = np.empty(n)
+    away_before = np.empty(n)
+    expected = np.empty(n)
+    delta = np.empty(n)
+
+    dates = matches['MATCH_DATE'].dt.normalize().to_numpy()
+    boundaries = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1], True])
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        h, a = home_idx[start:end], away_idx[start:end]
+        rh, ra = ratings[h], ratings[a]
+        e = 1.0 / (1.0 + 10.0 ** ((ra - rh - HOME_ADVANTAGE) / 400.0))
+        d = K_FACTOR * multiplier[start:end] * (actual[start:end] - e)
+
+        home_before[start:end], away_before[start:end] = rh, ra
+        expected[start:end], delta[start:end] = e, d
+        np.add.at(ratings, h, d)
+        np.add.at(ratings, a, -d)
+
+    base = matches[['MATCH_ID', 'COMPETITION_CODE', 'MATCH_DATE']]
+    history = pd.concat([
+        base.assign(TEAM_ID=matches['HOME_TEAM_ID'].values, OPPONENT_ID=matches['AWAY_TEAM_ID'].values,
+                    IS_HOME=True, RATING_BEFORE=home_before, RATING_AFTER=home_before + delta,
+                    EXPECTED_SCORE=expected, ACTUAL_SCORE=actual),
+        base.assign(TEAM_ID=matches['AWAY_TEAM_ID'].values, OPPONENT_ID=matches['HOME_TEAM_ID'].values,
+                    IS_HOME=False, RATING_BEFORE=away_before, RATING_AFTER=away_before - delta,
+                    EXPECTED_SCORE=1.0 - expected, ACTUAL_SCORE=1.0 - actual),
+    ], ignore_index=True)
+    history[['RATING_BEFORE', 'RATING_AFTER']] = history[['RATING_BEFORE', 'RATING_AFTER']].round(2)
+    history['EXPECTED_SCORE'] = history['EXPECTED_SCORE'].round(4)
+    return ratings, history
+
+
+def team_snapshot(matches, ratings, team_index, peaks):
+    """Une ligne par équipe: rating courant, pic, nombre de matchs et dernier match"""
+    sides = pd.concat([
+        matches[['MATCH_DATE', 'COMPETITION_CODE']].assign(TEAM_ID=matches['HOME_TEAM_ID'].values, TEAM_NAME=matches['HOME_TEAM_NAME'].values),
+        matches[['MATCH_DATE', 'COMPETITION_CODE']].assign(TEAM_ID=matches['AWAY_TEAM_ID'].values, TEAM_NAME=matches['AWAY_TEAM_NAME'].values),
+    ]).sort_values('MATCH_DATE')
+    last = sides.groupby('TEAM_ID').agg(
+        TEAM_NAME=('TEAM_NAME', 'last'),
+        COMPETITION_CODE=('COMPETITION_CODE', 'last'),
+        LAST_MATCH_DATE=('MATCH_DATE', 'last'),
+        MATCHES_RATED=('MATCH_DATE', 'size'),
+    ).reset_index()
+    idx = team_index.get_indexer(last['TEAM_ID'])
+    last['RATING'] = ratings[idx].round(2)
+    last['PEAK_RATING'] = peaks[idx].round(2)
+    return last
+
+
+def load_matches(session, source):
+    return session.sql(f"""
+        SELECT {MATCH_COLUMNS}
+        FROM {source}
+        WHERE {RATED_FILTER}
+        ORDER BY MATCH_DATE, MATCH_ID
+    """).to_pandas()
+
+
+def full_refresh(session):
+    """Rejoue tout l'historique de SILVER.MATCHES depuis INITIAL_RATING"""
+    matches = load_matches(session, "SNOWGOAL_DB.SILVER.MATCHES")
+    team_index = pd.Index(pd.unique(np.concatenate([matches['HOME_TEAM_ID'].values, matches['AWAY_TEAM_ID'].values])))
+    ratings = np.full(len(team_index), INITIAL_RATING)
+    ratings, history = replay(matches, ratings, team_index)
+
+    peaks = history.groupby('TEAM_ID')['RATING_AFTER'].max().reindex(team_index).fillna(INITIAL_RATING).to_numpy()
+    snapshot = team_snapshot(matches, ratings, team_index, np.maximum(peaks, INITIAL_RATING))
+
+    write_temp(session, history, "TEMP_RATING_HISTORY")
+    write_temp(session, snapshot, "TEMP_TEAM_RATINGS")
+    return len(matches), len(snapshot)
+
+
+def write_temp(session, df, table):
+    session.write_pandas(df, table, auto_create_table=True, overwrite=True, table_type="temp", quote_identifiers=False)
+
+
+def consume_stream(session, expected):
+    """
+    Consomme le stream (DML) dans la transaction des écritures. Le stream a été lu au
+    début du run sans être consommé: si des matchs notables y sont arrivés depuis, ils
+    seraient consommés sans être notés -> échec, ROLLBACK, repris au prochain run.
+    """
+    consumed = session.sql(f"""
+        INSERT INTO ELO_CONSUMED_MATCHES
+        SELECT MATCH_ID FROM {STREAM_NEW_MATCHES}
+        WHERE {RATED_FILTER}
+    """).collect()[0][0]
+    if consumed != expected:
+        raise RuntimeError(f"Stream changed during refresh ({expected} matches read, {consumed} consumed), retry on next run")
+
+
+def incremental_refresh(session, matches):
+    """
+    Applique uniquement les matchs nouvellement terminés (lus dans le stream SILVER).
+    Retourne None si un recalcul complet est nécessaire (premier run, score corrigé
+    d'un match déjà noté, ou match antérieur au dernier match noté d'une de ses équipes).
+    """
+    if session.table("SNOWGOAL_DB.GOLD.TEAM_RATINGS").count() == 0:
+        return None
+
+    if matches.empty:
+        return 0, 0
+
+    team_ids = pd.unique(np.concatenate([matches['HOME_TEAM_ID'].values, matches['AWAY_TEAM_ID'].values]))
+    current = session.table("SNOWGOAL_DB.GOLD.TEAM_RATINGS").select(
+        "TEAM_ID", "RATING", "PEAK_RATING", "MATCHES_RATED", "LAST_MATCH_DATE"
+    ).filter(col("TEAM_ID").isin(team_ids.tolist())).to_pandas()
+    already_rated = session.table("SNOWGOAL_DB.GOLD.TEAM_RATING_HISTORY").filter(
+        col("MATCH_ID").isin(matches['MATCH_ID'].tolist())
+    ).count()
+
+    last_dates = current.set_index('TEAM_ID')['LAST_MATCH_DATE']
+    prev_home = matches['HOME_TEAM_ID'].map(last_dates)
+    prev_away = matches['AWAY_TEAM_ID'].map(last_dates)
+    out_of_order = ((matches['MATCH_DATE'] <= prev_home) | (matches['MATCH_DATE'] <= prev_away)).any()
+    if already_rated or out_of_order:
+        return None
+
+    team_index = pd.Index(team_ids)
+    known = current.set_index('TEAM_ID').reindex(team_index)
+    ratings = known['RATING'].fillna(INITIAL_RATING).to_numpy(dtype=float)
+    ratings, history = replay(matches, ratings, team_index)
+
+    peaks = np.fmax(known['PEAK_RATING'].fillna(INITIAL_RATING).to_numpy(dtype=float),
+                    history.groupby('TEAM_ID')['RATING_AFTER'].max().reindex(team_index).to_numpy())
+    snapshot = team_snapshot(matches, ratings, team_index, peaks)
+    snapshot['MATCHES_RATED'] += snapshot['TEAM_ID'].map(known['MATCHES_RATED']).fillna(0).astype(int)
+
+    write_temp(session, history, "TEMP_RATING_HISTORY")
+    write_temp(session, snapshot, "TEMP_TEAM_RATINGS")
+    return len(matches), len(snapshot)
+
+
+def main(session: snowpark.Session, full_refresh_mode: bool = False) -> str:
+    COMPONENT_NAME = 'UPDATE_TEAM_RATINGS'
+
+    try:
+        # Calculs et tables temporaires (DDL, commit implicite) avant la transaction
+        new_matches = load_matches(session, STREAM_NEW_MATCHES)
+        session.sql("CREATE OR REPLACE TEMPORARY TABLE ELO_CONSUMED_MATCHES (MATCH_ID INT)").collect()
+
+        mode = "FULL"
+        result = None
+        if not full_refresh_mode:
+            mode = "INCREMENTAL"
+            result = incremental_refresh(session, new_matches)
+            if result is None:
+                mode = "FULL (fallback: first run, late or corrected matches)"
+        if result is None:
+            result = full_refresh(session)
+            writes = FULL_WRITES
+        else:
+            writes = INCREMENTAL_WRITES if result[0] else []
+
+        # Une seule transaction: écritures GOLD + consommation du stream, ou rien
+        session.sql("BEGIN TRANSACTION").collect()
+        for statement in writes:
+            session.sql(statement).collect()
+        consume_stream(session, len(new_matches))
+        session.sql("COMMIT").collect()
+
+        num_matches, num_teams = result
+        summary = f"SUCCESS: {mode} | Matches rated: {num_matches} | Teams updated: {num_teams}"
+
+        session.sql(
+            "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+            params=['INFO', COMPONENT_NAME, summary, None]
+        ).collect()
+
+        return summary
+
+    except Exception as e:
+        error_msg = str(e)
+        stack_trace = traceback.format_exc()
+        try:
+            session.sql("ROLLBACK").collect()
+        except:
+            pass
+        try:
+            session.sql(
+                "INSERT INTO SNOWGOAL_DB.COMMON.PIPELINE_LOGS (LEVEL, COMPONENT_NAME, MESSAGE, STACK_TRACE) VALUES (?, ?, ?, ?)",
+                params=['ERROR', COMPONENT_NAME, f"CRITICAL FAILURE: {error_msg}", stack_trace]
+            ).collect()
+        except:
+            pass
+        return f"CRITICAL ERROR: {error_msg}"
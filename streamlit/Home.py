@@ -59,15 +59,17 @@ st.divider()
 st.markdown("### 📊 Live Data Status")
 
 try:
+    # Ligne unique maintenue par le pipeline (SP_MERGE_TO_SILVER), pas de scan de SILVER
     stats = run_query("""
         SELECT
-            (SELECT COUNT(*) FROM SILVER.MATCHES) AS MATCHES,
-            (SELECT COUNT(*) FROM SILVER.TEAMS) AS TEAMS,
-            (SELECT COUNT(*) FROM SILVER.SCORERS) AS SCORERS,
-            (SELECT COUNT(*) FROM SILVER.COMPETITIONS) AS COMPETITIONS,
-            (SELECT MAX(_UPDATED_AT) FROM SILVER.MATCHES) AS LAST_UPDATE,
-            (SELECT DATEDIFF('hour', MAX(_UPDATED_AT), CURRENT_TIMESTAMP()) FROM SILVER.MATCHES) AS HOURS_SINCE_UPDATE
-    """)
+            MATCHES,
+            TEAMS,
+            SCORERS,
+            COMPETITIONS,
+            MATCHES_UPDATED_AT AS LAST_UPDATE,
+            DATEDIFF('hour', MATCHES_UPDATED_AT, CURRENT_TIMESTAMP()) AS HOURS_SINCE_UPDATE
+        FROM GOLD.PIPELINE_STATUS
+    """, section="live_stats")
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
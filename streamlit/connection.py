@@ -1,90 +1,795 @@
 """
 Snowflake connection helper - supports both SiS and Streamlit Cloud
+(+ warehouse-free read mode over the exported Parquet bundle)
 """
 
+import json
+import os
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
 import streamlit as st
-from datetime import datetime, timedelta
 
-def get_ttl_until_next_refresh():
+# Polling interval of batched (async) queries
+BATCH_POLL_INTERVAL = 0.05
+
+# Streamlit Cloud connection pool (override the size with [snowflake] pool_size in secrets)
+POOL_SIZE = 4
+POOL_TIMEOUT = 30
+# Seconds of inactivity after which a pooled connection is checked before reuse
+HEALTH_CHECK_IDLE = 300
+# Session / master token expired, session no longer exists
+SESSION_EXPIRED_ERRNOS = {390111, 390112, 390114}
+
+# Version probe: refreshed at most once per minute, results cached until new data lands
+DATA_VERSION_TTL = 60
+DATA_VERSION_QUERY = """
+    SELECT DATA_VERSION
+    FROM SNOWGOAL_DB.GOLD.PIPELINE_STATUS
+"""
+
+# Query result cache: memory budget shared by all sessions (LRU eviction beyond it)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Instrumentation: QUERY_TAG of every dashboard query + last queries kept in memory
+QUERY_TAG_APP = "snowgoal-dashboard"
+METRICS_BUFFER_SIZE = 2000
+
+# Bundle read mode: local copies of the Parquet files exported by EXPORT_GOLD_BUNDLE()
+BUNDLE_DIR = os.path.join(tempfile.gettempdir(), "snowgoal_bundle")
+
+
+def get_bundle_url():
+    """Base URL (or directory) of the dashboard bundle, set in secrets.toml [bundle] url"""
+    try:
+        return st.secrets["bundle"]["url"].rstrip("/")
+    except Exception:
+        return None
+
+
+def _connect_cloud():
+    """New snowflake.connector connection with key-pair auth (Streamlit Cloud)"""
+    import snowflake.connector
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.backends import default_backend
+
+    # Load private key from secrets
+    private_key_pem = st.secrets["snowflake"]["private_key"]
+
+    # Handle the private key format
+    p_key = serialization.load_pem_private_key(
+        private_key_pem.encode(),
+        password=None,
+        backend=default_backend()
+    )
+
+    pkb = p_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+    return snowflake.connector.connect(
+        account=st.secrets["snowflake"]["account"],
+        user=st.secrets["snowflake"]["user"],
+        private_key=pkb,
+        warehouse=st.secrets["snowflake"]["warehouse"],
+        database=st.secrets["snowflake"]["database"],
+        schema=st.secrets["snowflake"]["schema"],
+        role=st.secrets["snowflake"]["role"],
+        # Bind variables côté serveur (?), comme session.sql(params=...) en SiS
+        paramstyle="qmark",
+        # Renouvelle le jeton de session tant que la connexion reste dans le pool
+        client_session_keep_alive=True
+    )
+
+
+def _is_connection_error(error):
+    """True if the error means the connection itself is unusable (expired session, network)"""
+    if getattr(error, "errno", None) in SESSION_EXPIRED_ERRNOS:
+        return True
+    try:
+        from snowflake.connector.errors import OperationalError
+        return isinstance(error, OperationalError)
+    except ImportError:
+        return False
+
+
+class ConnectionPool:
     """
-    Calculate seconds until next data refresh (2x daily: 6h and 23h).
-    Returns TTL in seconds, minimum 60 seconds.
+    Bounded pool of snowflake.connector connections (Streamlit Cloud).
+
+    Each query checks a connection out for its own duration, so concurrent
+    viewers run in parallel on separate sessions instead of sharing one.
+    Connections are opened lazily up to `size`; beyond that, callers wait for
+    one to be released (up to `timeout` seconds). A connection idle for more
+    than HEALTH_CHECK_IDLE seconds is checked before reuse, and a dead or
+    expired one is replaced transparently.
     """
-    now = datetime.now()
-    refresh_hours = [7, 17, 0]
 
-    # Find next refresh time
-    for hour in refresh_hours:
-        next_refresh = now.replace(hour=hour, minute=0, second=0, microsecond=0)
-        if now < next_refresh:
-            ttl = (next_refresh - now).total_seconds()
-            return max(int(ttl), 60)
+    def __init__(self, connect, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "created": 0,
+            "reconnects": 0,
+            "discarded": 0,
+        }
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._metrics[name] += value
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+        self._count("created")
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+            self._metrics["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, conn, idle_since):
+        if conn.is_closed():
+            return False
+        if time.monotonic() - idle_since < HEALTH_CHECK_IDLE:
+            return True
+        try:
+            # Heartbeat: valide le jeton de session sans warehouse
+            return conn.is_valid()
+        except Exception:
+            return False
+
+    def acquire(self, fresh=False):
+        """
+        Check a live connection out of the pool (opens one if below size).
+        fresh=True replaces a pooled connection without checking it (retry after expiry).
+        """
+        self._count("checkouts")
+        try:
+            conn, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                return self._open()
+
+            started = time.monotonic()
+            try:
+                conn, idle_since = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No Snowflake connection available after {self.timeout}s (pool size {self.size})")
+            finally:
+                waited = time.monotonic() - started
+                with self._lock:
+                    self._metrics["waits"] += 1
+                    self._metrics["wait_time"] += waited
+                    self._metrics["max_wait"] = max(self._metrics["max_wait"], waited)
+
+        if not fresh and self._is_alive(conn, idle_since):
+            return conn
+        return self._reconnect(conn)
+
+    def _reconnect(self, conn):
+        self._count("reconnects")
+        try:
+            conn.close()
+        except Exception:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def release(self, conn, error=None):
+        """Return a connection to the pool, or drop it if it failed at connection level"""
+        if error is not None and (_is_connection_error(error) or conn.is_closed()):
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self, fresh=False):
+        """with pool.connection() as conn: ... (checkout for the duration of the block)"""
+        conn = self.acquire(fresh)
+        try:
+            yield conn
+        except BaseException as e:
+            self.release(conn, e)
+            raise
+        else:
+            self.release(conn)
+
+    def run(self, fn):
+        """
+        fn(conn) on a pooled connection. Retried once on a fresh connection if the
+        session expired or the network dropped: reads are idempotent.
+        """
+        try:
+            with self.connection() as conn:
+                return fn(conn)
+        except Exception as e:
+            if not _is_connection_error(e):
+                raise
+        with self.connection(fresh=True) as conn:
+            return fn(conn)
+
+    def stats(self):
+        """Pool metrics: open/idle connections, checkouts, waits (count, avg/max seconds), reconnects"""
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["size"] = self.size
+            stats["open"] = self._opened
+        stats["idle"] = self._idle.qsize()
+        stats["avg_wait"] = stats["wait_time"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
 
-    # If past 23h, next refresh is 6h tomorrow
-    next_refresh = (now + timedelta(days=1)).replace(hour=6, minute=0, second=0, microsecond=0)
-    ttl = (next_refresh - now).total_seconds()
-    return max(int(ttl), 60)
 
 @st.cache_resource
 def get_connection():
     """
     Returns a Snowflake connection that works in both environments:
+    - Bundle read mode ([bundle] url in secrets): no Snowflake connection at all
     - Streamlit in Snowflake (SiS): uses get_active_session()
-    - Streamlit Cloud: uses snowflake.connector with key-pair auth
+    - Streamlit Cloud: a ConnectionPool of snowflake.connector connections with key-pair auth
     """
+    if get_bundle_url():
+        return None, "bundle"
+
     try:
         # Try SiS first
         from snowflake.snowpark.context import get_active_session
         session = get_active_session()
         return session, "sis"
     except:
-        # Fall back to Streamlit Cloud connection with key-pair
-        import snowflake.connector
-        from cryptography.hazmat.primitives import serialization
-        from cryptography.hazmat.backends import default_backend
-
-        # Load private key from secrets
-        private_key_pem = st.secrets["snowflake"]["private_key"]
-
-        # Handle the private key format
-        p_key = serialization.load_pem_private_key(
-            private_key_pem.encode(),
-            password=None,
-            backend=default_backend()
-        )
-
-        pkb = p_key.private_bytes(
-            encoding=serialization.Encoding.DER,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        )
-
-        conn = snowflake.connector.connect(
-            account=st.secrets["snowflake"]["account"],
-            user=st.secrets["snowflake"]["user"],
-            private_key=pkb,
-            warehouse=st.secrets["snowflake"]["warehouse"],
-            database=st.secrets["snowflake"]["database"],
-            schema=st.secrets["snowflake"]["schema"],
-            role=st.secrets["snowflake"]["role"]
-        )
-        return conn, "cloud"
-
-@st.cache_data(ttl=get_ttl_until_next_refresh())
-def run_query(query):
+        # Fall back to Streamlit Cloud connections with key-pair
+        try:
+            size = int(st.secrets["snowflake"].get("pool_size", POOL_SIZE))
+        except Exception:
+            size = POOL_SIZE
+        return ConnectionPool(_connect_cloud, size=size), "cloud"
+
+
+def get_pool_stats():
+    """Connection pool metrics (Streamlit Cloud only, None otherwise)"""
+    pool, env = get_connection()
+    return pool.stats() if env == "cloud" else None
+
+
+def _read_bundle_file(name):
+    url = f"{get_bundle_url()}/{name}"
+    if re.match(r"https?://", url):
+        with urllib.request.urlopen(url, timeout=60) as response:
+            return response.read()
+    with open(url, "rb") as f:
+        return f.read()
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL, show_spinner=False)
+def read_bundle_manifest():
+    """latest.json of the bundle: {'version', 'exported_at', 'tables': {name: {'file', 'rows'}}}"""
+    return json.loads(_read_bundle_file("latest.json"))
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading data bundle...")
+def load_bundle(version):
     """
-    Execute a query and return results as pandas DataFrame.
-    Cache expires at next scheduled refresh (2x daily: 6h and 23h).
+    Download one bundle version and register every table in an in-memory DuckDB
+    database (GOLD.X, SILVER.X), with macros for the Snowflake functions used by pages.
+    """
+    import duckdb
+
+    manifest = read_bundle_manifest()
+    if os.path.isdir(BUNDLE_DIR):
+        for name in os.listdir(BUNDLE_DIR):
+            if name != manifest["version"]:
+                shutil.rmtree(os.path.join(BUNDLE_DIR, name), ignore_errors=True)
+
+    con = duckdb.connect()
+    con.execute("CREATE MACRO iff(cond, a, b) AS CASE WHEN cond THEN a ELSE b END")
+    con.execute("""
+        CREATE MACRO dateadd(part, n, ts) AS CASE lower(part)
+            WHEN 'day' THEN ts + to_days(CAST(n AS INTEGER))
+            WHEN 'hour' THEN ts + to_hours(CAST(n AS INTEGER))
+            ELSE ts + to_minutes(CAST(n AS INTEGER))
+        END
+    """)
+
+    for name, entry in manifest["tables"].items():
+        schema, table = name.split(".")
+        path = os.path.join(BUNDLE_DIR, entry["file"])
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(_read_bundle_file(entry["file"]))
+        con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        con.execute(f"CREATE TABLE {schema}.{table} AS SELECT * FROM read_parquet(?)", [path])
+    return con
+
+
+def to_duckdb(query):
+    """Rewrite the few Snowflake-only constructs used by the pages"""
+    query = query.replace("SNOWGOAL_DB.", "")
+    query = re.sub(r"CURRENT_TIMESTAMP\(\)", "current_localtimestamp()", query)
+    return re.sub(
+        r"ARRAY_CONTAINS\(([\w.]+)::VARIANT, SPLIT\(\?, ','\)\)",
+        r"list_contains(string_split(?, ','), \1)",
+        query
+    )
+
+
+class QueryCache:
+    """
+    In-memory result cache keyed by (data version, normalised query, bind values).
+    Entries never expire on their own: they are dropped as soon as the
+    pipeline publishes a new data version (GOLD.PIPELINE_STATUS, bumped by each merge
+    and by the finalizer),
+    or evicted least recently used first once the cache holds more than max_bytes.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "oversized": 0}
+
+    @staticmethod
+    def key(query, params=None):
+        return re.sub(r"\s+", " ", query).strip(), tuple(params or ())
+
+    @staticmethod
+    def size_of(df):
+        """Bytes held by a DataFrame, object columns (strings) included"""
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+    def lookup(self, version, query, params=None):
+        """(DataFrame copy, bytes) or None"""
+        key = self.key(query, params)
+        with self._lock:
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return entry[0].copy(), entry[1]
+
+    def get(self, version, query, params=None):
+        entry = self.lookup(version, query, params)
+        return None if entry is None else entry[0]
+
+    def put(self, version, query, params, df):
+        df = df.copy()
+        size = self.size_of(df)
+        key = self.key(query, params)
+        with self._lock:
+            if version != self._version:
+                # Nouvelle version des données: on purge tout l'ancien cache
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._version = version
+                self._entries = OrderedDict()
+                self._bytes = 0
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # Résultat plus gros que tout le budget: servi mais jamais gardé
+                self._stats["oversized"] += 1
+                return
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._entries = OrderedDict()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters since start: hits, misses, evictions, invalidations + entries and bytes held"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+@st.cache_resource
+def get_query_cache():
+    """Single cache shared by every session of the app process ([cache] max_mb in secrets)"""
+    try:
+        max_bytes = int(float(st.secrets["cache"]["max_mb"]) * 1024 * 1024)
+    except Exception:
+        max_bytes = CACHE_MAX_BYTES
+    return QueryCache(max_bytes)
+
+
+def get_cache_stats():
+    """Query cache counters, for the Doc page"""
+    return get_query_cache().stats()
+
+
+def _current_page():
+    """Script that issued the query (Home or pages/<n>_<Name>.py), read from the call stack"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if os.path.basename(path) == "Home.py" or os.path.basename(os.path.dirname(path)) == "pages":
+            return os.path.splitext(os.path.basename(path))[0]
+        frame = frame.f_back
+    return "app"
+
+
+def query_tag(page, section):
+    """QUERY_TAG of dashboard queries (JSON: filter with PARSE_JSON(QUERY_TAG):page in QUERY_HISTORY)"""
+    return json.dumps({"app": QUERY_TAG_APP, "page": page, "section": section or "query"}, separators=(",", ":"))
+
+
+class QueryMetrics:
+    """
+    Ring buffer of the last METRICS_BUFFER_SIZE dashboard queries of the process:
+    page, section, client latency, rows, bytes, cache hit/miss and Snowflake QUERY_ID.
     """
+
+    def __init__(self, size=METRICS_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=size)
+
+    def record(self, page, section, query, started, cache, df=None, size=None, query_id=None, error=None):
+        event = {
+            "EVENT_TIME": datetime.now(),
+            "PAGE": page,
+            "SECTION": section or "query",
+            "CACHE": cache,
+            "LATENCY_MS": round((time.perf_counter() - started) * 1000, 1),
+            "ROWS": None if df is None else len(df),
+            "BYTES": size if size is not None or df is None else QueryCache.size_of(df),
+            "QUERY_ID": query_id,
+            "ERROR": None if error is None else str(error)[:200],
+            "QUERY": re.sub(r"\s+", " ", query).strip()[:200],
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def to_frame(self):
+        import pandas as pd
+        with self._lock:
+            events = list(self._events)
+        return pd.DataFrame(events, columns=[
+            "EVENT_TIME", "PAGE", "SECTION", "CACHE", "LATENCY_MS", "ROWS", "BYTES", "QUERY_ID", "ERROR", "QUERY"
+        ])
+
+    def summary(self):
+        """One row per (page, section): calls, hit rate, p50/p95/max latency, p95 of executions"""
+        events = self.to_frame()
+        if events.empty:
+            return events
+        events["HIT"] = events["CACHE"] == "hit"
+        events["EXEC_MS"] = events["LATENCY_MS"].where(~events["HIT"])
+        grouped = events.groupby(["PAGE", "SECTION"])
+        summary = grouped.agg(
+            CALLS=("LATENCY_MS", "size"),
+            HIT_RATE=("HIT", "mean"),
+            P50_MS=("LATENCY_MS", "median"),
+            P95_MS=("LATENCY_MS", lambda s: s.quantile(0.95)),
+            MAX_MS=("LATENCY_MS", "max"),
+            P95_EXEC_MS=("EXEC_MS", lambda s: s.quantile(0.95)),
+            AVG_ROWS=("ROWS", "mean"),
+            ERRORS=("ERROR", "count"),
+        ).reset_index()
+        return summary.sort_values("P95_MS", ascending=False).reset_index(drop=True)
+
+    def slowest(self, n=10):
+        return self.to_frame().nlargest(n, "LATENCY_MS").reset_index(drop=True)
+
+
+@st.cache_resource
+def get_query_metrics():
+    """Single metrics buffer shared by every session of the app process"""
+    return QueryMetrics()
+
+
+def query_history(minutes=60):
+    """
+    In-process query events joined with INFORMATION_SCHEMA.QUERY_HISTORY on QUERY_ID:
+    server-side compilation, queue and execution times (ms) of the dashboard queries.
+    """
+    events = get_query_metrics().to_frame()
+    events = events[events["QUERY_ID"].notna()]
+    if events.empty:
+        return events
+
+    server = execute_query(f"""
+        SELECT
+            QUERY_ID,
+            WAREHOUSE_SIZE,
+            COMPILATION_TIME AS COMPILATION_MS,
+            QUEUED_PROVISIONING_TIME + QUEUED_OVERLOAD_TIME + QUEUED_REPAIR_TIME AS QUEUED_MS,
+            EXECUTION_TIME AS EXECUTION_MS,
+            TOTAL_ELAPSED_TIME AS TOTAL_ELAPSED_MS,
+            BYTES_SCANNED,
+            ROWS_PRODUCED
+        FROM TABLE(SNOWGOAL_DB.INFORMATION_SCHEMA.QUERY_HISTORY(
+            END_TIME_RANGE_START => DATEADD('minute', -{int(minutes)}, CURRENT_TIMESTAMP()),
+            RESULT_LIMIT => 10000
+        ))
+        WHERE QUERY_TAG LIKE ?
+    """, [f'{{"app":"{QUERY_TAG_APP}"%'], section="query_history")
+
+    joined = events.merge(server, on="QUERY_ID", how="inner")
+    # Temps hors Snowflake: réseau, téléchargement et conversion pandas
+    joined["CLIENT_OVERHEAD_MS"] = (joined["LATENCY_MS"] - joined["TOTAL_ELAPSED_MS"]).clip(lower=0)
+    return joined.sort_values("LATENCY_MS", ascending=False).reset_index(drop=True)
+
+
+def in_list(values):
+    """
+    Bind value for a multi-select filter, used as
+    ARRAY_CONTAINS(COLUMN::VARIANT, SPLIT(?, ',')). Sorted so that the same
+    selection in any order gives the same cache key.
+    """
+    return ",".join(sorted(str(v) for v in values))
+
+
+def _cursor_to_pandas(cursor):
+    """
+    Connector results decoded from Arrow batches straight into typed columns
+    (no Python tuple per row). Results that are not Arrow-backed (SHOW / DESC...)
+    fall back to fetchall(). The SiS path is already Arrow-based (to_pandas()).
+    """
+    from snowflake.connector.errors import NotSupportedError
+    import pandas as pd
+
+    try:
+        try:
+            return cursor.fetch_pandas_all()
+        except NotSupportedError:
+            columns = [col[0] for col in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        cursor.close()
+
+
+def _execute(query, params=None, tag=None):
+    """Run a query in the current environment, returns (DataFrame, Snowflake QUERY_ID)"""
     conn, env = get_connection()
+    params = list(params) if params else None
 
-    if env == "sis":
-        return conn.sql(query).to_pandas()
+    if env == "bundle":
+        cursor = load_bundle(get_data_version()).cursor()
+        df = cursor.execute(to_duckdb(query), params).df()
+        cursor.close()
+        # Snowflake renvoie les alias non quotés en majuscules
+        df.columns = [col.upper() for col in df.columns]
+        return df, None
+    elif env == "sis":
+        job = conn.sql(query, params=params).collect_nowait(statement_params={"QUERY_TAG": tag})
+        return job.result("pandas"), job.query_id
+    else:
+        def fetch(pooled):
+            cursor = pooled.cursor()
+            # QUERY_TAG au niveau de la requête: pas d'ALTER SESSION sur une connexion partagée
+            cursor.execute(query, params, _statement_params={"QUERY_TAG": tag})
+            query_id = cursor.sfqid
+            return _cursor_to_pandas(cursor), query_id
+        return conn.run(fetch)
+
+
+def execute_query(query, params=None, section=None):
+    """Execute a query without the result cache (still tagged and timed)"""
+    page = _current_page()
+    started = time.perf_counter()
+    try:
+        df, query_id = _execute(query, params, query_tag(page, section))
+    except Exception as e:
+        get_query_metrics().record(page, section, query, started, "bypass", error=e)
+        raise
+    get_query_metrics().record(page, section, query, started, "bypass", df, query_id=query_id)
+    return df
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL, show_spinner=False)
+def get_data_version():
+    """
+    Latest pipeline data version: single-row lookup of GOLD.PIPELINE_STATUS
+    (bumped by SP_MERGE_TO_SILVER and the DATA_VERSION finalizer), or the bundle
+    version in read mode. Falls back to an hourly bucket if it cannot be read.
+    """
+    if get_bundle_url():
+        return f"bundle-{read_bundle_manifest()['version']}"
+    try:
+        version = execute_query(DATA_VERSION_QUERY, section="data_version").iloc[0, 0]
+        if version is not None:
+            return f"status-{int(version)}"
+    except Exception:
+        pass
+    return f"hour-{int(time.time() // 3600)}"
+
+
+def run_query(query, params=None, section=None):
+    """
+    Execute a query and return results as pandas DataFrame.
+    Filters are passed as qmark bind variables (?) in params, never formatted
+    into the SQL text: one query text per logical query, shared by all users.
+    Results are served from memory until a new data version lands.
+    section names the query in its QUERY_TAG and in the Doc page metrics.
+    """
+    cache = get_query_cache()
+    metrics = get_query_metrics()
+    version = get_data_version()
+    page = _current_page()
+    started = time.perf_counter()
+
+    cached = cache.lookup(version, query, params)
+    if cached is not None:
+        metrics.record(page, section, query, started, "hit", cached[0], size=cached[1])
+        return cached[0]
+
+    try:
+        df, query_id = _execute(query, params, query_tag(page, section))
+    except Exception as e:
+        metrics.record(page, section, query, started, "miss", error=e)
+        raise
+    cache.put(version, query, params, df)
+    metrics.record(page, section, query, started, "miss", df, query_id=query_id)
+    return df
+
+
+class QueryBatch(dict):
+    """
+    Results of run_queries(): reading a query that failed raises its error,
+    so each page section keeps its own try/except as with run_query().
+    """
+
+    def __getitem__(self, name):
+        result = super().__getitem__(name)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _submit(conn, env, query, params=None, tag=None):
+    """Start a query without waiting for its result"""
+    params = list(params) if params else None
+
+    if env == "bundle":
+        # DuckDB en mémoire: exécution immédiate
+        return _execute(query, params)[0]
+    elif env == "sis":
+        return conn.sql(query, params=params).collect_nowait(statement_params={"QUERY_TAG": tag})
     else:
         cursor = conn.cursor()
-        cursor.execute(query)
-        import pandas as pd
-        columns = [col[0] for col in cursor.description]
-        data = cursor.fetchall()
-        cursor.close()
-        return pd.DataFrame(data, columns=columns)
+        cursor.execute_async(query, params, _statement_params={"QUERY_TAG": tag})
+        return cursor
+
+
+def _query_id(env, job):
+    if env == "sis":
+        return job.query_id
+    elif env == "cloud":
+        return job.sfqid
+    return None
+
+
+def _is_done(conn, env, job):
+    if env == "bundle":
+        return True
+    elif env == "sis":
+        return job.is_done()
+    return not conn.is_still_running(conn.get_query_status_throw_if_error(job.sfqid))
+
+
+def _fetch(env, job):
+    if env == "bundle":
+        return job
+    elif env == "sis":
+        return job.result("pandas")
+    else:
+        job.get_results_from_sfqid(job.sfqid)
+        return _cursor_to_pandas(job)
+
+
+def iter_queries(queries):
+    """
+    Submit independent queries together and yield (name, DataFrame) as each one
+    completes: page latency is the slowest query, not the sum of all of them.
+    queries: {name: query} or {name: (query, params)}; each name is the section of
+    its QUERY_TAG. Cached results are yielded first; a failed query yields (name, exception).
+    """
+    cache = get_query_cache()
+    metrics = get_query_metrics()
+    version = get_data_version()
+    page = _current_page()
+    started = time.perf_counter()
+
+    uncached = {}
+    for name, spec in queries.items():
+        query, params = (spec, None) if isinstance(spec, str) else spec
+        cached = cache.lookup(version, query, params)
+        if cached is not None:
+            metrics.record(page, name, query, started, "hit", cached[0], size=cached[1])
+            yield name, cached[0]
+        else:
+            uncached[name] = (query, params)
+    if not uncached:
+        return
+
+    # Streamlit Cloud: une connexion du pool pour tout le lot (les requêtes async
+    # tournent en parallèle côté Snowflake), rendue au pool une fois le lot lu
+    conn, env = get_connection()
+    handle = conn.acquire() if env == "cloud" else conn
+    failure = None
+
+    try:
+        pending = {}
+        for name, (query, params) in uncached.items():
+            try:
+                pending[name] = (query, params, _submit(handle, env, query, params, query_tag(page, name)))
+            except Exception as e:
+                failure = e
+                metrics.record(page, name, query, started, "miss", error=e)
+                yield name, e
+
+        while pending:
+            for name, (query, params, job) in list(pending.items()):
+                try:
+                    if not _is_done(handle, env, job):
+                        continue
+                    df = _fetch(env, job)
+                    cache.put(version, query, params, df)
+                    metrics.record(page, name, query, started, "miss", df, query_id=_query_id(env, job))
+                    yield name, df
+                except Exception as e:
+                    failure = e
+                    metrics.record(page, name, query, started, "miss", query_id=_query_id(env, job), error=e)
+                    yield name, e
+                del pending[name]
+            if pending:
+                time.sleep(BATCH_POLL_INTERVAL)
+    finally:
+        if env == "cloud":
+            conn.release(handle, failure)
+
+
+def run_queries(queries):
+    """Batched version of run_query(): {name: DataFrame} once all queries are done"""
+    return QueryBatch(iter_queries(queries))
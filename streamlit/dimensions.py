@@ -0,0 +1,104 @@
+"""
+Shared dimensions for all pages: competitions and teams
+
+Loaded once per process and per pipeline data version (connection.get_data_version),
+instead of one LEAGUE_NAMES dict and one SELECT DISTINCT per page.
+"""
+
+import streamlit as st
+
+from connection import get_data_version, run_queries
+
+# Noms d'affichage (ordre du menu) - les noms API de SILVER.COMPETITIONS servent de repli
+LEAGUE_NAMES = {
+    'PL': 'Premier League',
+    'PD': 'La Liga',
+    'BL1': 'Bundesliga',
+    'SA': 'Serie A',
+    'FL1': 'Ligue 1',
+    'CL': 'Champions League',
+    'EC': 'European Championship',
+    'PPL': 'Primeira Liga',
+    'DED': 'Eredivisie',
+    'ELC': 'Championship',
+    'BSA': 'Brasileirão'
+}
+
+DIMENSION_QUERIES = {
+    "competitions": """
+        SELECT
+            c.COMPETITION_CODE,
+            c.COMPETITION_NAME,
+            c.TYPE,
+            c.EMBLEM,
+            c.AREA_NAME,
+            c.AREA_FLAG,
+            c.SEASON_START,
+            c.SEASON_END,
+            c.CURRENT_MATCHDAY,
+            o.COMPETITION_CODE IS NOT NULL AS HAS_ODDS
+        FROM SILVER.COMPETITIONS c
+        LEFT JOIN (SELECT DISTINCT COMPETITION_CODE FROM GOLD.ODDS_ANALYSIS) o
+            ON o.COMPETITION_CODE = c.COMPETITION_CODE
+    """,
+    "teams": """
+        SELECT
+            TEAM_ID,
+            COMPETITION_CODE,
+            TEAM_NAME,
+            TEAM_SHORT,
+            TEAM_TLA,
+            TEAM_CREST,
+            VENUE,
+            FOUNDED,
+            CLUB_COLORS,
+            COACH_NAME
+        FROM SILVER.TEAMS
+        ORDER BY TEAM_NAME
+    """,
+}
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_dimensions(version):
+    data = run_queries(DIMENSION_QUERIES)
+
+    competitions = data["competitions"]
+    competitions['DISPLAY_NAME'] = [
+        LEAGUE_NAMES.get(code, name or code)
+        for code, name in zip(competitions['COMPETITION_CODE'], competitions['COMPETITION_NAME'])
+    ]
+    order = {code: i for i, code in enumerate(LEAGUE_NAMES)}
+    competitions['_ORDER'] = competitions['COMPETITION_CODE'].map(order).fillna(len(order))
+    competitions = competitions.sort_values(['_ORDER', 'COMPETITION_CODE']).drop(columns='_ORDER').reset_index(drop=True)
+
+    return {"competitions": competitions, "teams": data["teams"]}
+
+
+def get_competitions():
+    """One row per competition: code, names, emblem, area, season dates, HAS_ODDS"""
+    return _load_dimensions(get_data_version())["competitions"].copy()
+
+
+def get_teams(competition_code=None):
+    """Teams (ID, name, TLA, crest, venue, coach...), optionally for one competition"""
+    teams = _load_dimensions(get_data_version())["teams"]
+    if competition_code is not None:
+        teams = teams[teams['COMPETITION_CODE'] == competition_code]
+    return teams.copy()
+
+
+def league_names():
+    """{code: display name} for every competition"""
+    competitions = get_competitions()
+    names = dict(LEAGUE_NAMES)
+    names.update(zip(competitions['COMPETITION_CODE'], competitions['DISPLAY_NAME']))
+    return names
+
+
+def competition_options(codes=None):
+    """{display name: code} in menu order, optionally restricted to the given codes"""
+    competitions = get_competitions()
+    if codes is not None:
+        competitions = competitions[competitions['COMPETITION_CODE'].isin(list(codes))]
+    return dict(zip(competitions['DISPLAY_NAME'], competitions['COMPETITION_CODE']))
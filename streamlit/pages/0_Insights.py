@@ -9,29 +9,133 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 sys.path.append('..')
-from connection import run_query
+from connection import run_queries
+from dimensions import league_names
 
 st.set_page_config(page_title="Insights | SnowGoal", page_icon="💡", layout="wide")
 
 st.title("💡 Key Insights & Metrics")
 st.info("📅 **Season 2025-2026** | Data refreshes automatically 3x daily (7h, 17h, 00h)")
 
+# Toutes les requêtes de la page sont indépendantes: soumises ensemble (async)
+QUERIES = {
+    # Compteurs globaux maintenus par le MERGE (une seule ligne)
+    "global_stats": """
+        SELECT
+            MATCHES AS total_matches,
+            PLAYERS AS total_players,
+            TEAMS AS total_teams,
+            COMPETITIONS AS total_competitions,
+            FINISHED_MATCHES AS finished_matches,
+            TOTAL_GOALS AS total_goals
+        FROM GOLD.PIPELINE_STATUS
+    """,
+    "high_scoring": """
+        SELECT
+            COUNT(*) as total_matches,
+            SUM(CASE WHEN HOME_SCORE + AWAY_SCORE >= 4 THEN 1 ELSE 0 END) as high_scoring,
+            ROUND(100.0 * high_scoring / total_matches, 1) as high_scoring_pct,
+            ROUND(AVG(ABS(HOME_SCORE - AWAY_SCORE)), 2) as avg_goal_difference
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+    """,
+    "comebacks": """
+        SELECT
+            COUNT(*) as total_matches,
+            SUM(CASE WHEN (HOME_SCORE_HT < AWAY_SCORE_HT AND WINNER = 'HOME_TEAM')
+                       OR (HOME_SCORE_HT > AWAY_SCORE_HT AND WINNER = 'AWAY_TEAM')
+                THEN 1 ELSE 0 END) as comebacks,
+            ROUND(100.0 * comebacks / total_matches, 1) as comeback_pct
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+          AND HOME_SCORE_HT IS NOT NULL
+          AND WINNER IN ('HOME_TEAM', 'AWAY_TEAM')
+    """,
+    "half_goals": """
+        SELECT
+            SUM(HOME_SCORE_HT + AWAY_SCORE_HT) as first_half_goals,
+            SUM((HOME_SCORE - HOME_SCORE_HT) + (AWAY_SCORE - AWAY_SCORE_HT)) as second_half_goals,
+            ROUND(100.0 * second_half_goals / (first_half_goals + second_half_goals), 1) as second_half_pct
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+          AND HOME_SCORE_HT IS NOT NULL
+          AND HOME_SCORE IS NOT NULL
+    """,
+    "home_advantage": """
+        SELECT
+            DAY_OF_WEEK,
+            COUNT(*) AS matches,
+            ROUND(100.0 * SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) / COUNT(*), 1) AS home_win_pct
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+          AND DAY_OF_WEEK IS NOT NULL
+          AND WINNER IS NOT NULL
+        GROUP BY DAY_OF_WEEK
+        ORDER BY home_win_pct DESC
+        LIMIT 1
+    """,
+    "goals_by_comp": """
+        SELECT
+            COMPETITION_CODE,
+            COUNT(*) AS matches,
+            ROUND(AVG(HOME_SCORE + AWAY_SCORE), 2) AS avg_goals_per_match
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+        GROUP BY COMPETITION_CODE
+        ORDER BY avg_goals_per_match DESC
+        LIMIT 3
+    """,
+    "extra_time_stats": """
+        SELECT
+            COUNT(*) AS total_matches,
+            SUM(CASE WHEN MATCH_DURATION != 'REGULAR' THEN 1 ELSE 0 END) AS extra_time_matches,
+            ROUND(100.0 * SUM(CASE WHEN MATCH_DURATION != 'REGULAR' THEN 1 ELSE 0 END) / COUNT(*), 1) AS extra_time_pct
+        FROM SILVER.MATCHES
+        WHERE STATUS = 'FINISHED'
+          AND MATCH_DURATION IS NOT NULL
+    """,
+    "top_scorers": """
+        SELECT
+            PLAYER_NAME,
+            TEAM_SHORT,
+            SUM(GOALS) AS total_goals,
+            SUM(ASSISTS) AS total_assists
+        FROM SILVER.SCORERS
+        GROUP BY PLAYER_NAME, TEAM_SHORT
+        ORDER BY total_goals DESC
+        LIMIT 5
+    """,
+    "top_refs": """
+        SELECT
+            REFEREE_NAME,
+            MATCHES_REFEREED,
+            COMPETITIONS
+        FROM GOLD.REFEREE_STATS
+        ORDER BY MATCHES_REFEREED DESC
+        LIMIT 5
+    """,
+    "geo_dist": """
+        SELECT
+            AREA_NAME,
+            TOTAL_MATCHES,
+            AVG_GOALS_PER_MATCH,
+            HOME_WIN_PCT
+        FROM GOLD.GEOGRAPHIC_STATS
+        ORDER BY TOTAL_MATCHES DESC
+        LIMIT 10
+    """,
+}
+
 # ============================================
 # Global Metrics
 # ============================================
 st.header("📊 Global Data Metrics")
 
 try:
+    data = run_queries(QUERIES)
+
     # Get overall statistics
-    global_stats = run_query("""
-        SELECT
-            (SELECT COUNT(*) FROM SILVER.MATCHES) AS total_matches,
-            (SELECT COUNT(DISTINCT PLAYER_ID) FROM SILVER.SCORERS) AS total_players,
-            (SELECT COUNT(DISTINCT TEAM_ID) FROM SILVER.TEAMS) AS total_teams,
-            (SELECT COUNT(DISTINCT COMPETITION_CODE) FROM SILVER.COMPETITIONS) AS total_competitions,
-            (SELECT COUNT(*) FROM SILVER.MATCHES WHERE STATUS = 'FINISHED') AS finished_matches,
-            (SELECT SUM(HOME_SCORE + AWAY_SCORE) FROM SILVER.MATCHES WHERE STATUS = 'FINISHED') AS total_goals
-    """)
+    global_stats = data['global_stats']
 
     if not global_stats.empty:
         col1, col2, col3 = st.columns(3)
@@ -58,15 +162,7 @@ try:
     # Insight 1: High-scoring matches
     st.subheader("Match Excitement Analysis")
 
-    high_scoring = run_query("""
-        SELECT
-            COUNT(*) as total_matches,
-            SUM(CASE WHEN HOME_SCORE + AWAY_SCORE >= 4 THEN 1 ELSE 0 END) as high_scoring,
-            ROUND(100.0 * high_scoring / total_matches, 1) as high_scoring_pct,
-            ROUND(AVG(ABS(HOME_SCORE - AWAY_SCORE)), 2) as avg_goal_difference
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-    """)
+    high_scoring = data['high_scoring']
 
     if not high_scoring.empty:
         hs_pct = high_scoring['HIGH_SCORING_PCT'].iloc[0]
@@ -76,18 +172,7 @@ try:
     # Insight 2: Comeback Analysis
     st.subheader("Comeback Frequency")
 
-    comebacks = run_query("""
-        SELECT
-            COUNT(*) as total_matches,
-            SUM(CASE WHEN (HOME_SCORE_HT < AWAY_SCORE_HT AND WINNER = 'HOME_TEAM')
-                       OR (HOME_SCORE_HT > AWAY_SCORE_HT AND WINNER = 'AWAY_TEAM')
-                THEN 1 ELSE 0 END) as comebacks,
-            ROUND(100.0 * comebacks / total_matches, 1) as comeback_pct
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-          AND HOME_SCORE_HT IS NOT NULL
-          AND WINNER IN ('HOME_TEAM', 'AWAY_TEAM')
-    """)
+    comebacks = data['comebacks']
 
     if not comebacks.empty:
         cb_pct = comebacks['COMEBACK_PCT'].iloc[0]
@@ -97,16 +182,7 @@ try:
     # Insight 3: When are goals scored?
     st.subheader("Goal Distribution by Half")
 
-    half_goals = run_query("""
-        SELECT
-            SUM(HOME_SCORE_HT + AWAY_SCORE_HT) as first_half_goals,
-            SUM((HOME_SCORE - HOME_SCORE_HT) + (AWAY_SCORE - AWAY_SCORE_HT)) as second_half_goals,
-            ROUND(100.0 * second_half_goals / (first_half_goals + second_half_goals), 1) as second_half_pct
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-          AND HOME_SCORE_HT IS NOT NULL
-          AND HOME_SCORE IS NOT NULL
-    """)
+    half_goals = data['half_goals']
 
     if not half_goals.empty:
         sh_pct = half_goals['SECOND_HALF_PCT'].iloc[0]
@@ -117,19 +193,7 @@ try:
     # Insight 2: Home advantage by day
     st.subheader("Home Advantage Analysis")
 
-    home_advantage = run_query("""
-        SELECT
-            DAY_OF_WEEK,
-            COUNT(*) AS matches,
-            ROUND(100.0 * SUM(CASE WHEN WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) / COUNT(*), 1) AS home_win_pct
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-          AND DAY_OF_WEEK IS NOT NULL
-          AND WINNER IS NOT NULL
-        GROUP BY DAY_OF_WEEK
-        ORDER BY home_win_pct DESC
-        LIMIT 1
-    """)
+    home_advantage = data['home_advantage']
 
     if not home_advantage.empty:
         best_day = home_advantage['DAY_OF_WEEK'].iloc[0]
@@ -139,31 +203,9 @@ try:
     # Insight 3: Most prolific competition
     st.subheader("Most Goals by Competition")
 
-    LEAGUE_NAMES = {
-        'PL': 'Premier League',
-        'PD': 'La Liga',
-        'BL1': 'Bundesliga',
-        'SA': 'Serie A',
-        'FL1': 'Ligue 1',
-        'CL': 'Champions League',
-        'EC': 'European Championship',
-        'PPL': 'Primeira Liga',
-        'DED': 'Eredivisie',
-        'ELC': 'Championship',
-        'BSA': 'Brasileirão'
-    }
-
-    goals_by_comp = run_query("""
-        SELECT
-            COMPETITION_CODE,
-            COUNT(*) AS matches,
-            ROUND(AVG(HOME_SCORE + AWAY_SCORE), 2) AS avg_goals_per_match
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-        GROUP BY COMPETITION_CODE
-        ORDER BY avg_goals_per_match DESC
-        LIMIT 3
-    """)
+    LEAGUE_NAMES = league_names()
+
+    goals_by_comp = data['goals_by_comp']
 
     if not goals_by_comp.empty:
         top_comp = goals_by_comp.iloc[0]
@@ -173,15 +215,7 @@ try:
     # Insight 4: Extra Time Frequency
     st.subheader("Extra Time Analysis")
 
-    extra_time_stats = run_query("""
-        SELECT
-            COUNT(*) AS total_matches,
-            SUM(CASE WHEN MATCH_DURATION != 'REGULAR' THEN 1 ELSE 0 END) AS extra_time_matches,
-            ROUND(100.0 * SUM(CASE WHEN MATCH_DURATION != 'REGULAR' THEN 1 ELSE 0 END) / COUNT(*), 1) AS extra_time_pct
-        FROM SILVER.MATCHES
-        WHERE STATUS = 'FINISHED'
-          AND MATCH_DURATION IS NOT NULL
-    """)
+    extra_time_stats = data['extra_time_stats']
 
     if not extra_time_stats.empty:
         et_pct = extra_time_stats['EXTRA_TIME_PCT'].iloc[0]
@@ -199,32 +233,14 @@ try:
 
     with col1:
         st.subheader("Top 5 Scorers (All Competitions)")
-        top_scorers = run_query("""
-            SELECT
-                PLAYER_NAME,
-                TEAM_SHORT,
-                SUM(GOALS) AS total_goals,
-                SUM(ASSISTS) AS total_assists
-            FROM SILVER.SCORERS
-            GROUP BY PLAYER_NAME, TEAM_SHORT
-            ORDER BY total_goals DESC
-            LIMIT 5
-        """)
+        top_scorers = data['top_scorers']
 
         if not top_scorers.empty:
             st.dataframe(top_scorers, use_container_width=True, hide_index=True)
 
     with col2:
         st.subheader("Most Active Referees")
-        top_refs = run_query("""
-            SELECT
-                REFEREE_NAME,
-                MATCHES_REFEREED,
-                COMPETITIONS
-            FROM GOLD.REFEREE_STATS
-            ORDER BY MATCHES_REFEREED DESC
-            LIMIT 5
-        """)
+        top_refs = data['top_refs']
 
         if not top_refs.empty:
             st.dataframe(top_refs, use_container_width=True, hide_index=True)
@@ -236,16 +252,7 @@ try:
     # ============================================
     st.header("🌍 Geographic Distribution")
 
-    geo_dist = run_query("""
-        SELECT
-            AREA_NAME,
-            TOTAL_MATCHES,
-            AVG_GOALS_PER_MATCH,
-            HOME_WIN_PCT
-        FROM GOLD.GEOGRAPHIC_STATS
-        ORDER BY TOTAL_MATCHES DESC
-        LIMIT 10
-    """)
+    geo_dist = data['geo_dist']
 
     if not geo_dist.empty:
         col1, col2 = st.columns(2)
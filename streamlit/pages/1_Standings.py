@@ -5,38 +5,19 @@ SnowGoal - League Standings Page
 import streamlit as st
 import sys
 sys.path.append('..')
-from connection import run_query
+from dimensions import competition_options
+from snapshots import load_gold
 
 st.set_page_config(page_title="Standings | SnowGoal", page_icon="🏆", layout="wide")
 
 st.title("🏆 League Standings")
 
-# League names mapping
-LEAGUE_NAMES = {
-    'PL': 'Premier League',
-    'PD': 'La Liga',
-    'BL1': 'Bundesliga',
-    'SA': 'Serie A',
-    'FL1': 'Ligue 1',
-    'CL': 'Champions League',
-    
-    'EC': 'European Championship',
-    'PPL': 'Primeira Liga',
-    'DED': 'Eredivisie',
-    'ELC': 'Championship',
-    'BSA': 'Brasileirão'
-}
-
 try:
-    # Get available competitions
-    competitions = run_query("""
-        SELECT DISTINCT COMPETITION_CODE
-        FROM GOLD.LEAGUE_STANDINGS
-        ORDER BY COMPETITION_CODE
-    """)
+    # Snapshot local (Parquet) de GOLD.LEAGUE_STANDINGS: filtres servis sans warehouse
+    all_standings = load_gold("LEAGUE_STANDINGS")
 
-    comp_codes = list(competitions['COMPETITION_CODE'])
-    comp_options = {LEAGUE_NAMES.get(code, code): code for code in comp_codes}
+    # Get available competitions
+    comp_options = competition_options(all_standings['COMPETITION_CODE'].unique())
 
     if comp_options:
         selected_comp = st.selectbox(
@@ -47,26 +28,22 @@ try:
         comp_code = comp_options[selected_comp]
 
         # Get standings
-        standings_df = run_query(f"""
-            SELECT
-                POSITION,
-                TEAM_NAME,
-                TEAM_TLA,
-                PLAYED,
-                WON,
-                DRAW,
-                LOST,
-                GOALS_FOR,
-                GOALS_AGAINST,
-                GOAL_DIFF,
-                POINTS,
-                FORM,
-                POINTS_PER_GAME,
-                WIN_PERCENTAGE
-            FROM GOLD.LEAGUE_STANDINGS
-            WHERE COMPETITION_CODE = '{comp_code}'
-            ORDER BY POSITION
-        """)
+        standings_df = all_standings[all_standings['COMPETITION_CODE'] == comp_code].sort_values('POSITION')[[
+            'POSITION',
+            'TEAM_NAME',
+            'TEAM_TLA',
+            'PLAYED',
+            'WON',
+            'DRAW',
+            'LOST',
+            'GOALS_FOR',
+            'GOALS_AGAINST',
+            'GOAL_DIFF',
+            'POINTS',
+            'FORM',
+            'POINTS_PER_GAME',
+            'WIN_PERCENTAGE'
+        ]].reset_index(drop=True)
 
         if not standings_df.empty:
             # KPIs
@@ -93,6 +70,28 @@ try:
             st.subheader("📊 Points Distribution")
             st.bar_chart(standings_df.set_index('TEAM_TLA')['POINTS'])
 
+            # Season outlook (Monte Carlo)
+            outlook_df = load_gold("SEASON_SIMULATIONS")
+            outlook_df = outlook_df[outlook_df['COMPETITION_CODE'] == comp_code].sort_values('EXPECTED_POSITION')
+            outlook_df['TITLE_PCT'] = (outlook_df['PROB_TITLE'] * 100).round(1)
+            outlook_df['TOP_4_PCT'] = (outlook_df['PROB_TOP_4'] * 100).round(1)
+            outlook_df['RELEGATION_PCT'] = (outlook_df['PROB_RELEGATION'] * 100).round(1)
+
+            if not outlook_df.empty:
+                st.subheader("🔮 Season Outlook")
+                meta = outlook_df.iloc[0]
+                st.caption(
+                    f"{int(meta['N_SIMULATIONS']):,} simulated seasons • "
+                    f"{int(meta['REMAINING_FIXTURES'])} remaining fixtures • "
+                    f"updated {meta['SIMULATED_AT']}"
+                )
+                st.dataframe(
+                    outlook_df[['TEAM_NAME', 'CURRENT_POSITION', 'CURRENT_POINTS', 'EXPECTED_POINTS',
+                                'EXPECTED_POSITION', 'TITLE_PCT', 'TOP_4_PCT', 'RELEGATION_PCT']],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
         else:
             st.warning("No standings data available.")
     else:
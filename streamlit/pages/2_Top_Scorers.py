@@ -6,59 +6,36 @@ import streamlit as st
 import sys
 import pandas as pd
 sys.path.append('..')
-from connection import run_query
+from dimensions import competition_options
+from snapshots import load_gold
 
 st.set_page_config(page_title="Top Scorers | SnowGoal", page_icon="🎯", layout="wide")
 
 st.title("🎯 Top Scorers")
 
-LEAGUE_NAMES = {
-    'PL': 'Premier League',
-    'PD': 'La Liga',
-    'BL1': 'Bundesliga',
-    'SA': 'Serie A',
-    'FL1': 'Ligue 1',
-    'CL': 'Champions League',
-    
-    'EC': 'European Championship',
-    'PPL': 'Primeira Liga',
-    'DED': 'Eredivisie',
-    'ELC': 'Championship',
-    'BSA': 'Brasileirão'
-}
-
 try:
-    competitions = run_query("""
-        SELECT DISTINCT COMPETITION_CODE
-        FROM GOLD.TOP_SCORERS
-        ORDER BY COMPETITION_CODE
-    """)
+    # Snapshot local (Parquet) de GOLD.TOP_SCORERS: filtres servis sans warehouse
+    all_scorers = load_gold("TOP_SCORERS")
 
-    comp_codes = list(competitions['COMPETITION_CODE'])
-    comp_options = {LEAGUE_NAMES.get(code, code): code for code in comp_codes}
+    comp_options = competition_options(all_scorers['COMPETITION_CODE'].unique())
 
     if comp_options:
         selected_comp = st.selectbox("Select League", list(comp_options.keys()))
         comp_code = comp_options[selected_comp]
 
-        scorers_df = run_query(f"""
-            SELECT
-                GOALS_RANK AS RANK,
-                PLAYER_NAME,
-                TEAM_NAME,
-                NATIONALITY,
-                AGE,
-                GOALS,
-                ASSISTS,
-                PENALTIES,
-                PLAYED_MATCHES,
-                GOAL_CONTRIBUTIONS,
-                GOALS_PER_MATCH
-            FROM GOLD.TOP_SCORERS
-            WHERE COMPETITION_CODE = '{comp_code}'
-            ORDER BY GOALS DESC
-            LIMIT 20
-        """)
+        scorers_df = all_scorers[all_scorers['COMPETITION_CODE'] == comp_code].sort_values('GOALS', ascending=False).head(20)[[
+            'GOALS_RANK',
+            'PLAYER_NAME',
+            'TEAM_NAME',
+            'NATIONALITY',
+            'AGE',
+            'GOALS',
+            'ASSISTS',
+            'PENALTIES',
+            'PLAYED_MATCHES',
+            'GOAL_CONTRIBUTIONS',
+            'GOALS_PER_MATCH'
+        ]].rename(columns={'GOALS_RANK': 'RANK'}).reset_index(drop=True)
 
         if not scorers_df.empty:
             # Top 3 podium
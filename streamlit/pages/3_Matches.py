@@ -5,56 +5,33 @@ SnowGoal - Matches Page
 import streamlit as st
 import sys
 sys.path.append('..')
-from connection import run_query
+from dimensions import get_competitions, league_names
+from snapshots import load_gold
 
 st.set_page_config(page_title="Matches | SnowGoal", page_icon="📅", layout="wide")
 
 st.title("📅 Matches")
 
-LEAGUE_NAMES = {
-    'PL': 'Premier League',
-    'PD': 'La Liga',
-    'BL1': 'Bundesliga',
-    'SA': 'Serie A',
-    'FL1': 'Ligue 1',
-    'CL': 'Champions League',
-    
-    'EC': 'European Championship',
-    'PPL': 'Primeira Liga',
-    'DED': 'Eredivisie',
-    'ELC': 'Championship',
-    'BSA': 'Brasileirão'
-}
-
 try:
+    LEAGUE_NAMES = league_names()
+
     # League filter
-    comp_codes = ['All', 'PL', 'PD', 'BL1', 'SA', 'FL1', 'CL', 'EC', 'PPL', 'DED', 'ELC', 'BSA']
+    comp_codes = ['All'] + get_competitions()['COMPETITION_CODE'].tolist()
     comp_display = ['All Leagues'] + [LEAGUE_NAMES.get(c, c) for c in comp_codes[1:]]
     selected_idx = st.selectbox("Filter by League", range(len(comp_display)), format_func=lambda x: comp_display[x])
     selected_comp = comp_codes[selected_idx]
 
-    where_clause = f"AND COMPETITION_CODE = '{selected_comp}'" if selected_comp != 'All' else ""
+    # Snapshots locaux (Parquet) des tables GOLD: filtres servis sans warehouse
+    def filter_comp(df):
+        return df if selected_comp == 'All' else df[df['COMPETITION_CODE'] == selected_comp]
 
     tab1, tab2 = st.tabs(["Recent Results", "Upcoming"])
 
     with tab1:
         st.subheader("Recent Results")
 
-        recent_df = run_query(f"""
-            SELECT
-                MATCH_DATETIME_DISPLAY,
-                COMPETITION_CODE,
-                MATCHDAY,
-                HOME_TEAM_NAME,
-                SCORE_DISPLAY,
-                AWAY_TEAM_NAME,
-                RESULT_DISPLAY,
-                MATCH_DATE
-            FROM GOLD.RECENT_MATCHES
-            WHERE STATUS = 'FINISHED' {where_clause}
-            ORDER BY MATCH_DATE DESC
-            LIMIT 30
-        """)
+        recent_df = filter_comp(load_gold("RECENT_MATCHES"))
+        recent_df = recent_df[recent_df['STATUS'] == 'FINISHED'].sort_values('MATCH_DATE', ascending=False).head(30)
 
         if not recent_df.empty:
             recent_df['LEAGUE'] = recent_df['COMPETITION_CODE'].map(LEAGUE_NAMES)
@@ -65,19 +42,7 @@ try:
     with tab2:
         st.subheader("Upcoming Fixtures")
 
-        upcoming_df = run_query(f"""
-            SELECT
-                MATCH_DATETIME_DISPLAY,
-                COMPETITION_CODE,
-                MATCHDAY,
-                HOME_TEAM_NAME,
-                AWAY_TEAM_NAME,
-                DAYS_UNTIL
-            FROM GOLD.UPCOMING_FIXTURES
-            WHERE 1=1 {where_clause}
-            ORDER BY MATCH_DATE
-            LIMIT 30
-        """)
+        upcoming_df = filter_comp(load_gold("UPCOMING_FIXTURES")).sort_values('MATCH_DATE').head(30)
 
         if not upcoming_df.empty:
             upcoming_df['LEAGUE'] = upcoming_df['COMPETITION_CODE'].map(LEAGUE_NAMES)
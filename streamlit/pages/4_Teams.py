@@ -5,46 +5,22 @@ SnowGoal - Teams Page
 import streamlit as st
 import sys
 sys.path.append('..')
-from connection import run_query
+from dimensions import competition_options, get_teams, league_names
+from snapshots import load_gold
 
 st.set_page_config(page_title="Teams | SnowGoal", page_icon="🏟️", layout="wide")
 
 st.title("🏟️ Teams")
 
-LEAGUE_NAMES = {
-    'PL': 'Premier League',
-    'PD': 'La Liga',
-    'BL1': 'Bundesliga',
-    'SA': 'Serie A',
-    'FL1': 'Ligue 1',
-    'CL': 'Champions League',
-    
-    'EC': 'European Championship',
-    'PPL': 'Primeira Liga',
-    'DED': 'Eredivisie',
-    'ELC': 'Championship',
-    'BSA': 'Brasileirão'
-}
-
 try:
-    teams_df = run_query("""
-        SELECT
-            TEAM_ID,
-            TEAM_NAME,
-            TEAM_TLA,
-            COMPETITION_CODE,
-            VENUE,
-            FOUNDED,
-            CLUB_COLORS,
-            COACH_NAME
-        FROM SILVER.TEAMS
-        ORDER BY TEAM_NAME
-    """)
+    LEAGUE_NAMES = league_names()
+
+    # Dimension partagée (chargée une fois par version des données)
+    teams_df = get_teams()
 
     if not teams_df.empty:
         # Competition filter with real names
-        comp_codes = list(teams_df['COMPETITION_CODE'].unique())
-        comp_options = {LEAGUE_NAMES.get(c, c): c for c in comp_codes}
+        comp_options = competition_options(teams_df['COMPETITION_CODE'].unique())
         comp_display = ['All'] + list(comp_options.keys())
         selected_display = st.selectbox("Filter by League", comp_display)
 
@@ -82,11 +58,8 @@ try:
         # Team stats
         st.subheader("📊 Season Statistics")
 
-        stats_df = run_query(f"""
-            SELECT *
-            FROM GOLD.TEAM_STATS
-            WHERE TEAM_ID = {team_id}
-        """)
+        stats_df = load_gold("TEAM_STATS")
+        stats_df = stats_df[stats_df['TEAM_ID'] == team_id]
 
         if not stats_df.empty:
             stats = stats_df.iloc[0]
@@ -9,36 +9,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 sys.path.append('..')
-from connection import run_query
+from connection import run_queries
+from dimensions import competition_options
 
 st.set_page_config(page_title="Analytics | SnowGoal", page_icon="📊", layout="wide")
 
 st.title("📊 Advanced Analytics")
 
-LEAGUE_NAMES = {
-    'PL': 'Premier League',
-    'PD': 'La Liga',
-    'BL1': 'Bundesliga',
-    'SA': 'Serie A',
-    'FL1': 'Ligue 1',
-    'CL': 'Champions League',
-    'EC': 'European Championship',
-    'PPL': 'Primeira Liga',
-    'DED': 'Eredivisie',
-    'ELC': 'Championship',
-    'BSA': 'Brasileirão'
-}
-
 # Get available competitions
 try:
-    competitions = run_query("""
-        SELECT DISTINCT COMPETITION_CODE
-        FROM GOLD.MATCH_PATTERNS
-        ORDER BY COMPETITION_CODE
-    """)
-
-    comp_codes = list(competitions['COMPETITION_CODE'])
-    comp_options = {LEAGUE_NAMES.get(code, code): code for code in comp_codes}
+    comp_options = competition_options()
 
     if comp_options:
         selected_comp = st.selectbox("Select League", list(comp_options.keys()))
@@ -50,6 +30,129 @@ except Exception as e:
     st.error(f"Could not load competitions: {e}")
     st.stop()
 
+# Requêtes des 3 onglets soumises ensemble (async): latence = requête la plus lente
+queries = {
+    "weekend_data": ("""
+        SELECT
+            CASE
+                WHEN DAY_OF_WEEK IN ('Sat', 'Sun') THEN 'Weekend'
+                ELSE 'Midweek'
+            END AS PERIOD,
+            SUM(TOTAL_MATCHES) AS MATCHES,
+            ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS
+        FROM GOLD.MATCH_PATTERNS
+        WHERE COMPETITION_CODE = ?
+        GROUP BY PERIOD
+    """, [comp_code]),
+    "hourly_data": ("""
+        SELECT
+            MATCH_HOUR,
+            SUM(TOTAL_MATCHES) AS MATCHES,
+            ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS
+        FROM GOLD.MATCH_PATTERNS
+        WHERE COMPETITION_CODE = ?
+        GROUP BY MATCH_HOUR
+        ORDER BY MATCH_HOUR
+    """, [comp_code]),
+    "dow_data": ("""
+        SELECT
+            DAY_OF_WEEK,
+            SUM(TOTAL_MATCHES) AS MATCHES,
+            ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS,
+            ROUND(100.0 * SUM(HOME_WINS) / SUM(TOTAL_MATCHES), 1) AS HOME_WIN_PCT
+        FROM GOLD.MATCH_PATTERNS
+        WHERE COMPETITION_CODE = ?
+        GROUP BY DAY_OF_WEEK
+        ORDER BY
+            CASE DAY_OF_WEEK
+                WHEN 'Mon' THEN 1
+                WHEN 'Tue' THEN 2
+                WHEN 'Wed' THEN 3
+                WHEN 'Thu' THEN 4
+                WHEN 'Fri' THEN 5
+                WHEN 'Sat' THEN 6
+                WHEN 'Sun' THEN 7
+            END
+    """, [comp_code]),
+    "top_refs": ("""
+        SELECT
+            REFEREE_NAME,
+            REFEREE_NATIONALITY,
+            MATCHES_REFEREED,
+            AVG_GOALS_PER_MATCH,
+            EXTRA_TIME_PCT
+        FROM GOLD.REFEREE_STATS
+        WHERE REFEREE_NAME IN (
+            SELECT REFEREE_NAME
+            FROM SILVER.MATCHES
+            WHERE COMPETITION_CODE = ?
+            AND REFEREE_NAME IS NOT NULL
+        )
+        ORDER BY MATCHES_REFEREED DESC
+        LIMIT 15
+    """, [comp_code]),
+    "refs_by_nation": ("""
+        SELECT
+            REFEREE_NATIONALITY,
+            COUNT(DISTINCT REFEREE_NAME) AS NUM_REFEREES,
+            SUM(MATCHES_REFEREED) AS TOTAL_MATCHES
+        FROM GOLD.REFEREE_STATS
+        WHERE REFEREE_NAME IN (
+            SELECT REFEREE_NAME
+            FROM SILVER.MATCHES
+            WHERE COMPETITION_CODE = ?
+            AND REFEREE_NAME IS NOT NULL
+        )
+        GROUP BY REFEREE_NATIONALITY
+        ORDER BY TOTAL_MATCHES DESC
+        LIMIT 10
+    """, [comp_code]),
+    "extra_time_refs": ("""
+        SELECT
+            REFEREE_NAME,
+            REFEREE_NATIONALITY,
+            MATCHES_REFEREED,
+            EXTRA_TIME_MATCHES,
+            EXTRA_TIME_PCT
+        FROM GOLD.REFEREE_STATS
+        WHERE REFEREE_NAME IN (
+            SELECT REFEREE_NAME
+            FROM SILVER.MATCHES
+            WHERE COMPETITION_CODE = ?
+            AND REFEREE_NAME IS NOT NULL
+        )
+        AND MATCHES_REFEREED >= 10
+        ORDER BY EXTRA_TIME_PCT DESC
+        LIMIT 10
+    """, [comp_code]),
+    "geo_data": """
+        SELECT
+            AREA_NAME,
+            AREA_CODE,
+            COMPETITIONS,
+            TOTAL_MATCHES,
+            AVG_GOALS_PER_MATCH,
+            HOME_WIN_PCT
+        FROM GOLD.GEOGRAPHIC_STATS
+        ORDER BY TOTAL_MATCHES DESC
+        LIMIT 15
+    """,
+    "home_adv": """
+        SELECT
+            AREA_NAME,
+            TOTAL_MATCHES,
+            HOME_WINS,
+            AWAY_WINS,
+            DRAWS,
+            HOME_WIN_PCT
+        FROM GOLD.GEOGRAPHIC_STATS
+        WHERE TOTAL_MATCHES >= 50
+        ORDER BY HOME_WIN_PCT DESC
+        LIMIT 10
+    """,
+}
+data = run_queries(queries)
+
 # Tabs for different analyses
 tab1, tab2, tab3 = st.tabs(["Time Patterns", "Referee Stats", "Geographic Analysis"])
 
@@ -62,18 +165,7 @@ with tab1:
     try:
         # Weekend vs Midweek analysis
         st.markdown("### Weekend vs Midweek")
-        weekend_data = run_query(f"""
-            SELECT
-                CASE
-                    WHEN DAY_OF_WEEK IN ('Sat', 'Sun') THEN 'Weekend'
-                    ELSE 'Midweek'
-                END AS PERIOD,
-                SUM(TOTAL_MATCHES) AS MATCHES,
-                ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS
-            FROM GOLD.MATCH_PATTERNS
-            WHERE COMPETITION_CODE = '{comp_code}'
-            GROUP BY PERIOD
-        """)
+        weekend_data = data['weekend_data']
 
         if not weekend_data.empty:
             col1, col2 = st.columns(2)
@@ -95,16 +187,7 @@ with tab1:
 
         # Goals by hour
         st.markdown("### Goals by Match Hour")
-        hourly_data = run_query(f"""
-            SELECT
-                MATCH_HOUR,
-                SUM(TOTAL_MATCHES) AS MATCHES,
-                ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS
-            FROM GOLD.MATCH_PATTERNS
-            WHERE COMPETITION_CODE = '{comp_code}'
-            GROUP BY MATCH_HOUR
-            ORDER BY MATCH_HOUR
-        """)
+        hourly_data = data['hourly_data']
 
         if not hourly_data.empty:
             fig = go.Figure()
@@ -128,26 +211,7 @@ with tab1:
 
         # Day of week breakdown
         st.markdown("### Day of Week Analysis")
-        dow_data = run_query(f"""
-            SELECT
-                DAY_OF_WEEK,
-                SUM(TOTAL_MATCHES) AS MATCHES,
-                ROUND(AVG(AVG_TOTAL_GOALS), 2) AS AVG_GOALS,
-                ROUND(100.0 * SUM(HOME_WINS) / SUM(TOTAL_MATCHES), 1) AS HOME_WIN_PCT
-            FROM GOLD.MATCH_PATTERNS
-            WHERE COMPETITION_CODE = '{comp_code}'
-            GROUP BY DAY_OF_WEEK
-            ORDER BY
-                CASE DAY_OF_WEEK
-                    WHEN 'Mon' THEN 1
-                    WHEN 'Tue' THEN 2
-                    WHEN 'Wed' THEN 3
-                    WHEN 'Thu' THEN 4
-                    WHEN 'Fri' THEN 5
-                    WHEN 'Sat' THEN 6
-                    WHEN 'Sun' THEN 7
-                END
-        """)
+        dow_data = data['dow_data']
 
         if not dow_data.empty:
             col1, col2 = st.columns(2)
@@ -177,23 +241,7 @@ with tab2:
     try:
         # Top referees
         st.markdown("### 🏆 Most Active Referees")
-        top_refs = run_query(f"""
-            SELECT
-                REFEREE_NAME,
-                REFEREE_NATIONALITY,
-                MATCHES_REFEREED,
-                AVG_GOALS_PER_MATCH,
-                EXTRA_TIME_PCT
-            FROM GOLD.REFEREE_STATS
-            WHERE REFEREE_NAME IN (
-                SELECT REFEREE_NAME
-                FROM SILVER.MATCHES
-                WHERE COMPETITION_CODE = '{comp_code}'
-                AND REFEREE_NAME IS NOT NULL
-            )
-            ORDER BY MATCHES_REFEREED DESC
-            LIMIT 15
-        """)
+        top_refs = data['top_refs']
 
         if not top_refs.empty:
             st.dataframe(top_refs, use_container_width=True)
@@ -220,22 +268,7 @@ with tab2:
 
         # Referees by nationality
         st.markdown("### 🌍 Referees by Nationality")
-        refs_by_nation = run_query(f"""
-            SELECT
-                REFEREE_NATIONALITY,
-                COUNT(DISTINCT REFEREE_NAME) AS NUM_REFEREES,
-                SUM(MATCHES_REFEREED) AS TOTAL_MATCHES
-            FROM GOLD.REFEREE_STATS
-            WHERE REFEREE_NAME IN (
-                SELECT REFEREE_NAME
-                FROM SILVER.MATCHES
-                WHERE COMPETITION_CODE = '{comp_code}'
-                AND REFEREE_NAME IS NOT NULL
-            )
-            GROUP BY REFEREE_NATIONALITY
-            ORDER BY TOTAL_MATCHES DESC
-            LIMIT 10
-        """)
+        refs_by_nation = data['refs_by_nation']
 
         if not refs_by_nation.empty:
             fig = px.treemap(refs_by_nation,
@@ -250,24 +283,7 @@ with tab2:
 
         # Extra time specialists
         st.markdown("### ⏱️ Extra Time Specialists")
-        extra_time_refs = run_query(f"""
-            SELECT
-                REFEREE_NAME,
-                REFEREE_NATIONALITY,
-                MATCHES_REFEREED,
-                EXTRA_TIME_MATCHES,
-                EXTRA_TIME_PCT
-            FROM GOLD.REFEREE_STATS
-            WHERE REFEREE_NAME IN (
-                SELECT REFEREE_NAME
-                FROM SILVER.MATCHES
-                WHERE COMPETITION_CODE = '{comp_code}'
-                AND REFEREE_NAME IS NOT NULL
-            )
-            AND MATCHES_REFEREED >= 10
-            ORDER BY EXTRA_TIME_PCT DESC
-            LIMIT 10
-        """)
+        extra_time_refs = data['extra_time_refs']
 
         if not extra_time_refs.empty:
             fig = px.bar(extra_time_refs, x='REFEREE_NAME', y='EXTRA_TIME_PCT',
@@ -290,18 +306,7 @@ with tab3:
     try:
         # Matches by country
         st.markdown("### 🗺️ Matches by Country/Area")
-        geo_data = run_query("""
-            SELECT
-                AREA_NAME,
-                AREA_CODE,
-                COMPETITIONS,
-                TOTAL_MATCHES,
-                AVG_GOALS_PER_MATCH,
-                HOME_WIN_PCT
-            FROM GOLD.GEOGRAPHIC_STATS
-            ORDER BY TOTAL_MATCHES DESC
-            LIMIT 15
-        """)
+        geo_data = data['geo_data']
 
         if not geo_data.empty:
             st.dataframe(geo_data, use_container_width=True)
@@ -328,19 +333,7 @@ with tab3:
 
         # Home advantage analysis
         st.markdown("### 🏠 Home Advantage Analysis")
-        home_adv = run_query("""
-            SELECT
-                AREA_NAME,
-                TOTAL_MATCHES,
-                HOME_WINS,
-                AWAY_WINS,
-                DRAWS,
-                HOME_WIN_PCT
-            FROM GOLD.GEOGRAPHIC_STATS
-            WHERE TOTAL_MATCHES >= 50
-            ORDER BY HOME_WIN_PCT DESC
-            LIMIT 10
-        """)
+        home_adv = data['home_adv']
 
         if not home_adv.empty:
             fig = px.bar(home_adv, x='AREA_NAME', y='HOME_WIN_PCT',
@@ -10,7 +10,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 sys.path.append('..')
-from connection import run_query
+from connection import run_query, in_list
+from dimensions import get_competitions
 
 st.set_page_config(page_title="Betting Intelligence | SnowGoal", page_icon="🎲", layout="wide")
 
@@ -24,18 +25,12 @@ with st.sidebar:
     st.header("🔧 Filters")
 
     # Competition filter with real names
-    competitions = run_query("""
-        SELECT DISTINCT
-            o.COMPETITION_CODE,
-            COALESCE(c.COMPETITION_NAME, o.COMPETITION_CODE) as COMPETITION_NAME
-        FROM GOLD.ODDS_ANALYSIS o
-        LEFT JOIN SILVER.COMPETITIONS c ON o.COMPETITION_CODE = c.COMPETITION_CODE
-        ORDER BY o.COMPETITION_CODE
-    """)
+    competitions = get_competitions()
+    competitions = competitions[competitions['HAS_ODDS']]
 
     if not competitions.empty:
-        # Create a mapping dict for code -> name
-        comp_dict = dict(zip(competitions['COMPETITION_NAME'], competitions['COMPETITION_CODE']))
+        # Create a mapping dict for name -> code
+        comp_dict = dict(zip(competitions['DISPLAY_NAME'], competitions['COMPETITION_CODE']))
 
         selected_comp_names = st.multiselect(
             "Competitions",
@@ -58,8 +53,8 @@ with st.sidebar:
 st.header("📅 Upcoming Matches & Odds")
 
 if selected_comps:
-    comp_filter = "', '".join(selected_comps)
-    upcoming_matches = run_query(f"""
+    comp_filter = in_list(selected_comps)
+    upcoming_matches = run_query("""
         SELECT
             o.COMPETITION_CODE,
             o.COMMENCE_TIME,
@@ -68,19 +63,21 @@ if selected_comps:
             o.AVG_HOME_ODDS,
             o.AVG_DRAW_ODDS,
             o.AVG_AWAY_ODDS,
-            o.IMPLIED_HOME_PROB,
-            o.IMPLIED_DRAW_PROB,
-            o.IMPLIED_AWAY_PROB,
+            COALESCE(ROUND(c.CONSENSUS_HOME_PROB * 100, 1), o.IMPLIED_HOME_PROB) as FAIR_HOME_PROB,
+            COALESCE(ROUND(c.CONSENSUS_DRAW_PROB * 100, 1), o.IMPLIED_DRAW_PROB) as FAIR_DRAW_PROB,
+            COALESCE(ROUND(c.CONSENSUS_AWAY_PROB * 100, 1), o.IMPLIED_AWAY_PROB) as FAIR_AWAY_PROB,
             o.BOOKMAKER_MARGIN_PCT,
             o.NB_BOOKMAKERS,
             DATEDIFF('day', CURRENT_TIMESTAMP(), o.COMMENCE_TIME) as days_until
         FROM GOLD.ODDS_ANALYSIS o
-        WHERE o.COMPETITION_CODE IN ('{comp_filter}')
+        LEFT JOIN GOLD.ODDS_CONSENSUS c
+            ON c.GAME_ID = o.GAME_ID
+        WHERE ARRAY_CONTAINS(o.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
           AND o.COMMENCE_TIME > CURRENT_TIMESTAMP()
-          AND o.COMMENCE_TIME <= DATEADD('day', {days_ahead}, CURRENT_TIMESTAMP())
+          AND o.COMMENCE_TIME <= DATEADD('day', ?, CURRENT_TIMESTAMP())
         ORDER BY o.COMMENCE_TIME
         LIMIT 100
-    """)
+    """, params=[comp_filter, days_ahead], section="upcoming_matches")
 
     if not upcoming_matches.empty:
         st.subheader(f"🔮 {len(upcoming_matches)} Upcoming Matches")
@@ -94,11 +91,11 @@ if selected_comps:
                 col1, col2, col3, col4 = st.columns(4)
 
                 with col1:
-                    st.metric("🏠 Home Win", f"{match['AVG_HOME_ODDS']:.2f}", f"{match['IMPLIED_HOME_PROB']:.1f}%")
+                    st.metric("🏠 Home Win", f"{match['AVG_HOME_ODDS']:.2f}", f"Fair: {match['FAIR_HOME_PROB']:.1f}%")
                 with col2:
-                    st.metric("🤝 Draw", f"{match['AVG_DRAW_ODDS']:.2f}", f"{match['IMPLIED_DRAW_PROB']:.1f}%")
+                    st.metric("🤝 Draw", f"{match['AVG_DRAW_ODDS']:.2f}", f"Fair: {match['FAIR_DRAW_PROB']:.1f}%")
                 with col3:
-                    st.metric("✈️ Away Win", f"{match['AVG_AWAY_ODDS']:.2f}", f"{match['IMPLIED_AWAY_PROB']:.1f}%")
+                    st.metric("✈️ Away Win", f"{match['AVG_AWAY_ODDS']:.2f}", f"Fair: {match['FAIR_AWAY_PROB']:.1f}%")
                 with col4:
                     st.metric("📊 Bookmakers", int(match['NB_BOOKMAKERS']), f"Margin: {match['BOOKMAKER_MARGIN_PCT']:.1f}%")
     else:
@@ -115,7 +112,7 @@ if selected_comps:
     st.subheader("Find the Best Odds")
 
     # Get detailed odds by bookmaker for upcoming matches
-    bookmaker_odds = run_query(f"""
+    bookmaker_odds = run_query("""
         SELECT
             o.HOME_TEAM || ' vs ' || o.AWAY_TEAM as MATCH,
             o.BOOKMAKER_TITLE,
@@ -124,14 +121,15 @@ if selected_comps:
             o.AWAY_ODDS,
             o.COMMENCE_TIME,
             o.HOME_TEAM,
-            o.AWAY_TEAM
+            o.AWAY_TEAM,
+            o.GAME_ID
         FROM SILVER.ODDS o
-        WHERE o.COMPETITION_CODE IN ('{comp_filter}')
+        WHERE ARRAY_CONTAINS(o.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
           AND o.COMMENCE_TIME > CURRENT_TIMESTAMP()
-          AND o.COMMENCE_TIME <= DATEADD('day', {days_ahead}, CURRENT_TIMESTAMP())
+          AND o.COMMENCE_TIME <= DATEADD('day', ?, CURRENT_TIMESTAMP())
         ORDER BY o.COMMENCE_TIME, o.HOME_TEAM, o.AWAY_TEAM, o.BOOKMAKER_TITLE
         LIMIT 500
-    """)
+    """, params=[comp_filter, days_ahead], section="bookmaker_odds")
 
     if not bookmaker_odds.empty:
         # Select a match to compare
@@ -140,31 +138,33 @@ if selected_comps:
 
         match_data = bookmaker_odds[bookmaker_odds['MATCH'] == selected_match]
 
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            st.markdown("### 🏠 Home Win")
-            best_home = match_data.nlargest(5, 'HOME_ODDS')[['BOOKMAKER_TITLE', 'HOME_ODDS']]
-            best_home_idx = best_home['HOME_ODDS'].idxmax()
-            for idx, row in best_home.iterrows():
-                emoji = "🥇" if idx == best_home_idx else "📊"
-                st.write(f"{emoji} **{row['BOOKMAKER_TITLE']}**: {row['HOME_ODDS']:.2f}")
-
-        with col2:
-            st.markdown("### 🤝 Draw")
-            best_draw = match_data.nlargest(5, 'DRAW_ODDS')[['BOOKMAKER_TITLE', 'DRAW_ODDS']]
-            best_draw_idx = best_draw['DRAW_ODDS'].idxmax()
-            for idx, row in best_draw.iterrows():
-                emoji = "🥇" if idx == best_draw_idx else "📊"
-                st.write(f"{emoji} **{row['BOOKMAKER_TITLE']}**: {row['DRAW_ODDS']:.2f}")
-
-        with col3:
-            st.markdown("### ✈️ Away Win")
-            best_away = match_data.nlargest(5, 'AWAY_ODDS')[['BOOKMAKER_TITLE', 'AWAY_ODDS']]
-            best_away_idx = best_away['AWAY_ODDS'].idxmax()
-            for idx, row in best_away.iterrows():
-                emoji = "🥇" if idx == best_away_idx else "📊"
-                st.write(f"{emoji} **{row['BOOKMAKER_TITLE']}**: {row['AWAY_ODDS']:.2f}")
+        # Best price per outcome: precomputed by TASK_SCAN_ARBITRAGE (MAX_BY per game)
+        best = run_query("""
+            SELECT
+                BEST_HOME_ODDS, BEST_HOME_BOOKMAKER,
+                BEST_DRAW_ODDS, BEST_DRAW_BOOKMAKER,
+                BEST_AWAY_ODDS, BEST_AWAY_BOOKMAKER,
+                IMPLIED_SUM
+            FROM GOLD.ARBITRAGE_OPPORTUNITIES
+            WHERE GAME_ID = ?
+        """, params=[match_data['GAME_ID'].iloc[0]], section="best_odds")
+
+        if not best.empty:
+            b = best.iloc[0]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🏠 Best Home Win", f"{b['BEST_HOME_ODDS']:.2f}", b['BEST_HOME_BOOKMAKER'], delta_color="off")
+            with col2:
+                st.metric("🤝 Best Draw", f"{b['BEST_DRAW_ODDS']:.2f}", b['BEST_DRAW_BOOKMAKER'], delta_color="off")
+            with col3:
+                st.metric("✈️ Best Away Win", f"{b['BEST_AWAY_ODDS']:.2f}", b['BEST_AWAY_BOOKMAKER'], delta_color="off")
+
+        # All bookmakers, best price per column highlighted
+        st.dataframe(
+            match_data.set_index('BOOKMAKER_TITLE')[['HOME_ODDS', 'DRAW_ODDS', 'AWAY_ODDS']]
+                .style.highlight_max(axis=0, color='#2e7d32').format("{:.2f}"),
+            use_container_width=True
+        )
 
         # Bookmaker margin comparison
         st.subheader("📊 Bookmaker Margin Analysis")
@@ -184,6 +184,33 @@ if selected_comps:
     else:
         st.info("No bookmaker comparison data available for selected filters")
 
+    # Surebets: best prices across bookmakers with an implied sum below 100%
+    st.subheader("🔁 Arbitrage Opportunities")
+    surebets = run_query("""
+        SELECT
+            HOME_TEAM || ' vs ' || AWAY_TEAM as MATCH,
+            COMPETITION_CODE,
+            COMMENCE_TIME,
+            BEST_HOME_ODDS || ' (' || BEST_HOME_BOOKMAKER || ')' as HOME,
+            BEST_DRAW_ODDS || ' (' || BEST_DRAW_BOOKMAKER || ')' as DRAW,
+            BEST_AWAY_ODDS || ' (' || BEST_AWAY_BOOKMAKER || ')' as AWAY,
+            GUARANTEED_RETURN_PCT,
+            STAKE_HOME_PCT,
+            STAKE_DRAW_PCT,
+            STAKE_AWAY_PCT
+        FROM GOLD.ARBITRAGE_OPPORTUNITIES
+        WHERE IS_SUREBET
+          AND ARRAY_CONTAINS(COMPETITION_CODE::VARIANT, SPLIT(?, ','))
+          AND COMMENCE_TIME <= DATEADD('day', ?, CURRENT_TIMESTAMP())
+        ORDER BY GUARANTEED_RETURN_PCT DESC
+    """, params=[comp_filter, days_ahead], section="surebets")
+
+    if not surebets.empty:
+        st.success(f"{len(surebets)} surebet(s) found: stake split (%) guarantees the same return whatever the result")
+        st.dataframe(surebets, use_container_width=True, hide_index=True)
+    else:
+        st.info("No arbitrage opportunity in the current odds (sum of 1/best odds ≥ 100%)")
+
 st.divider()
 
 # ============================================
@@ -193,26 +220,35 @@ st.header("🎯 Value Bets Detector")
 st.markdown("*Identifies matches where bookmaker odds differ significantly from historical performance*")
 
 if selected_comps:
-    # Calculate historical win rates and compare with implied probabilities
-    value_bets = run_query(f"""
-        WITH historical_performance AS (
+    # Calculate historical win rates and compare with de-vigged consensus probabilities (GOLD.ODDS_CONSENSUS)
+    value_bets = run_query("""
+        WITH h2h_lookup AS (
+            -- Même fenêtre que l'agrégation historique: même compétition, 3 dernières saisons
+            SELECT
+                o.GAME_ID,
+                SUM(IFF(o.HOME_TEAM_ID = h.TEAM_A_ID, h.TEAM_A_HOME_MATCHES, h.TEAM_B_HOME_MATCHES)) as total_matches,
+                SUM(IFF(o.HOME_TEAM_ID = h.TEAM_A_ID, h.TEAM_A_HOME_WINS, h.TEAM_B_HOME_WINS)) as home_wins,
+                SUM(IFF(o.HOME_TEAM_ID = h.TEAM_A_ID, h.TEAM_A_HOME_DRAWS, h.TEAM_B_HOME_DRAWS)) as draws
+            FROM GOLD.ODDS_ANALYSIS o
+            JOIN GOLD.HEAD_TO_HEAD_SEASONS h
+                ON h.TEAM_A_ID = LEAST(o.HOME_TEAM_ID, o.AWAY_TEAM_ID)
+                AND h.TEAM_B_ID = GREATEST(o.HOME_TEAM_ID, o.AWAY_TEAM_ID)
+                AND h.COMPETITION_CODE = o.COMPETITION_CODE
+                AND h.SEASON_YEAR >= YEAR(CURRENT_DATE()) - 2
+            WHERE o.COMMENCE_TIME > CURRENT_TIMESTAMP()
+              AND o.COMMENCE_TIME <= DATEADD('day', ?, CURRENT_TIMESTAMP())
+              AND ARRAY_CONTAINS(o.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
+            GROUP BY o.GAME_ID
+        ),
+        historical_performance AS (
             SELECT
-                m.HOME_TEAM_NAME,
-                m.AWAY_TEAM_NAME,
-                m.COMPETITION_CODE,
-                COUNT(*) as total_matches,
-                SUM(CASE WHEN m.WINNER = 'HOME_TEAM' THEN 1 ELSE 0 END) as home_wins,
-                SUM(CASE WHEN m.WINNER = 'DRAW' THEN 1 ELSE 0 END) as draws,
-                SUM(CASE WHEN m.WINNER = 'AWAY_TEAM' THEN 1 ELSE 0 END) as away_wins,
+                GAME_ID,
+                total_matches,
                 ROUND(100.0 * home_wins / total_matches, 1) as home_win_pct,
                 ROUND(100.0 * draws / total_matches, 1) as draw_pct,
-                ROUND(100.0 * away_wins / total_matches, 1) as away_win_pct
-            FROM SILVER.MATCHES m
-            WHERE m.STATUS = 'FINISHED'
-              AND m.SEASON_YEAR >= YEAR(CURRENT_DATE()) - 2
-              AND m.COMPETITION_CODE IN ('{comp_filter}')
-            GROUP BY m.HOME_TEAM_NAME, m.AWAY_TEAM_NAME, m.COMPETITION_CODE
-            HAVING total_matches >= 3
+                ROUND(100.0 * (total_matches - home_wins - draws) / total_matches, 1) as away_win_pct
+            FROM h2h_lookup
+            WHERE total_matches >= 3
         )
         SELECT
             o.COMPETITION_CODE,
@@ -222,28 +258,28 @@ if selected_comps:
             o.AVG_HOME_ODDS,
             o.AVG_DRAW_ODDS,
             o.AVG_AWAY_ODDS,
-            o.IMPLIED_HOME_PROB,
-            o.IMPLIED_DRAW_PROB,
-            o.IMPLIED_AWAY_PROB,
+            ROUND(c.CONSENSUS_HOME_PROB * 100, 1) as FAIR_HOME_PROB,
+            ROUND(c.CONSENSUS_DRAW_PROB * 100, 1) as FAIR_DRAW_PROB,
+            ROUND(c.CONSENSUS_AWAY_PROB * 100, 1) as FAIR_AWAY_PROB,
             h.home_win_pct as HIST_HOME_PCT,
             h.draw_pct as HIST_DRAW_PCT,
             h.away_win_pct as HIST_AWAY_PCT,
             h.total_matches as HIST_MATCHES,
-            ROUND(h.home_win_pct - o.IMPLIED_HOME_PROB, 1) as HOME_VALUE,
-            ROUND(h.draw_pct - o.IMPLIED_DRAW_PROB, 1) as DRAW_VALUE,
-            ROUND(h.away_win_pct - o.IMPLIED_AWAY_PROB, 1) as AWAY_VALUE
+            ROUND(h.home_win_pct - c.CONSENSUS_HOME_PROB * 100, 1) as HOME_VALUE,
+            ROUND(h.draw_pct - c.CONSENSUS_DRAW_PROB * 100, 1) as DRAW_VALUE,
+            ROUND(h.away_win_pct - c.CONSENSUS_AWAY_PROB * 100, 1) as AWAY_VALUE
         FROM GOLD.ODDS_ANALYSIS o
+        JOIN GOLD.ODDS_CONSENSUS c
+            ON c.GAME_ID = o.GAME_ID
         LEFT JOIN historical_performance h
-            ON o.HOME_TEAM = h.HOME_TEAM_NAME
-            AND o.AWAY_TEAM = h.AWAY_TEAM_NAME
-            AND o.COMPETITION_CODE = h.COMPETITION_CODE
+            ON o.GAME_ID = h.GAME_ID
         WHERE o.COMMENCE_TIME > CURRENT_TIMESTAMP()
-          AND o.COMMENCE_TIME <= DATEADD('day', {days_ahead}, CURRENT_TIMESTAMP())
-          AND o.COMPETITION_CODE IN ('{comp_filter}')
+          AND o.COMMENCE_TIME <= DATEADD('day', ?, CURRENT_TIMESTAMP())
+          AND ARRAY_CONTAINS(o.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
           AND h.total_matches IS NOT NULL
         ORDER BY o.COMMENCE_TIME
         LIMIT 50
-    """)
+    """, params=[days_ahead, comp_filter, days_ahead, comp_filter], section="value_bets")
 
     if not value_bets.empty:
         # Find significant value bets (>10% difference)
@@ -267,17 +303,17 @@ if selected_comps:
                 if bet['VALUE_TYPE'] == 'Home Win':
                     odds = bet['AVG_HOME_ODDS']
                     hist_pct = bet['HIST_HOME_PCT']
-                    impl_pct = bet['IMPLIED_HOME_PROB']
+                    impl_pct = bet['FAIR_HOME_PROB']
                     value = bet['HOME_VALUE']
                 elif bet['VALUE_TYPE'] == 'Draw':
                     odds = bet['AVG_DRAW_ODDS']
                     hist_pct = bet['HIST_DRAW_PCT']
-                    impl_pct = bet['IMPLIED_DRAW_PROB']
+                    impl_pct = bet['FAIR_DRAW_PROB']
                     value = bet['DRAW_VALUE']
                 else:
                     odds = bet['AVG_AWAY_ODDS']
                     hist_pct = bet['HIST_AWAY_PCT']
-                    impl_pct = bet['IMPLIED_AWAY_PROB']
+                    impl_pct = bet['FAIR_AWAY_PROB']
                     value = bet['AWAY_VALUE']
 
                 with st.expander(f"💎 **{bet['HOME_TEAM']} vs {bet['AWAY_TEAM']}** • {match_time} • Value: +{value:.1f}%"):
@@ -287,11 +323,11 @@ if selected_comps:
                     with col2:
                         st.metric("Historical Win Rate", f"{hist_pct:.1f}%", f"Based on {int(bet['HIST_MATCHES'])} matches")
                     with col3:
-                        st.metric("Implied Probability", f"{impl_pct:.1f}%", f"Difference: +{value:.1f}%")
+                        st.metric("Market Fair Probability", f"{impl_pct:.1f}%", f"Difference: +{value:.1f}%")
 
-                    st.info(f"📊 **Analysis**: Historical data suggests {bet['VALUE_TYPE']} occurs {hist_pct:.1f}% of the time in H2H matches, but bookmakers only imply {impl_pct:.1f}% probability (difference: {value:.1f}%). This could represent value.")
+                    st.info(f"📊 **Analysis**: Historical data suggests {bet['VALUE_TYPE']} occurs {hist_pct:.1f}% of the time in H2H matches, but the margin-free market consensus only gives {impl_pct:.1f}% (difference: {value:.1f}%). This could represent value.")
         else:
-            st.info(f"No significant value bets found (threshold: {value_threshold}% difference between historical and implied probability)")
+            st.info(f"No significant value bets found (threshold: {value_threshold}% difference between historical and fair market probability)")
     else:
         st.warning("Not enough historical data to calculate value bets")
 
@@ -301,134 +337,99 @@ st.divider()
 # SECTION 4: Match Predictor
 # ============================================
 st.header("🔮 SnowGoal Match Predictor")
-st.markdown("*Combines team form, standings, and historical H2H data with odds analysis*")
+st.markdown("*Poisson / Dixon-Coles model fitted per competition (time-weighted), compared with the de-vigged bookmaker consensus*")
 
 if selected_comps:
-    predictions = run_query(f"""
-        WITH team_form AS (
-            SELECT
-                m.HOME_TEAM_NAME as TEAM,
-                m.COMPETITION_CODE,
-                COUNT(*) as recent_matches,
-                SUM(CASE WHEN m.WINNER = 'HOME_TEAM' THEN 3
-                         WHEN m.WINNER = 'DRAW' THEN 1 ELSE 0 END) as points,
-                ROUND(AVG(m.HOME_SCORE), 1) as avg_goals_scored,
-                ROUND(AVG(m.AWAY_SCORE), 1) as avg_goals_conceded
-            FROM SILVER.MATCHES m
-            WHERE m.STATUS = 'FINISHED'
-              AND m.MATCH_DATE >= DATEADD('day', -90, CURRENT_DATE())
-              AND m.COMPETITION_CODE IN ('{comp_filter}')
-            GROUP BY m.HOME_TEAM_NAME, m.COMPETITION_CODE
-
-            UNION ALL
-
-            SELECT
-                m.AWAY_TEAM_NAME as TEAM,
-                m.COMPETITION_CODE,
-                COUNT(*) as recent_matches,
-                SUM(CASE WHEN m.WINNER = 'AWAY_TEAM' THEN 3
-                         WHEN m.WINNER = 'DRAW' THEN 1 ELSE 0 END) as points,
-                ROUND(AVG(m.AWAY_SCORE), 1) as avg_goals_scored,
-                ROUND(AVG(m.HOME_SCORE), 1) as avg_goals_conceded
-            FROM SILVER.MATCHES m
-            WHERE m.STATUS = 'FINISHED'
-              AND m.MATCH_DATE >= DATEADD('day', -90, CURRENT_DATE())
-              AND m.COMPETITION_CODE IN ('{comp_filter}')
-            GROUP BY m.AWAY_TEAM_NAME, m.COMPETITION_CODE
-        ),
-        aggregated_form AS (
-            SELECT
-                TEAM,
-                COMPETITION_CODE,
-                SUM(recent_matches) as total_matches,
-                ROUND(SUM(points) * 1.0 / SUM(recent_matches), 2) as ppg,
-                ROUND(AVG(avg_goals_scored), 1) as avg_scored,
-                ROUND(AVG(avg_goals_conceded), 1) as avg_conceded
-            FROM team_form
-            GROUP BY TEAM, COMPETITION_CODE
-        )
+    predictions = run_query("""
         SELECT
-            o.COMPETITION_CODE,
-            o.HOME_TEAM,
-            o.AWAY_TEAM,
-            o.COMMENCE_TIME,
+            p.COMPETITION_CODE,
+            p.HOME_TEAM_NAME as HOME_TEAM,
+            p.AWAY_TEAM_NAME as AWAY_TEAM,
+            p.MATCH_DATE,
+            ROUND(p.PROB_HOME_WIN * 100, 1) as MODEL_HOME_PROB,
+            ROUND(p.PROB_DRAW * 100, 1) as MODEL_DRAW_PROB,
+            ROUND(p.PROB_AWAY_WIN * 100, 1) as MODEL_AWAY_PROB,
+            ROUND(p.PROB_OVER_2_5 * 100, 1) as MODEL_OVER_2_5,
+            ROUND(p.PROB_BTTS * 100, 1) as MODEL_BTTS,
+            p.EXP_HOME_GOALS,
+            p.EXP_AWAY_GOALS,
+            p.MOST_LIKELY_SCORE,
             o.AVG_HOME_ODDS,
             o.AVG_DRAW_ODDS,
             o.AVG_AWAY_ODDS,
-            o.IMPLIED_HOME_PROB,
-            o.IMPLIED_DRAW_PROB,
-            o.IMPLIED_AWAY_PROB,
-            h.ppg as home_form_ppg,
-            h.avg_scored as home_avg_scored,
-            h.avg_conceded as home_avg_conceded,
-            a.ppg as away_form_ppg,
-            a.avg_scored as away_avg_scored,
-            a.avg_conceded as away_avg_conceded,
-            ROUND((h.ppg - a.ppg) * 10, 1) as form_advantage
-        FROM GOLD.ODDS_ANALYSIS o
-        LEFT JOIN aggregated_form h ON o.HOME_TEAM = h.TEAM AND o.COMPETITION_CODE = h.COMPETITION_CODE
-        LEFT JOIN aggregated_form a ON o.AWAY_TEAM = a.TEAM AND o.COMPETITION_CODE = a.COMPETITION_CODE
-        WHERE o.COMMENCE_TIME > CURRENT_TIMESTAMP()
-          AND o.COMMENCE_TIME <= DATEADD('day', {days_ahead}, CURRENT_TIMESTAMP())
-          AND o.COMPETITION_CODE IN ('{comp_filter}')
-          AND h.ppg IS NOT NULL
-          AND a.ppg IS NOT NULL
-        ORDER BY o.COMMENCE_TIME
+            ROUND(c.CONSENSUS_HOME_PROB * 100, 1) as FAIR_HOME_PROB,
+            ROUND(c.CONSENSUS_DRAW_PROB * 100, 1) as FAIR_DRAW_PROB,
+            ROUND(c.CONSENSUS_AWAY_PROB * 100, 1) as FAIR_AWAY_PROB,
+            h5.FORM as home_last_5,
+            a5.FORM as away_last_5,
+            hr.RATING as home_elo,
+            ar.RATING as away_elo
+        FROM GOLD.MATCH_PREDICTIONS p
+        LEFT JOIN GOLD.ODDS_ANALYSIS o
+            ON o.MATCH_ID = p.MATCH_ID
+        LEFT JOIN GOLD.ODDS_CONSENSUS c
+            ON c.GAME_ID = o.GAME_ID
+        LEFT JOIN GOLD.TEAM_FORM h5
+            ON p.HOME_TEAM_ID = h5.TEAM_ID AND p.COMPETITION_CODE = h5.COMPETITION_CODE AND h5.WINDOW_NAME = 'LAST_5'
+        LEFT JOIN GOLD.TEAM_FORM a5
+            ON p.AWAY_TEAM_ID = a5.TEAM_ID AND p.COMPETITION_CODE = a5.COMPETITION_CODE AND a5.WINDOW_NAME = 'LAST_5'
+        LEFT JOIN GOLD.TEAM_RATINGS hr
+            ON p.HOME_TEAM_ID = hr.TEAM_ID
+        LEFT JOIN GOLD.TEAM_RATINGS ar
+            ON p.AWAY_TEAM_ID = ar.TEAM_ID
+        WHERE p.MATCH_DATE > CURRENT_TIMESTAMP()
+          AND p.MATCH_DATE <= DATEADD('day', ?, CURRENT_TIMESTAMP())
+          AND ARRAY_CONTAINS(p.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
+        ORDER BY p.MATCH_DATE
         LIMIT 20
-    """)
+    """, params=[days_ahead, comp_filter], section="predictions")
 
     if not predictions.empty:
+        outcomes = ["Home Win", "Draw", "Away Win"]
         for idx, pred in predictions.iterrows():
-            match_time = pd.to_datetime(pred['COMMENCE_TIME']).strftime("%a %d %b, %H:%M")
-
-            # Calculate SnowGoal prediction
-            form_diff = pred['FORM_ADVANTAGE']
-
-            # Simple prediction logic
-            if form_diff > 5:
-                snowgoal_pred = "Home Win"
-                confidence = min(70 + form_diff, 85)
-            elif form_diff < -5:
-                snowgoal_pred = "Away Win"
-                confidence = min(70 + abs(form_diff), 85)
-            else:
-                snowgoal_pred = "Close Match / Draw Possible"
-                confidence = 50 + abs(form_diff)
-
-            # Compare with bookmaker favorite
-            if pred['IMPLIED_HOME_PROB'] > pred['IMPLIED_AWAY_PROB'] and pred['IMPLIED_HOME_PROB'] > pred['IMPLIED_DRAW_PROB']:
-                bookie_pred = "Home Win"
-            elif pred['IMPLIED_AWAY_PROB'] > pred['IMPLIED_HOME_PROB'] and pred['IMPLIED_AWAY_PROB'] > pred['IMPLIED_DRAW_PROB']:
-                bookie_pred = "Away Win"
-            else:
-                bookie_pred = "Draw"
+            match_time = pd.to_datetime(pred['MATCH_DATE']).strftime("%a %d %b, %H:%M")
+
+            model_probs = [pred['MODEL_HOME_PROB'], pred['MODEL_DRAW_PROB'], pred['MODEL_AWAY_PROB']]
+            snowgoal_pred = outcomes[model_probs.index(max(model_probs))]
+            has_odds = pd.notna(pred['FAIR_HOME_PROB'])
 
-            agreement = "✅" if snowgoal_pred.split()[0] == bookie_pred.split()[0] else "⚠️"
+            if has_odds:
+                implied_probs = [pred['FAIR_HOME_PROB'], pred['FAIR_DRAW_PROB'], pred['FAIR_AWAY_PROB']]
+                bookie_pred = outcomes[implied_probs.index(max(implied_probs))]
+                agreement = "✅" if snowgoal_pred == bookie_pred else "⚠️"
+            else:
+                agreement = "🔮"
 
             with st.expander(f"{agreement} **{pred['HOME_TEAM']} vs {pred['AWAY_TEAM']}** • {pred['COMPETITION_CODE']} • {match_time}"):
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("### 🤖 SnowGoal Prediction")
-                    st.metric("Prediction", snowgoal_pred, f"Confidence: {confidence:.0f}%")
+                    st.metric("Prediction", snowgoal_pred, f"Probability: {max(model_probs):.0f}%")
+                    home_elo, away_elo = (f"{pred[c]:.0f}" if pd.notna(pred[c]) else '-' for c in ('HOME_ELO', 'AWAY_ELO'))
                     st.markdown(f"""
-                    **Form Analysis (Last 90 days):**
-                    - 🏠 Home: {pred['HOME_FORM_PPG']:.2f} PPG, {pred['HOME_AVG_SCORED']:.1f} goals/match
-                    - ✈️ Away: {pred['AWAY_FORM_PPG']:.2f} PPG, {pred['AWAY_AVG_SCORED']:.1f} goals/match
-                    - 📊 Form Advantage: {form_diff:+.1f} (towards {"Home" if form_diff > 0 else "Away"})
+                    **Model Probabilities:**
+                    - 🏠 Home: {pred['MODEL_HOME_PROB']:.1f}% • 🤝 Draw: {pred['MODEL_DRAW_PROB']:.1f}% • ✈️ Away: {pred['MODEL_AWAY_PROB']:.1f}%
+                    - ⚽ Expected goals: {pred['EXP_HOME_GOALS']:.2f} - {pred['EXP_AWAY_GOALS']:.2f} (most likely {pred['MOST_LIKELY_SCORE']})
+                    - 📈 Over 2.5: {pred['MODEL_OVER_2_5']:.1f}% • BTTS: {pred['MODEL_BTTS']:.1f}%
+                    - 📋 Last 5: {pred['HOME_LAST_5'] or '-'} / {pred['AWAY_LAST_5'] or '-'}
+                    - 🏅 Elo: {home_elo} / {away_elo}
                     """)
 
                 with col2:
                     st.markdown("### 💰 Bookmaker Prediction")
-                    st.metric("Favorite", bookie_pred)
-                    st.markdown(f"""
-                    **Implied Probabilities:**
-                    - 🏠 Home: {pred['IMPLIED_HOME_PROB']:.1f}% (odds: {pred['AVG_HOME_ODDS']:.2f})
-                    - 🤝 Draw: {pred['IMPLIED_DRAW_PROB']:.1f}% (odds: {pred['AVG_DRAW_ODDS']:.2f})
-                    - ✈️ Away: {pred['IMPLIED_AWAY_PROB']:.1f}% (odds: {pred['AVG_AWAY_ODDS']:.2f})
-                    """)
+                    if has_odds:
+                        st.metric("Favorite", bookie_pred)
+                        st.markdown(f"""
+                        **Fair Probabilities, margin removed (model edge):**
+                        - 🏠 Home: {pred['FAIR_HOME_PROB']:.1f}% (odds: {pred['AVG_HOME_ODDS']:.2f}, edge: {pred['MODEL_HOME_PROB'] - pred['FAIR_HOME_PROB']:+.1f}%)
+                        - 🤝 Draw: {pred['FAIR_DRAW_PROB']:.1f}% (odds: {pred['AVG_DRAW_ODDS']:.2f}, edge: {pred['MODEL_DRAW_PROB'] - pred['FAIR_DRAW_PROB']:+.1f}%)
+                        - ✈️ Away: {pred['FAIR_AWAY_PROB']:.1f}% (odds: {pred['AVG_AWAY_ODDS']:.2f}, edge: {pred['MODEL_AWAY_PROB'] - pred['FAIR_AWAY_PROB']:+.1f}%)
+                        """)
+                    else:
+                        st.info("No odds available yet for this fixture")
     else:
-        st.info("Not enough form data to generate predictions")
+        st.info("No model predictions available for the selected period")
 
 st.divider()
 
@@ -436,37 +437,96 @@ st.divider()
 # SECTION 5: ROI Simulator
 # ============================================
 st.header("💰 ROI Simulator")
-st.markdown("*Simulate betting strategies on historical matches with known outcomes*")
+st.markdown("*Backtest on closing odds of finished matches (precomputed strategy grid)*")
 
 if selected_comps:
     st.subheader("⚙️ Strategy Configuration")
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        strategy = st.selectbox("Strategy", [
-            "Always Home",
-            "Always Away",
-            "Always Draw",
-            "Favorite (Lowest Odds)",
-            "Underdog (Highest Odds)"
-        ])
+        prob_source = st.selectbox("Probability Source", ["CONSENSUS", "MODEL"],
+                                   help="CONSENSUS: market average without margin • MODEL: SnowGoal Dixon-Coles predictions")
     with col2:
-        stake_per_bet = st.number_input("Stake per Bet (€)", min_value=1, max_value=1000, value=10)
+        price_mode = st.selectbox("Price", ["BEST", "AVERAGE", "BOOKMAKER"],
+                                  help="BEST: best available odds • AVERAGE: average odds • BOOKMAKER: each bookmaker separately")
     with col3:
-        min_odds = st.slider("Min Odds Filter", 1.0, 5.0, 1.5, 0.1)
+        staking = st.selectbox("Staking", ["FLAT", "KELLY"],
+                               help="FLAT: 1 unit per bet • KELLY: quarter Kelly on a fixed 100-unit bankroll (capped at 5%)")
+
+    backtest_curve = run_query("""
+        SELECT
+            THRESHOLD,
+            N_BETS,
+            ROI,
+            HIT_RATE,
+            PROFIT,
+            MAX_DRAWDOWN
+        FROM GOLD.BACKTEST_RESULTS
+        WHERE PROB_SOURCE = ?
+          AND PRICE_MODE = ?
+          AND STAKING = ?
+          AND COMPETITION_CODE = 'ALL'
+          AND BOOKMAKER = ?
+        ORDER BY THRESHOLD
+    """, params=[prob_source, price_mode, staking, 'ALL' if price_mode == 'BOOKMAKER' else price_mode], section="backtest_curve")
+
+    if not backtest_curve.empty:
+        fig = px.line(
+            backtest_curve, x=backtest_curve['THRESHOLD'] * 100, y=backtest_curve['ROI'] * 100,
+            markers=True, hover_data={'N_BETS': True, 'MAX_DRAWDOWN': True},
+            labels={'x': 'Value Threshold (%)', 'y': 'ROI (%)'},
+            title="ROI by value threshold (all competitions)"
+        )
+        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        st.plotly_chart(fig, use_container_width=True)
+
+        min_edge = st.select_slider(
+            "Value Threshold (%)",
+            options=[round(t * 100) for t in backtest_curve['THRESHOLD']],
+            value=round(backtest_curve['THRESHOLD'].iloc[min(5, len(backtest_curve) - 1)] * 100)
+        )
 
-    # Simulate strategy (we need historical odds matched with results)
-    # Note: This requires odds data that we can match with finished matches
-    st.info("💡 **Coming Soon**: Historical odds backtesting. This feature requires historical odds data matched with actual match results. Currently, odds are only available for upcoming matches.")
+        breakdown = run_query("""
+            SELECT
+                COMPETITION_CODE,
+                BOOKMAKER,
+                N_BETS,
+                N_WON,
+                ROUND(HIT_RATE * 100, 1) as HIT_RATE_PCT,
+                TOTAL_STAKED,
+                PROFIT,
+                ROUND(ROI * 100, 1) as ROI_PCT,
+                MAX_DRAWDOWN,
+                AVG_ODDS
+            FROM GOLD.BACKTEST_RESULTS
+            WHERE PROB_SOURCE = ?
+              AND PRICE_MODE = ?
+              AND STAKING = ?
+              AND ROUND(THRESHOLD * 100) = ?
+              AND (COMPETITION_CODE = 'ALL' OR ARRAY_CONTAINS(COMPETITION_CODE::VARIANT, SPLIT(?, ',')))
+            ORDER BY COMPETITION_CODE = 'ALL' DESC, BOOKMAKER = 'ALL' DESC, ROI DESC
+        """, params=[prob_source, price_mode, staking, min_edge, comp_filter], section="backtest_breakdown")
+
+        if not breakdown.empty:
+            # Le drawdown ne s'additionne pas par compétition: total toutes compétitions, comme la courbe
+            totals = breakdown[(breakdown['COMPETITION_CODE'] == 'ALL') & (breakdown['BOOKMAKER'] == 'ALL')]
+            if not totals.empty:
+                total = totals.iloc[0]
+                st.markdown("**All competitions, all bookmakers**")
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("🎯 Bets", int(total['N_BETS']))
+                with col2:
+                    st.metric("✅ Hit Rate", f"{total['HIT_RATE_PCT']:.1f}%")
+                with col3:
+                    st.metric("💰 ROI", f"{total['ROI_PCT']:+.1f}%", f"{total['PROFIT']:+.2f} units")
+                with col4:
+                    st.metric("📉 Max Drawdown", f"{total['MAX_DRAWDOWN']:.2f} units")
 
-    st.markdown("""
-    **Planned Features:**
-    - Backtest strategies on past matches with known outcomes
-    - Calculate ROI, win rate, and profit/loss
-    - Compare multiple strategies side-by-side
-    - Risk analysis and variance calculations
-    - Kelly Criterion optimal stake suggestions
-    """)
+            st.caption("Breakdown by bookmaker: all-competition rows, then each selected competition")
+            st.dataframe(breakdown, use_container_width=True, hide_index=True)
+    else:
+        st.info("No backtest results yet: closing odds are stored as matches are played (SILVER.ODDS_HISTORY).")
 
 st.divider()
 
@@ -476,17 +536,17 @@ st.divider()
 st.header("📊 Odds Data Summary")
 
 if selected_comps:
-    summary = run_query(f"""
+    summary = run_query("""
         SELECT
             COUNT(DISTINCT o.GAME_ID) as total_games,
-            (SELECT COUNT(DISTINCT BOOKMAKER_KEY) FROM SILVER.ODDS WHERE COMPETITION_CODE IN ('{comp_filter}')) as total_bookmakers,
+            (SELECT COUNT(DISTINCT BOOKMAKER_KEY) FROM SILVER.ODDS WHERE ARRAY_CONTAINS(COMPETITION_CODE::VARIANT, SPLIT(?, ','))) as total_bookmakers,
             ROUND(AVG(o.BOOKMAKER_MARGIN_PCT), 2) as avg_margin,
             MIN(o.COMMENCE_TIME) as next_match,
             MAX(o.COMMENCE_TIME) as last_match
         FROM GOLD.ODDS_ANALYSIS o
-        WHERE o.COMPETITION_CODE IN ('{comp_filter}')
+        WHERE ARRAY_CONTAINS(o.COMPETITION_CODE::VARIANT, SPLIT(?, ','))
           AND o.COMMENCE_TIME > CURRENT_TIMESTAMP()
-    """)
+    """, params=[comp_filter, comp_filter], section="odds_summary")
 
     if not summary.empty:
         col1, col2, col3, col4 = st.columns(4)
@@ -81,6 +81,8 @@ with col2:
     - `TEAMS`
     - `COMPETITIONS`
     - `ODDS` 🎲
+    - `ODDS_HISTORY` 🎲
+    - `TEAM_ALIASES` 🔗
 
     **Updates:** MERGE incremental
     """)
@@ -90,9 +92,15 @@ with col3:
     st.markdown("""
     **Format:** Aggregations
 
-    **Tables (9):**
+    **Tables (19):**
     - `LEAGUE_STANDINGS`
     - `TOP_SCORERS`
+    - `TEAM_MATCHES` ⚡
+    - `TEAM_FORM` ⚡
+    - `HEAD_TO_HEAD` / `HEAD_TO_HEAD_SEASONS` ⚡
+    - `MATCH_PREDICTIONS` 🤖
+    - `TEAM_RATINGS` / `TEAM_RATING_HISTORY` 🤖
+    - `SEASON_SIMULATIONS` 🤖
     - `TEAM_STATS`
     - `RECENT_MATCHES`
     - `UPCOMING_FIXTURES`
@@ -100,6 +108,9 @@ with col3:
     - `REFEREE_STATS` ⭐
     - `GEOGRAPHIC_STATS` ⭐
     - `ODDS_ANALYSIS` 🎲
+    - `BACKTEST_RESULTS` 🎲
+    - `ODDS_CONSENSUS` 🎲
+    - `ARBITRAGE_OPPORTUNITIES` 🎲
 
     **Refresh:** INSERT OVERWRITE via Tasks
     """)
@@ -260,6 +271,103 @@ The CRON schedule is optimized for European football match times:
 task_graph_path = Path(__file__).parent.parent / "assets" / "task_arch_snowgoal.png"
 st.image(str(task_graph_path), width=900)
 
+st.markdown("""
+### Chemin critique & temps d'attente
+À la fin de chaque run, le finalizer appelle `ANALYZE_TASK_GRAPH()` qui reconstruit le graphe depuis `TASK_HISTORY` (par `GRAPH_RUN_GROUP_ID`) :
+- **Chemin critique :** chaîne des prédécesseurs « bloquants » (terminés en dernier) jusqu'à la dernière tâche
+- **Queue vs exécution :** temps entre la fin du prédécesseur bloquant et le démarrage (scheduling, reprise du warehouse) vs durée d'exécution
+- **Slack :** retard qu'une tâche peut prendre sans retarder le run
+- **Idle gaps :** périodes sans aucune tâche en cours sur le warehouse pendant le run
+
+Résultats : `COMMON.TASK_GRAPH_RUNS` (1 ligne par run), `COMMON.TASK_RUN_STATS` (1 ligne par tâche et par run), tendances dans `V_TASK_CRITICAL_PATH_TRENDS`.
+""")
+
+with st.expander("🧭 Chemin critique du DAG (Live)"):
+    try:
+        import plotly.express as px
+        from connection import run_queries
+
+        dag_data = run_queries({
+            "graph_runs": """
+                SELECT GRAPH_RUN_GROUP_ID, SCHEDULED_TIME, STATE, TOTAL_DURATION_MS,
+                       CRITICAL_QUEUE_MS, CRITICAL_EXECUTION_MS, WAREHOUSE_IDLE_MS,
+                       BOTTLENECK_TASK, ARRAY_TO_STRING(CRITICAL_PATH, ' → ') AS CRITICAL_PATH,
+                       AVG_PARALLELISM
+                FROM SNOWGOAL_DB.COMMON.TASK_GRAPH_RUNS
+                ORDER BY SCHEDULED_TIME DESC
+                LIMIT 30
+            """,
+            "last_run_tasks": """
+                SELECT TASK_NAME, STATE, GATING_TASK, READY_TIME, QUERY_START_TIME, COMPLETED_TIME,
+                       QUEUE_MS, EXECUTION_MS, SLACK_MS, ON_CRITICAL_PATH
+                FROM SNOWGOAL_DB.COMMON.TASK_RUN_STATS
+                WHERE GRAPH_RUN_GROUP_ID = (
+                    SELECT GRAPH_RUN_GROUP_ID FROM SNOWGOAL_DB.COMMON.TASK_GRAPH_RUNS
+                    ORDER BY SCHEDULED_TIME DESC LIMIT 1
+                )
+                ORDER BY QUERY_START_TIME
+            """,
+            "task_trends": """
+                SELECT TASK_NAME, RUNS, PCT_ON_CRITICAL_PATH, P50_QUEUE_MS, P50_EXECUTION_MS,
+                       P95_EXECUTION_MS, P50_SLACK_MS, PCT_TIME_QUEUED
+                FROM SNOWGOAL_DB.COMMON.V_TASK_CRITICAL_PATH_TRENDS
+                ORDER BY PCT_ON_CRITICAL_PATH DESC, P50_EXECUTION_MS DESC
+            """,
+        })
+
+        runs_df = dag_data["graph_runs"]
+        if runs_df.empty:
+            st.info("Aucun run analysé pour le moment.")
+        else:
+            last_run = runs_df.iloc[0]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Durée du dernier run", f"{last_run['TOTAL_DURATION_MS'] / 1000:.0f} s")
+            col2.metric("Attente (chemin critique)", f"{last_run['CRITICAL_QUEUE_MS'] / 1000:.0f} s")
+            col3.metric("Warehouse inactif", f"{last_run['WAREHOUSE_IDLE_MS'] / 1000:.0f} s")
+            col4.metric("Goulot", str(last_run['BOTTLENECK_TASK']))
+            st.caption(f"Chemin critique : {last_run['CRITICAL_PATH']}")
+
+            tasks_df = dag_data["last_run_tasks"].dropna(subset=["QUERY_START_TIME", "COMPLETED_TIME"])
+            if not tasks_df.empty:
+                fig = px.timeline(
+                    tasks_df, x_start="QUERY_START_TIME", x_end="COMPLETED_TIME", y="TASK_NAME",
+                    color="ON_CRITICAL_PATH", hover_data=["QUEUE_MS", "EXECUTION_MS", "SLACK_MS", "GATING_TASK"],
+                    color_discrete_map={True: "#e74c3c", False: "#95a5a6"}
+                )
+                fig.update_yaxes(autorange="reversed")
+                fig.update_layout(height=500, legend_title_text="Chemin critique")
+                st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown("**Dernier run : queue vs exécution par tâche**")
+            st.dataframe(
+                dag_data["last_run_tasks"],
+                column_config={
+                    "QUEUE_MS": st.column_config.NumberColumn("Attente (ms)", format="%d"),
+                    "EXECUTION_MS": st.column_config.NumberColumn("Exécution (ms)", format="%d"),
+                    "SLACK_MS": st.column_config.NumberColumn("Slack (ms)", format="%d"),
+                    "ON_CRITICAL_PATH": st.column_config.CheckboxColumn("Critique"),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
+            st.markdown("**Durée des runs : attente vs exécution sur le chemin critique (s)**")
+            history_df = runs_df.sort_values("SCHEDULED_TIME").set_index("SCHEDULED_TIME")
+            st.bar_chart(history_df[["CRITICAL_QUEUE_MS", "CRITICAL_EXECUTION_MS"]] / 1000)
+
+            st.markdown("**Tendances par tâche (14 jours)**")
+            st.dataframe(
+                dag_data["task_trends"],
+                column_config={
+                    "PCT_ON_CRITICAL_PATH": st.column_config.ProgressColumn("% critique", min_value=0, max_value=100, format="%.0f%%"),
+                    "PCT_TIME_QUEUED": st.column_config.NumberColumn("% en attente", format="%.1f%%"),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+    except Exception as e:
+        st.error(f"Erreur de lecture de l'analyse du DAG : {e}")
+
 st.divider()
 
 # --- SECTION LOGGING & OBSERVABILITÉ ---
@@ -304,7 +412,7 @@ with st.expander("🔍 Voir les derniers événements du pipeline (Live)"):
             ORDER BY EVENT_TIME DESC 
             LIMIT 10
         """
-        logs_df = run_query(logs_query)
+        logs_df = run_query(logs_query, section="pipeline_logs")
         st.dataframe(
             logs_df,
             column_config={
@@ -318,6 +426,207 @@ with st.expander("🔍 Voir les derniers événements du pipeline (Live)"):
     except Exception as e:
         st.error(f"Erreur de lecture des logs : {e}")
 
+st.markdown("""
+### Pipeline Metrics (par étape)
+Chaque run écrit aussi des métriques structurées dans `SNOWGOAL_DB.COMMON.PIPELINE_METRICS` (même `RUN_ID` que le graphe de tâches) :
+- `HTTP` : latence, statut, octets et records par ligue et par endpoint (football-data.org, The Odds API)
+- `LOAD` : durée de chargement par table RAW (`write_pandas` + `INSERT`)
+- `MERGE` : lignes insérées / mises à jour / ignorées par table Silver (`RESULT_SCAN` de chaque `MERGE`)
+- `TASK` : durée de chaque tâche du DAG (dont les refresh Gold), écrite par la tâche finale depuis `TASK_HISTORY`
+
+Les vues `V_PIPELINE_STAGE_TRENDS` (p50/p95 par jour) et `V_PIPELINE_SLOWEST_STAGES` (dernier run vs médiane sur 14 jours) servent d'interface de requête.
+""")
+
+with st.expander("📈 Étapes les plus lentes & tendances (Live)"):
+    try:
+        from connection import run_queries
+
+        metrics_data = run_queries({
+            "slowest_stages": """
+                SELECT COMPONENT_NAME, STAGE, OBJECT_NAME, ENDPOINT, STATUS, DURATION_MS,
+                       BASELINE_P50_MS, SLOWDOWN_RATIO, RECORDS, BYTES,
+                       ROWS_INSERTED, ROWS_UPDATED, ROWS_SKIPPED, EVENT_TIME
+                FROM SNOWGOAL_DB.COMMON.V_PIPELINE_SLOWEST_STAGES
+                ORDER BY DURATION_MS DESC
+                LIMIT 15
+            """,
+            "stage_trends": """
+                SELECT RUN_DATE, COMPONENT_NAME || ' / ' || STAGE AS STAGE_NAME, SUM(P95_DURATION_MS) AS P95_DURATION_MS
+                FROM SNOWGOAL_DB.COMMON.V_PIPELINE_STAGE_TRENDS
+                WHERE RUN_DATE >= DATEADD('day', -30, CURRENT_DATE())
+                GROUP BY ALL
+                ORDER BY RUN_DATE
+            """,
+        })
+
+        st.markdown("**Dernier run : étapes les plus lentes (vs médiane 14 jours)**")
+        st.dataframe(
+            metrics_data["slowest_stages"],
+            column_config={
+                "DURATION_MS": st.column_config.NumberColumn("Durée (ms)", format="%d"),
+                "BASELINE_P50_MS": st.column_config.NumberColumn("Médiane 14j (ms)", format="%d"),
+                "SLOWDOWN_RATIO": st.column_config.NumberColumn("x médiane", format="%.2f"),
+                "EVENT_TIME": st.column_config.DatetimeColumn("Timestamp"),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+        trends_df = metrics_data["stage_trends"]
+        if not trends_df.empty:
+            st.markdown("**p95 quotidien par composant / étape (ms, somme des objets)**")
+            st.line_chart(trends_df.pivot_table(index="RUN_DATE", columns="STAGE_NAME", values="P95_DURATION_MS"))
+    except Exception as e:
+        st.error(f"Erreur de lecture des métriques : {e}")
+
+st.markdown("""
+### Attribution des coûts
+Tout tourne sur `SNOWGOAL_WH_XS` : chaque tâche du DAG et chaque requête du dashboard porte un `QUERY_TAG` JSON (étape / tâche, page / section).
+`SP_REFRESH_COST_ATTRIBUTION` (tâche quotidienne) croise `ACCOUNT_USAGE.QUERY_ATTRIBUTION_HISTORY`, `QUERY_HISTORY` et `WAREHOUSE_METERING_HISTORY` :
+les crédits facturés de chaque heure sont répartis par étape et par page, le temps d'inactivité du warehouse (auto-suspend) au prorata.
+Résultat quotidien dans `GOLD.COST_ATTRIBUTION`, totaux 30 jours dans `GOLD.V_COST_BY_STAGE`.
+""")
+
+with st.expander("💰 Crédits par étape & par page (Live)"):
+    try:
+        from connection import run_queries
+
+        cost_data = run_queries({
+            "cost_by_stage": """
+                SELECT SOURCE, STAGE, OBJECT_NAME, QUERY_COUNT, CREDITS_TOTAL, CREDITS_IDLE,
+                       CREDITS_PER_1K_QUERIES, PCT_OF_WAREHOUSE
+                FROM SNOWGOAL_DB.GOLD.V_COST_BY_STAGE
+                ORDER BY CREDITS_TOTAL DESC
+            """,
+            "daily_cost": """
+                SELECT USAGE_DATE, CASE WHEN SOURCE = 'PIPELINE' THEN STAGE ELSE SOURCE END AS BUCKET,
+                       SUM(CREDITS_TOTAL) AS CREDITS
+                FROM SNOWGOAL_DB.GOLD.COST_ATTRIBUTION
+                WHERE USAGE_DATE >= CURRENT_DATE() - 30
+                GROUP BY ALL
+                ORDER BY USAGE_DATE
+            """,
+        })
+
+        cost_df = cost_data["cost_by_stage"]
+        if cost_df.empty:
+            st.info("Pas encore de données de coûts (ACCOUNT_USAGE : jusqu'à 8h de latence).")
+        else:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Crédits (30 jours)", f"{cost_df['CREDITS_TOTAL'].sum():.2f}")
+            col2.metric("Pipeline", f"{cost_df.loc[cost_df['SOURCE'] == 'PIPELINE', 'CREDITS_TOTAL'].sum():.2f}")
+            col3.metric("Dashboard", f"{cost_df.loc[cost_df['SOURCE'] == 'DASHBOARD', 'CREDITS_TOTAL'].sum():.2f}")
+
+            daily_df = cost_data["daily_cost"]
+            if not daily_df.empty:
+                st.markdown("**Crédits quotidiens par étape (pipeline) / source**")
+                st.bar_chart(daily_df.pivot_table(index="USAGE_DATE", columns="BUCKET", values="CREDITS"))
+
+            st.dataframe(
+                cost_df,
+                column_config={
+                    "CREDITS_TOTAL": st.column_config.NumberColumn("Crédits", format="%.4f"),
+                    "CREDITS_IDLE": st.column_config.NumberColumn("dont inactivité", format="%.4f"),
+                    "CREDITS_PER_1K_QUERIES": st.column_config.NumberColumn("Crédits / 1k requêtes", format="%.4f"),
+                    "PCT_OF_WAREHOUSE": st.column_config.ProgressColumn("% du warehouse", min_value=0, max_value=100, format="%.1f%%"),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+    except Exception as e:
+        st.error(f"Erreur de lecture des coûts : {e}")
+
+with st.expander("🔌 Pool de connexions Snowflake (Streamlit Cloud)"):
+    from connection import get_pool_stats
+
+    pool_stats = get_pool_stats()
+    if pool_stats is None:
+        st.caption("Pas de pool dans cet environnement (SiS ou lecture du bundle Parquet).")
+    else:
+        st.caption(
+            "Chaque requête emprunte sa propre connexion au pool : les visiteurs simultanés "
+            "ne s'attendent plus les uns les autres. Les sessions expirées sont recréées automatiquement."
+        )
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Connexions ouvertes", f"{pool_stats['open']} / {pool_stats['size']}", f"{pool_stats['idle']} libres", delta_color="off")
+        c2.metric("Emprunts", pool_stats['checkouts'])
+        c3.metric("Attentes", pool_stats['waits'], f"moy. {pool_stats['avg_wait'] * 1000:.0f} ms · max {pool_stats['max_wait'] * 1000:.0f} ms", delta_color="off")
+        c4.metric("Reconnexions", pool_stats['reconnects'], f"{pool_stats['discarded']} écartées", delta_color="off")
+
+with st.expander("🧠 Cache des requêtes (mémoire du process)"):
+    from connection import get_cache_stats
+
+    cache_stats = get_cache_stats()
+    st.caption(
+        "Résultats gardés en mémoire jusqu'à la prochaine version des données, dans la limite "
+        f"d'un budget de {cache_stats['max_bytes'] / 1024 ** 2:.0f} Mo : au-delà, les résultats "
+        "les moins récemment lus sont évincés (LRU)."
+    )
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Hits", cache_stats['hits'], f"{cache_stats['hit_rate']:.0%} des lectures", delta_color="off")
+    c2.metric("Misses", cache_stats['misses'])
+    c3.metric("Évictions", cache_stats['evictions'], f"{cache_stats['invalidations']} purges (nouvelle version)", delta_color="off")
+    c4.metric(
+        "Mémoire utilisée",
+        f"{cache_stats['bytes'] / 1024 ** 2:.1f} Mo",
+        f"{cache_stats['entries']} résultats · {cache_stats['bytes'] / cache_stats['max_bytes']:.0%} du budget",
+        delta_color="off"
+    )
+
+with st.expander("⏱️ Performance des requêtes du dashboard (Live)"):
+    from connection import QUERY_TAG_APP, get_query_metrics, query_history
+
+    st.caption(
+        f"Chaque requête porte un QUERY_TAG JSON (app `{QUERY_TAG_APP}`, page, section) et est mesurée "
+        "côté client : latence, lignes, octets, hit/miss du cache. Les dernières requêtes du process sont gardées en mémoire."
+    )
+    query_metrics = get_query_metrics()
+    perf_summary = query_metrics.summary()
+
+    if perf_summary.empty:
+        st.info("Aucune requête mesurée depuis le démarrage de l'application.")
+    else:
+        st.markdown("**Latence par requête (p50 / p95, ms)**")
+        st.dataframe(
+            perf_summary.assign(HIT_RATE=perf_summary["HIT_RATE"] * 100),
+            column_config={
+                "HIT_RATE": st.column_config.ProgressColumn("Cache hit", format="%.0f%%", min_value=0, max_value=100),
+                "P50_MS": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                "P95_MS": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                "MAX_MS": st.column_config.NumberColumn("max (ms)", format="%.1f"),
+                "P95_EXEC_MS": st.column_config.NumberColumn("p95 hors cache (ms)", format="%.1f"),
+                "AVG_ROWS": st.column_config.NumberColumn("Lignes (moy.)", format="%.0f"),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+        st.markdown("**Requêtes les plus lentes**")
+        st.dataframe(
+            query_metrics.slowest(10)[["EVENT_TIME", "PAGE", "SECTION", "CACHE", "LATENCY_MS", "ROWS", "BYTES", "QUERY_ID", "ERROR"]],
+            column_config={"EVENT_TIME": st.column_config.DatetimeColumn("Timestamp")},
+            use_container_width=True,
+            hide_index=True
+        )
+
+        # QUERY_HISTORY à la demande: c'est lui-même une requête Snowflake
+        if st.checkbox("Détail côté serveur (INFORMATION_SCHEMA.QUERY_HISTORY, dernière heure)"):
+            try:
+                server_df = query_history(minutes=60)
+                if server_df.empty:
+                    st.info("Aucune requête Snowflake du dashboard dans l'historique (mode bundle ou cache seul).")
+                else:
+                    st.dataframe(
+                        server_df[[
+                            "PAGE", "SECTION", "LATENCY_MS", "COMPILATION_MS", "QUEUED_MS", "EXECUTION_MS",
+                            "TOTAL_ELAPSED_MS", "CLIENT_OVERHEAD_MS", "BYTES_SCANNED", "ROWS_PRODUCED", "WAREHOUSE_SIZE", "QUERY_ID"
+                        ]].head(50),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+            except Exception as e:
+                st.error(f"Erreur de lecture de QUERY_HISTORY : {e}")
+
 st.divider()
 
 # Technical Stack
@@ -355,13 +664,19 @@ st.header("✅ Audit de Qualité des Données (Data Quality)")
 
 st.info("""
 **Pourquoi cette section ?** Un pipeline robuste doit s'auto-contrôler. 
-Ici, nous interrogeons une vue Snowflake qui analyse les anomalies potentielles 
-sur les scores, les cotes et la cohérence des classements à chaque rafraîchissement.
+Après chaque MERGE, `SP_CHECK_DATA_QUALITY` évalue les contrôles (scores, cotes, cohérence des classements)
+uniquement sur les lignes modifiées (streams dédiés) et met à jour les compteurs d'anomalies de
+`GOLD.DATA_QUALITY_RESULTS` : cette section lit une table de 5 lignes, sans rescanner les tables Silver.
 """)
 
 try:
-    # Exécution de la requête sur la vue de monitoring
-    dq_df = run_query("SELECT * FROM GOLD.DATA_QUALITY_DASHBOARD")
+    # Lecture des résultats maintenus incrémentalement (une ligne par contrôle)
+    dq_df = run_query("""
+        SELECT TABLE_NAME, CHECK_NAME, ANOMALY_COUNT, LAST_ROWS_CHECKED,
+               LAST_NEW_ANOMALIES, LAST_RESOLVED_ANOMALIES, LAST_CHECKED_AT
+        FROM GOLD.DATA_QUALITY_RESULTS
+        ORDER BY TABLE_NAME, CHECK_NAME
+    """, section="data_quality")
     
     # Calcul du nombre total d'anomalies
     total_anomalies = dq_df['ANOMALY_COUNT'].sum()
@@ -382,6 +697,19 @@ try:
     # Affichage du tableau de bord de monitoring
     st.table(dq_df)
 
+    with st.expander("📜 Historique des contrôles par run"):
+        dq_history = run_query("""
+            SELECT RUN_ID, CHECKED_AT, CHECK_NAME, ROWS_CHECKED, NEW_ANOMALIES, RESOLVED_ANOMALIES, ANOMALY_COUNT
+            FROM GOLD.DATA_QUALITY_HISTORY
+            ORDER BY CHECKED_AT DESC
+            LIMIT 200
+        """, section="data_quality_history")
+        if dq_history.empty:
+            st.info("Aucun run de contrôle enregistré.")
+        else:
+            st.line_chart(dq_history.pivot_table(index="CHECKED_AT", columns="CHECK_NAME", values="ANOMALY_COUNT"))
+            st.dataframe(dq_history, use_container_width=True, hide_index=True)
+
 except Exception as e:
     st.error(f"Erreur lors de la récupération des métriques de qualité : {e}")
 
@@ -415,13 +743,22 @@ st.markdown("""
      - Odds 🎲
    - Incremental updates based on Streams CDC
 
-4. **After step 3** - **9 parallel GOLD refresh tasks**
-   - All execute simultaneously using `INSERT OVERWRITE`
-   - Full refresh of aggregated tables:
-     - 5 Business Intelligence tables
+4. **After step 3** - **GOLD refresh tasks**
+   - Full refresh (`INSERT OVERWRITE`) of aggregated tables:
+     - Business Intelligence tables
      - 3 Advanced Analytics tables (using enrichment columns)
-     - 1 Betting Analytics table (ODDS_ANALYSIS) 🎲
-   - No dependencies between them
+     - Betting Analytics tables (ODDS_ANALYSIS, ARBITRAGE_OPPORTUNITIES) 🎲
+   - Incremental refresh via Streams ⚡: `TEAM_MATCHES`, then `TEAM_STATS`, `TEAM_FORM`, `HEAD_TO_HEAD`
+   - `PREDICT_MATCHES()` 🤖: Dixon-Coles model scoring all upcoming fixtures
+   - `UPDATE_TEAM_RATINGS()` 🤖: Elo ratings updated from newly finished matches
+   - `SIMULATE_SEASONS()` 🤖: Monte Carlo title/top-4/relegation odds (nightly run only)
+   - `COMPUTE_ODDS_CONSENSUS()` 🎲: margin-free (Shin / power / proportional) consensus per upcoming game
+   - `BACKTEST_ODDS()` 🎲: strategy backtest on closing odds of finished matches
+
+5. **End of graph** - `TASK_PUBLISH_DATA_VERSION` (finalizer)
+   - `EXPORT_GOLD_BUNDLE()`: versioned Parquet bundle of GOLD on a stage (`latest.json` manifest) for the public app, which reads it through DuckDB without waking the warehouse
+   - Bumps `DATA_VERSION` and the last (successful) run id in `GOLD.PIPELINE_STATUS`, also bumped by each merge along with entity counts and freshness
+   - Dashboard query cache is keyed by this version (one-row lookup): results stay in memory until new data lands
 
 **Estimated execution time:** 50mn**
 **Rate limit 10 calls per minutes
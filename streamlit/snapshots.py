@@ -0,0 +1,83 @@
+"""
+Local Parquet snapshots of small GOLD tables
+
+Each table is downloaded once per pipeline data version (see connection.get_data_version)
+into <tmp>/snowgoal_snapshots/<version>/<TABLE>.parquet, then pages filter it in
+pandas: no warehouse query (and no SNOWGOAL_WH_XS resume) while users browse.
+The version probe itself is a constant query, answered by Snowflake's result
+cache as long as GOLD.PIPELINE_STATUS has not changed.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+from connection import execute_query, get_data_version
+
+SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), "snowgoal_snapshots")
+
+# Tables servies localement (quelques centaines / milliers de lignes chacune)
+SNAPSHOT_TABLES = {
+    "LEAGUE_STANDINGS",
+    "TOP_SCORERS",
+    "TEAM_STATS",
+    "RECENT_MATCHES",
+    "UPCOMING_FIXTURES",
+    "SEASON_SIMULATIONS",
+}
+
+_lock = threading.Lock()
+_frames = {}
+
+
+def _snapshot_path(version, table):
+    return os.path.join(SNAPSHOT_DIR, version, f"{table}.parquet")
+
+
+def _prune(version):
+    """Remove snapshots of previous data versions"""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name != version:
+            shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+    for key in [k for k in _frames if k[0] != version]:
+        del _frames[key]
+
+
+def _download(version, table):
+    path = _snapshot_path(version, table)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = execute_query(f"SELECT * FROM GOLD.{table}", section=f"snapshot:{table}")
+    # Écriture atomique: un autre process ne lit jamais un fichier partiel
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_gold(table):
+    """
+    Full GOLD table as a DataFrame, from the local snapshot of the current data
+    version (downloaded on first use). Only tables in SNAPSHOT_TABLES are allowed.
+    """
+    table = table.upper()
+    if table not in SNAPSHOT_TABLES:
+        raise ValueError(f"No local snapshot for GOLD.{table}")
+
+    version = get_data_version()
+    key = (version, table)
+    df = _frames.get(key)
+    if df is None:
+        with _lock:
+            df = _frames.get(key)
+            if df is None:
+                path = _snapshot_path(version, table)
+                if not os.path.exists(path):
+                    _prune(version)
+                    _download(version, table)
+                df = pd.read_parquet(path)
+                _frames[key] = df
+    return df.copy()
@@ -0,0 +1,50 @@
+"""
+fit_strengths: fitted mean goal rates must match the observed rates of the league,
+including early in the season when the prior dominates.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("snowflake.snowpark")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "snowpark", "procedures"))
+
+import match_predictions as mp  # noqa: E402
+
+N_TEAMS = 20
+HOME_RATE = 1.5
+AWAY_RATE = 1.2
+
+
+def simulate_league(seed, rounds):
+    """Random pairings of a 20-team league, Poisson goals from lognormal strengths"""
+    rng = np.random.default_rng(seed)
+    attack = rng.lognormal(0, 0.2, N_TEAMS)
+    defence = rng.lognormal(0, 0.2, N_TEAMS)
+    home_idx, away_idx = [], []
+    for _ in range(rounds):
+        order = rng.permutation(N_TEAMS)
+        home_idx.extend(order[:N_TEAMS // 2])
+        away_idx.extend(order[N_TEAMS // 2:])
+    home_idx, away_idx = np.array(home_idx), np.array(away_idx)
+    home_goals = rng.poisson(HOME_RATE * attack[home_idx] * defence[away_idx])
+    away_goals = rng.poisson(AWAY_RATE * attack[away_idx] * defence[home_idx])
+    return home_idx, away_idx, home_goals, away_goals
+
+
+@pytest.mark.parametrize("rounds", [3, 6, 38])
+@pytest.mark.parametrize("seed", range(5))
+def test_fitted_rates_match_observed(seed, rounds):
+    home_idx, away_idx, home_goals, away_goals = simulate_league(seed, rounds)
+    attack, defence, gamma = mp.fit_strengths(
+        home_idx, away_idx, home_goals, away_goals, np.ones(len(home_idx)), N_TEAMS
+    )
+
+    lam = gamma * attack[home_idx] * defence[away_idx]
+    mu = attack[away_idx] * defence[home_idx]
+
+    assert lam.mean() == pytest.approx(home_goals.mean(), rel=0.02)
+    assert mu.mean() == pytest.approx(away_goals.mean(), rel=0.05)
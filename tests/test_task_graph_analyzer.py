@@ -0,0 +1,74 @@
+"""
+analyze_history on a synthetic graph run: critical path, finalizer detection, and no
+hang when TASK_DEPENDENTS does not return the root task, runs without any completed
+task skipped.
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("snowflake.snowpark")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "snowpark", "procedures"))
+
+import task_graph_analyzer as tga  # noqa: E402
+
+DAG = {
+    'TASK_FETCH_ALL_LEAGUES': [],
+    'TASK_FETCH_ODDS': ['TASK_FETCH_ALL_LEAGUES'],
+    'TASK_MERGE_TO_SILVER': ['TASK_FETCH_ODDS'],
+    'TASK_REFRESH_TEAM_MATCHES': ['TASK_MERGE_TO_SILVER'],
+    'TASK_PREDICT_MATCHES': ['TASK_MERGE_TO_SILVER'],
+    'TASK_SIMULATE_SEASONS': ['TASK_PREDICT_MATCHES'],
+}
+
+# (task, scheduled, started, completed) in seconds after 07:00
+RUN = [
+    ('TASK_FETCH_ALL_LEAGUES', 0, 2, 300),
+    ('TASK_FETCH_ODDS', 300, 301, 340),
+    ('TASK_MERGE_TO_SILVER', 340, 345, 400),
+    ('TASK_REFRESH_TEAM_MATCHES', 400, 402, 410),
+    ('TASK_PREDICT_MATCHES', 400, 403, 430),
+    ('TASK_SIMULATE_SEASONS', 430, 500, 560),
+    ('TASK_PUBLISH_DATA_VERSION', 560, 562, 600),
+]
+
+
+def history(group='g1', run=RUN, state='SUCCEEDED'):
+    at = lambda s: pd.Timestamp('2026-10-19 07:00:00') + pd.Timedelta(seconds=s) if s is not None else pd.NaT  # noqa: E731
+    return pd.DataFrame([
+        {
+            'GRAPH_RUN_GROUP_ID': group, 'NAME': name, 'STATE': state, 'ATTEMPT_NUMBER': 1,
+            'SCHEDULED_TIME': at(scheduled), 'QUERY_START_TIME': at(started), 'COMPLETED_TIME': at(completed),
+            'QUERY_ID': 'q', 'ERROR_MESSAGE': None,
+        }
+        for name, scheduled, started, completed in run
+    ])
+
+
+@pytest.mark.parametrize("with_root", [True, False])
+def test_critical_path_and_finalizer(with_root):
+    dag = dict(DAG) if with_root else {k: v for k, v in DAG.items() if k != tga.ROOT_TASK}
+    runs, tasks = tga.analyze_history(history(), dag)
+
+    assert json.loads(runs.iloc[0]['CRITICAL_PATH']) == [
+        'TASK_FETCH_ALL_LEAGUES', 'TASK_FETCH_ODDS', 'TASK_MERGE_TO_SILVER',
+        'TASK_PREDICT_MATCHES', 'TASK_SIMULATE_SEASONS', 'TASK_PUBLISH_DATA_VERSION',
+    ]
+    finalizers = tasks.loc[tasks['IS_FINALIZER'], 'TASK_NAME'].tolist()
+    assert finalizers == ['TASK_PUBLISH_DATA_VERSION']
+    root = tasks.set_index('TASK_NAME').loc[tga.ROOT_TASK]
+    assert json.loads(root['PREDECESSORS']) == []
+    assert root['QUEUE_MS'] == 2000
+
+
+def test_run_without_completed_task_is_skipped():
+    cancelled = history('g0', [('TASK_FETCH_ALL_LEAGUES', 0, None, None)], state='CANCELLED')
+    assert tga.analyze_run(cancelled, DAG) is None
+
+    runs, tasks = tga.analyze_history(pd.concat([cancelled, history()], ignore_index=True), DAG)
+    assert runs['GRAPH_RUN_GROUP_ID'].tolist() == ['g1']
+    assert set(tasks['GRAPH_RUN_GROUP_ID']) == {'g1'}
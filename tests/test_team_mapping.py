@@ -0,0 +1,57 @@
+"""
+match_aliases: a shared generic token ("Real", "United"...) is not a match, so a team
+absent from the candidates stays unresolved instead of taking another team's id.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "snowpark", "procedures"))
+
+import team_mapping as tm  # noqa: E402
+
+# football-data.org (name, short name, TLA), LaLiga sans Real Oviedo
+LALIGA = {
+    86: ('Real Madrid CF', 'Real Madrid', 'RMA'),
+    92: ('Real Sociedad de Fútbol', 'Real Sociedad', 'RSO'),
+    90: ('Real Betis Balompié', 'Real Betis', 'BET'),
+    78: ('Club Atlético de Madrid', 'Atleti', 'ATM'),
+    81: ('FC Barcelona', 'Barça', 'FCB'),
+    77: ('Athletic Club', 'Athletic', 'ATH'),
+    94: ('Villarreal CF', 'Villarreal', 'VIL'),
+}
+
+
+def candidates(teams):
+    return {
+        team_id: {v for v in (tm.normalize_name(name), tm.normalize_name(short), tla.lower()) if v}
+        for team_id, (name, short, tla) in teams.items()
+    }
+
+
+def test_shared_token_team_not_in_candidates_stays_unresolved():
+    result = tm.match_aliases(['Real Oviedo', 'Real Madrid', 'Atletico Madrid'], candidates(LALIGA))
+
+    assert result['Real Oviedo'] == (None, 0.0)
+    assert result['Real Madrid'][0] == 86
+    assert result['Atletico Madrid'][0] == 78
+
+
+def test_missing_team_does_not_block_the_correct_alias():
+    result = tm.match_aliases(['Real Oviedo'], candidates(LALIGA))
+    assert result['Real Oviedo'] == (None, 0.0)
+
+    # Real Madrid n'est pas "pris" par Real Oviedo au run suivant
+    taken = {team_id for team_id, _ in result.values() if team_id is not None}
+    assert tm.match_aliases(['Real Madrid'], candidates(LALIGA), taken)['Real Madrid'][0] == 86
+
+
+@pytest.mark.parametrize("alias, team_id", [
+    ('Athletic Bilbao', 77),
+    ('Villarreal', 94),
+    ('Barcelona', 81),
+])
+def test_inclusion_and_ratio_matches_still_resolve(alias, team_id):
+    assert tm.match_aliases([alias], candidates(LALIGA))[alias][0] == team_id